@@ -1,13 +1,22 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse, JSONResponse
+from typing import List, Optional
+import json
+import base64
+import hashlib
 from models.schemas import (
-    UploadResponse, IndexRequest, IndexResponse,
+    UploadResponse, BulkUploadResponse, IndexRequest, IndexResponse, IndexJobInfo, IndexJobResponse, IndexJobListResponse,
     ChatRequest, ChatResponse, QueryRequest, QueryResponse,
-    DocumentListResponse, DeleteResponse, DocumentInfo, SourceDocument
+    DocumentListResponse, DeleteResponse, DocumentInfo, SourceDocument, ReindexResponse
 )
 from services.pdf_service import pdf_service
 from services.vector_service import vector_service
 from services.rag_service import rag_service
+from services.cache_service import answer_cache
+from services.rerank_service import rerank_service
+from services.job_service import index_job_service
+from utils.executor import run_blocking, iterate_blocking
+from config import settings
 
 router = APIRouter()
 
@@ -21,20 +30,15 @@ async def upload_pdf(file: UploadFile = File(...)):
     PDF 파일 업로드
     """
     try:
-        # 파일 읽기
-        file_content = await file.read()
-        file_size = len(file_content)
+        # 파일 저장 (스트리밍, 유효성 검사 포함)
+        try:
+            document_id, file_path, file_size = await pdf_service.save_uploaded_stream(file, file.filename)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        # 파일 유효성 검사
-        is_valid, error_message = pdf_service.validate_file(file.filename, file_size)
-        if not is_valid:
-            raise HTTPException(status_code=400, detail=error_message)
-
-        # 파일 저장
-        document_id, file_path = pdf_service.save_uploaded_file(file_content, file.filename)
-
-        # PDF 텍스트 추출 (페이지별)
-        pages_data, num_pages = pdf_service.extract_text_from_pdf(file_path)
+        # PDF 텍스트 추출 (페이지별) 후 인덱싱에서 재사용하도록 저장 (스레드 풀에서 실행)
+        pages_data, num_pages = await run_blocking(pdf_service.extract_text_from_pdf, file_path)
+        await run_blocking(pdf_service.save_page_texts, document_id, pages_data)
 
         return UploadResponse(
             success=True,
@@ -49,6 +53,57 @@ async def upload_pdf(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"파일 업로드 중 오류 발생: {str(e)}")
 
+@router.post("/upload/bulk", response_model=BulkUploadResponse)
+async def upload_pdfs_bulk(files: List[UploadFile] = File(...)):
+    """
+    여러 PDF 파일 업로드 후 대량 수집 작업 등록
+
+    텍스트 추출, 임베딩, 저장은 백그라운드 작업에서 문서를 묶어 처리하며
+    진행률은 /index/jobs/{job_id}로 확인
+    """
+    # 저장 전에 모든 파일의 형식 검사 (크기는 저장하면서 검사)
+    for file in files:
+        is_valid, error_message = pdf_service.validate_file(file.filename, 0)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=f"{file.filename}: {error_message}")
+
+    try:
+        documents = []
+        uploaded = []
+        try:
+            for file in files:
+                try:
+                    document_id, file_path, _ = await pdf_service.save_uploaded_stream(file, file.filename)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"{file.filename}: {str(e)}")
+
+                documents.append({"document_id": document_id, "file_path": file_path, "filename": file.filename})
+                uploaded.append(UploadResponse(
+                    success=True,
+                    message="파일이 업로드되었습니다.",
+                    document_id=document_id,
+                    filename=file.filename
+                ))
+        except BaseException:
+            # 일부 파일만 저장된 채로 실패하면 이미 저장한 파일 삭제
+            for document in documents:
+                pdf_service.delete_file(document["document_id"])
+            raise
+
+        job = index_job_service.submit_bulk(documents)
+
+        return BulkUploadResponse(
+            success=True,
+            message=f"{len(documents)}개 파일이 업로드되었습니다. 대량 수집 작업이 등록되었습니다.",
+            documents=uploaded,
+            job=IndexJobInfo(**job)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"대량 업로드 중 오류 발생: {str(e)}")
+
 # ============================================
 # 문서 인덱싱 API
 # ============================================
@@ -62,32 +117,25 @@ async def index_document(request: IndexRequest):
         document_id = request.document_id
 
         # 파일 경로 찾기
-        import os
-        from config import settings
-
-        file_path = None
-        for filename in os.listdir(settings.UPLOAD_DIR):
-            if filename.startswith(document_id):
-                file_path = os.path.join(settings.UPLOAD_DIR, filename)
-                original_filename = filename.replace(f"{document_id}_", "")
-                break
-
-        if not file_path:
+        found = await run_blocking(pdf_service.find_uploaded_file, document_id)
+        if not found:
             raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+        file_path, original_filename = found
 
-        # PDF 텍스트 추출 (페이지별)
-        pages_data, num_pages = pdf_service.extract_text_from_pdf(file_path)
-
-        # 텍스트 청킹 (페이지 정보 유지)
-        chunks = pdf_service.create_chunks(pages_data, document_id, original_filename)
+        # 페이지 → 청크 → 임베딩 배치 → 기록 파이프라인 (업로드 시 저장된 텍스트 재사용)
+        # 페이지 텍스트 로드 / PDF 열기도 이벤트 루프를 막지 않도록 스레드 풀에서 실행
+        num_pages, pages = await run_blocking(pdf_service.open_page_stream, document_id, file_path)
+        chunks = pdf_service.iter_chunks(pages, document_id, original_filename)
 
         # 벡터 DB에 저장
-        vector_service.add_documents(chunks, document_id, original_filename, num_pages)
+        chunk_count = await run_blocking(
+            vector_service.add_documents_stream, chunks, document_id, original_filename, num_pages
+        )
 
         return IndexResponse(
             success=True,
             message="문서 인덱싱이 완료되었습니다.",
-            chunks_created=len(chunks)
+            chunks_created=chunk_count
         )
 
     except HTTPException:
@@ -95,6 +143,65 @@ async def index_document(request: IndexRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"문서 인덱싱 중 오류 발생: {str(e)}")
 
+@router.post("/index/jobs", response_model=IndexJobResponse)
+async def create_index_job(request: IndexRequest):
+    """
+    백그라운드 인덱싱 작업 등록
+    """
+    if not pdf_service.find_uploaded_file(request.document_id):
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+
+    job = index_job_service.submit(request.document_id)
+
+    return IndexJobResponse(
+        success=True,
+        message="인덱싱 작업이 등록되었습니다.",
+        job=IndexJobInfo(**job)
+    )
+
+@router.get("/index/jobs", response_model=IndexJobListResponse)
+async def list_index_jobs():
+    """
+    인덱싱 작업 목록 조회
+    """
+    jobs = index_job_service.list_jobs()
+
+    return IndexJobListResponse(
+        success=True,
+        message="인덱싱 작업 목록 조회가 완료되었습니다.",
+        jobs=[IndexJobInfo(**job) for job in jobs]
+    )
+
+@router.get("/index/jobs/{job_id}", response_model=IndexJobResponse)
+async def get_index_job(job_id: str):
+    """
+    인덱싱 작업 상태 및 진행률 조회
+    """
+    job = index_job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    return IndexJobResponse(
+        success=True,
+        message="인덱싱 작업 조회가 완료되었습니다.",
+        job=IndexJobInfo(**job)
+    )
+
+@router.delete("/index/jobs/{job_id}", response_model=IndexJobResponse)
+async def cancel_index_job(job_id: str):
+    """
+    인덱싱 작업 취소
+    """
+    job = index_job_service.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    return IndexJobResponse(
+        success=True,
+        message="인덱싱 작업 취소가 요청되었습니다.",
+        job=IndexJobInfo(**job)
+    )
+
 # ============================================
 # 채팅 API
 # ============================================
@@ -106,7 +213,8 @@ async def chat(request: ChatRequest):
     """
     try:
         # RAG 서비스를 통한 답변 생성
-        answer, sources, conversation_id = rag_service.generate_answer(
+        answer, sources, conversation_id = await run_blocking(
+            rag_service.generate_answer,
             query=request.message,
             conversation_id=request.conversation_id
         )
@@ -133,6 +241,44 @@ async def chat(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"채팅 중 오류 발생: {str(e)}")
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    채팅 스트리밍 (Server-Sent Events)
+
+    검색 직후 sources 이벤트를 보내고, 이후 token 이벤트로 답변을 생성되는 대로 전송
+    """
+    async def event_stream():
+        try:
+            events = rag_service.stream_answer(
+                query=request.message,
+                conversation_id=request.conversation_id
+            )
+            async for event in iterate_blocking(events):
+                if event["type"] == "sources":
+                    event = {
+                        **event,
+                        "sources": [
+                            SourceDocument(
+                                document=src["document"],
+                                page=src["page"],
+                                score=src["score"],
+                                text=src["text"]
+                            ).dict()
+                            for src in event["sources"]
+                        ]
+                    }
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            error = {"type": "error", "detail": f"채팅 중 오류 발생: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ============================================
 # 검색 API
 # ============================================
@@ -143,8 +289,8 @@ async def query_documents(request: QueryRequest):
     문서 검색
     """
     try:
-        # 벡터 검색
-        results = vector_service.search(request.query, request.top_k)
+        # 벡터 검색 (top_k개 직접 검색 결과만 반환, 인접 페이지 확장은 채팅 컨텍스트에서만 사용)
+        results = await run_blocking(vector_service.search, request.query, request.top_k, False)
 
         # 결과를 SourceDocument 모델로 변환
         source_documents = [
@@ -170,13 +316,78 @@ async def query_documents(request: QueryRequest):
 # 문서 관리 API
 # ============================================
 
+def _encode_cursor(document: dict) -> str:
+    """문서 목록 커서 생성 (마지막 항목의 업로드 날짜, 문서 ID)"""
+    payload = json.dumps({"u": document["upload_date"], "i": document["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """문서 목록 커서 해석 (잘못된 커서면 ValueError)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(payload["u"]), str(payload["i"])
+    except Exception:
+        raise ValueError("잘못된 커서입니다.")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match 헤더가 ETag와 일치하는지 확인 (약한 비교)
+
+    Args:
+        if_none_match: If-None-Match 헤더 값 (쉼표로 구분된 ETag 목록 또는 "*")
+        etag: 현재 응답의 ETag
+
+    Returns:
+        일치하는 ETag가 있거나 "*"이면 True
+    """
+    if not if_none_match:
+        return False
+
+    def strip_weak(tag: str) -> str:
+        return tag[2:] if tag.startswith("W/") else tag
+
+    target = strip_weak(etag)
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag and strip_weak(tag) == target):
+            return True
+    return False
+
+
 @router.get("/documents", response_model=DocumentListResponse)
-async def get_documents():
+async def get_documents(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.DOCUMENTS_PAGE_SIZE, ge=1, le=settings.DOCUMENTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    prefix: Optional[str] = None
+):
     """
-    문서 목록 조회
+    문서 목록 조회 (업로드 날짜 내림차순, 커서 기반 페이지)
+
+    - limit: 페이지 크기
+    - cursor: 이전 응답의 next_cursor (없으면 첫 페이지)
+    - prefix: 파일명 접두어 필터
+    문서 목록이 바뀌지 않았으면 If-None-Match 요청에 304로 응답
     """
     try:
-        documents = vector_service.get_all_documents()
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # 버전을 먼저 읽어야 조회 도중 변경이 생겨도 오래된 목록에 새 ETag가 붙지 않음
+        version = vector_service.get_documents_version()
+        query_key = hashlib.md5(f"{limit}|{cursor or ''}|{prefix or ''}".encode("utf-8")).hexdigest()[:12]
+        etag = f'W/"docs-{version}-{query_key}"'
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        documents, has_more = vector_service.get_document_page(limit, after, prefix)
 
         # DocumentInfo 모델로 변환
         document_list = [
@@ -190,26 +401,76 @@ async def get_documents():
             for doc in documents
         ]
 
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
         return DocumentListResponse(
             success=True,
             message="문서 목록 조회가 완료되었습니다.",
-            documents=document_list
+            documents=document_list,
+            next_cursor=_encode_cursor(documents[-1]) if has_more else None
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"문서 목록 조회 중 오류 발생: {str(e)}")
 
+@router.post("/documents/{document_id}/reindex", response_model=ReindexResponse)
+async def reindex_document(document_id: str, file: Optional[UploadFile] = File(None)):
+    """
+    문서 증분 재인덱싱
+
+    새 PDF를 함께 보내면 기존 파일을 교체한 뒤 재인덱싱하고,
+    파일 없이 호출하면 저장된 페이지 텍스트로 다시 청킹하여 재인덱싱함.
+    추가/변경된 청크만 임베딩하고 없어진 청크는 삭제함
+    """
+    try:
+        if not await run_blocking(pdf_service.find_uploaded_file, document_id):
+            raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다.")
+
+        # 새 파일로 교체
+        if file is not None:
+            try:
+                await pdf_service.save_uploaded_stream(file, file.filename, document_id=document_id)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        file_path, original_filename = await run_blocking(pdf_service.find_uploaded_file, document_id)
+
+        # 페이지별 텍스트 (교체된 경우 새로 추출)
+        pages_data, num_pages = await run_blocking(pdf_service.get_page_texts, document_id, file_path)
+
+        # 텍스트 청킹 (페이지 정보 유지, CPU 작업이므로 작업 스레드에서 실행)
+        chunks = await run_blocking(pdf_service.create_chunks, pages_data, document_id, original_filename)
+
+        # 변경된 청크만 반영
+        stats = await run_blocking(
+            vector_service.reindex_document, chunks, document_id, original_filename, num_pages
+        )
+
+        return ReindexResponse(
+            success=True,
+            message="문서 재인덱싱이 완료되었습니다.",
+            chunks_added=stats["added"],
+            chunks_updated=stats["updated"],
+            chunks_removed=stats["removed"],
+            chunks_unchanged=stats["unchanged"]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"문서 재인덱싱 중 오류 발생: {str(e)}")
+
 @router.delete("/documents/{document_id}", response_model=DeleteResponse)
 async def delete_document(document_id: str):
     """
     문서 삭제
     """
     try:
-        # 벡터 DB에서 삭제
-        vector_deleted = vector_service.delete_document(document_id)
+        # 벡터 DB에서 삭제 (청크 조회/삭제 및 색인 갱신은 작업 스레드에서 실행)
+        vector_deleted = await run_blocking(vector_service.delete_document, document_id)
 
         # 파일 시스템에서 삭제
-        file_deleted = pdf_service.delete_file(document_id)
+        file_deleted = await run_blocking(pdf_service.delete_file, document_id)
 
         if vector_deleted or file_deleted:
             return DeleteResponse(
@@ -260,6 +521,41 @@ async def debug_page_chunks(page_number: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"디버깅 중 오류: {str(e)}")
 
+# ============================================
+# 캐시 API
+# ============================================
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    답변 캐시 / 쿼리 임베딩 캐시 통계 조회 (적중/실패 횟수)
+    """
+    return {
+        "success": True,
+        "answer_cache": answer_cache.get_stats(),
+        "query_embedding_cache": vector_service.query_embedding_cache.get_stats()
+    }
+
+@router.get("/prompt/stats")
+async def prompt_stats():
+    """
+    프롬프트 크기 통계 조회 (평균/최대 프롬프트 토큰 수, 컨텍스트에 포함된 검색 결과 비율)
+    """
+    return {
+        "success": True,
+        "prompt": rag_service.get_prompt_stats()
+    }
+
+@router.get("/rerank/stats")
+async def rerank_stats():
+    """
+    재순위화 통계 조회 (처리 쿼리 수, 시간 예산 초과 횟수, 평균 처리 시간)
+    """
+    return {
+        "success": True,
+        "reranker": rerank_service.get_stats()
+    }
+
 # ============================================
 # 헬스 체크 API
 # ============================================
@@ -273,3 +569,24 @@ async def health_check():
         "status": "healthy",
         "message": "RAG 시스템이 정상 작동 중입니다."
     }
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    서비스 준비 상태 확인 (임베딩 모델, ChromaDB, Gemini 모델 로드 여부)
+    """
+    components = {
+        "vector_service": vector_service.is_ready,
+        "rag_service": rag_service.is_ready
+    }
+    if settings.RERANK_ENABLED:
+        components["rerank_service"] = rerank_service.is_ready
+    ready = all(components.values())
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "components": components
+        }
+    )
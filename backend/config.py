@@ -14,25 +14,109 @@ class Settings:
     # ChromaDB 설정
     CHROMA_DB_PATH: str = os.getenv("CHROMA_DB_PATH", "./chroma_db")
     COLLECTION_NAME: str = os.getenv("COLLECTION_NAME", "pdf_documents")
+    # 설정하면 로컬 파일 대신 ChromaDB 서버에 연결 (여러 워커 실행 시 필요)
+    CHROMA_HOST: str = os.getenv("CHROMA_HOST", "")
+    CHROMA_PORT: int = int(os.getenv("CHROMA_PORT", "8001"))
+
+    # 문서 메타데이터 / 코퍼스 버전 / 인덱싱 작업 저장소 (SQLite, 워커 간 공유)
+    METADATA_DB_PATH: str = os.getenv("METADATA_DB_PATH", os.path.join(CHROMA_DB_PATH, "metadata.db"))
 
     # 임베딩 모델 설정
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "jhgan/ko-sroberta-multitask")
+    # 임베딩 백엔드: torch, torch-int8, onnx, onnx-int8
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    # ONNX int8 양자화 설정 (onnx-int8 백엔드)
+    ONNX_MODEL_DIR: str = os.getenv("ONNX_MODEL_DIR", "./onnx_models")
+    ONNX_QUANTIZATION_CONFIG: str = os.getenv("ONNX_QUANTIZATION_CONFIG", "avx2")  # arm64, avx2, avx512, avx512_vnni
+    ONNX_QUANTIZED_FILE: str = os.getenv(
+        "ONNX_QUANTIZED_FILE", f"onnx/model_qint8_{os.getenv('ONNX_QUANTIZATION_CONFIG', 'avx2')}.onnx"
+    )
 
     # 파일 업로드 설정
-    MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB in bytes
+    MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", str(50 * 1024 * 1024)))  # 50MB in bytes
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 업로드 스트리밍 단위 (1MB)
     ALLOWED_EXTENSIONS: set = {".pdf"}
+    # 업로드 시 추출한 페이지별 텍스트 저장 위치 (인덱싱 시 PDF 재파싱 방지)
+    PAGE_TEXT_DIR: str = os.getenv("PAGE_TEXT_DIR", os.path.join(UPLOAD_DIR, ".pages"))
 
     # 청킹 설정
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "1000"))
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "200"))
 
+    # PDF 텍스트 추출 설정 (프로세스 수가 1이면 순차 추출)
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "50"))
+
+    # 청크 임베딩 저장소 (텍스트 해시 기반, 재인덱싱 시 동일 청크 재사용)
+    EMBEDDING_STORE_ENABLED: bool = os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() == "true"
+    EMBEDDING_STORE_DIR: str = os.getenv("EMBEDDING_STORE_DIR", os.path.join(CHROMA_DB_PATH, "embedding_store"))
+
+    # 인덱싱 설정
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    INDEX_WORKERS: int = int(os.getenv("INDEX_WORKERS", "1"))  # 동시에 실행할 인덱싱 작업 수
+    INDEX_JOB_HISTORY: int = int(os.getenv("INDEX_JOB_HISTORY", "200"))  # 보관할 완료 작업 수
+    INDEX_PROGRESS_INTERVAL: float = float(os.getenv("INDEX_PROGRESS_INTERVAL", "0.5"))  # 진행률 저장/취소 확인 최소 간격 (초)
+    CHROMA_WRITE_BATCH_SIZE: int = int(os.getenv("CHROMA_WRITE_BATCH_SIZE", "1000"))  # ChromaDB 1회 기록 최대 청크 수
+    CHROMA_WRITE_RETRIES: int = int(os.getenv("CHROMA_WRITE_RETRIES", "3"))  # 배치 기록 실패 시 재시도 횟수
+    CHROMA_WRITE_RETRY_DELAY: float = float(os.getenv("CHROMA_WRITE_RETRY_DELAY", "0.5"))  # 재시도 대기 시간 (초, 시도마다 2배)
+    INDEX_PREFETCH_CHUNKS: int = int(os.getenv("INDEX_PREFETCH_CHUNKS", "256"))  # 임베딩 대기 중인 청크 최대 수
+
+    # 대량 수집 설정 (여러 문서를 묶어서 임베딩/기록)
+    BULK_EMBED_BATCH_SIZE: int = int(os.getenv("BULK_EMBED_BATCH_SIZE", "256"))  # 문서 간 임베딩 배치 크기
+    BULK_EXTRACT_WORKERS: int = int(os.getenv("BULK_EXTRACT_WORKERS", "2"))  # 동시에 추출할 문서 수
+    BULK_QUEUE_SIZE: int = int(os.getenv("BULK_QUEUE_SIZE", "8"))  # 임베딩 대기 중인 문서 최대 수
+
     # 검색 설정
     DEFAULT_TOP_K: int = int(os.getenv("DEFAULT_TOP_K", "10"))
+    MAX_ADJACENT_CHUNKS: int = int(os.getenv("MAX_ADJACENT_CHUNKS", "5"))  # 검색 결과에 추가할 인접 페이지 청크 최대 수
+    SEARCH_MODE: str = os.getenv("SEARCH_MODE", "hybrid")  # vector: 벡터 검색만, hybrid: BM25 + 벡터 (RRF 결합)
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", "30"))  # 각 검색기에서 가져올 후보 수
+    RRF_K: int = int(os.getenv("RRF_K", "60"))  # Reciprocal Rank Fusion 상수
+
+    # 컨텍스트 설정 (프롬프트에 넣을 검색 결과 크기 제한)
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "4000"))
+    CONTEXT_CHARS_PER_TOKEN: float = float(os.getenv("CONTEXT_CHARS_PER_TOKEN", "2.0"))  # 토큰 수 추정용 (한국어 기준 근사값)
+
+    # 재순위화 설정 (Cross-encoder, CPU)
+    RERANK_ENABLED: bool = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANKER_MODEL: str = os.getenv("RERANKER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+    RERANK_CANDIDATES: int = int(os.getenv("RERANK_CANDIDATES", "30"))  # 1차 검색에서 가져올 후보 수
+    RERANK_TOP_N: int = int(os.getenv("RERANK_TOP_N", "5"))  # 재순위화 후 남길 결과 수
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+    RERANK_TIME_BUDGET_MS: int = int(os.getenv("RERANK_TIME_BUDGET_MS", "300"))  # 쿼리당 재순위화 시간 예산
+
+    # 쿼리 임베딩 캐시 설정
+    QUERY_EMBEDDING_CACHE_SIZE: int = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+    # 비어있지 않으면 종료 시 이 경로(.npz)에 캐시를 저장하고 시작 시 다시 로드
+    QUERY_EMBEDDING_CACHE_PATH: str = os.getenv("QUERY_EMBEDDING_CACHE_PATH", "")
+
+    # 대화 이력 설정 (SQLite 저장, 최근 대화만 메모리에 보관)
+    CONVERSATION_DB_PATH: str = os.getenv("CONVERSATION_DB_PATH", os.path.join(CHROMA_DB_PATH, "conversations.db"))
+    CONVERSATION_CACHE_SIZE: int = int(os.getenv("CONVERSATION_CACHE_SIZE", "1000"))
+    CONVERSATION_CACHE_TTL: int = int(os.getenv("CONVERSATION_CACHE_TTL", "1800"))  # 초 (유휴 대화를 메모리에서 제거)
+
+    # 답변 캐시 설정
+    ANSWER_CACHE_SIZE: int = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+    ANSWER_CACHE_TTL: int = int(os.getenv("ANSWER_CACHE_TTL", "3600"))  # 초
+    # 질문 임베딩 유사도가 이 값 이상이면 캐시 적중으로 처리 (0이면 정확히 같은 질문만 적중)
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0"))
+
+    # 문서 목록 API 설정 (/api/documents 커서 페이지 크기)
+    DOCUMENTS_PAGE_SIZE: int = int(os.getenv("DOCUMENTS_PAGE_SIZE", "100"))
+    DOCUMENTS_MAX_PAGE_SIZE: int = int(os.getenv("DOCUMENTS_MAX_PAGE_SIZE", "1000"))
+
+    # 작업 스레드 풀 설정 (임베딩, 벡터 검색, LLM 호출 등 블로킹 작업용)
+    WORKER_POOL_SIZE: int = int(os.getenv("WORKER_POOL_SIZE", "8"))
+
+    # 서버 시작 시 모델/DB를 백그라운드에서 미리 로드할지 여부 (끄면 첫 요청 시 로드)
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
 
     # 서버 설정
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    # uvicorn 워커 프로세스 수 (1보다 크면 자동 재시작(reload) 비활성화)
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
 
     # CORS 설정
     CORS_ORIGINS: list = [
@@ -45,6 +129,7 @@ class Settings:
     def __init__(self):
         # 업로드 디렉토리가 없으면 생성
         os.makedirs(self.UPLOAD_DIR, exist_ok=True)
+        os.makedirs(self.PAGE_TEXT_DIR, exist_ok=True)
         os.makedirs(self.CHROMA_DB_PATH, exist_ok=True)
 
 # 전역 설정 인스턴스
@@ -3,7 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from api.routes import router
 from config import settings
+from utils.executor import run_blocking, shutdown_executor, shutdown_process_pool
+from services.vector_service import vector_service
+from services.rag_service import rag_service
+from services.rerank_service import rerank_service
+from services.job_service import index_job_service
+from services.pdf_service import pdf_service
+from services.metadata_store import metadata_store
 import os
+import time
+import asyncio
 
 # FastAPI 애플리케이션 생성
 app = FastAPI(
@@ -24,6 +33,18 @@ app.add_middleware(
 # API 라우터 등록
 app.include_router(router, prefix="/api", tags=["API"])
 
+def warm_up_services():
+    """임베딩 모델, ChromaDB, Gemini 모델 (재순위화 사용 시 Cross-encoder) 미리 로드"""
+    started = time.perf_counter()
+    try:
+        vector_service.warm_up()
+        rag_service.warm_up()
+        if settings.RERANK_ENABLED:
+            rerank_service.warm_up()
+        print(f"서비스 준비 완료 ({time.perf_counter() - started:.1f}초)")
+    except Exception as e:
+        print(f"서비스 준비 중 오류: {str(e)}")
+
 # 시작 이벤트
 @app.on_event("startup")
 async def startup_event():
@@ -35,12 +56,32 @@ async def startup_event():
     print(f"API 문서: http://{settings.HOST}:{settings.PORT}/docs")
     print(f"ChromaDB 경로: {settings.CHROMA_DB_PATH}")
     print(f"업로드 디렉토리: {settings.UPLOAD_DIR}")
+    print(f"작업 스레드 풀 크기: {settings.WORKER_POOL_SIZE}")
+    print(f"인덱싱 워커 수: {settings.INDEX_WORKERS}")
+    print(f"서버 워커 프로세스 수: {settings.WORKERS}")
+    print(f"검색 모드: {settings.SEARCH_MODE}")
+    print(f"재순위화: {settings.RERANKER_MODEL if settings.RERANK_ENABLED else '사용 안 함'}")
     print("=" * 60)
 
+    # 예전 방식(JSON 파일)으로 저장된 문서 메타데이터 가져오기
+    metadata_store.import_legacy_json(os.path.join(settings.CHROMA_DB_PATH, "documents_metadata.json"))
+
+    # 예전 방식(하위 디렉토리 없이)으로 저장된 업로드 파일 / 페이지 텍스트 이동
+    pdf_service.migrate_flat_layout()
+
+    # 모델 로드는 백그라운드에서 진행 (준비 상태는 /api/ready로 확인)
+    if settings.WARMUP_ON_STARTUP:
+        app.state.warmup_task = asyncio.create_task(run_blocking(warm_up_services))
+
 # 종료 이벤트
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료 시 실행"""
+    shutdown_executor()
+    index_job_service.shutdown()
+    shutdown_process_pool()
+    vector_service.query_embedding_cache.save()
+    rag_service.conversations.close()
     print("RAG 시스템 서버 종료")
 
 # 루트 엔드포인트
@@ -57,9 +98,14 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
 
+    if settings.WORKERS > 1 and not settings.CHROMA_HOST:
+        print("경고: 여러 워커에서 로컬 ChromaDB 파일을 함께 쓰면 다른 워커의 변경이 보이지 않을 수 있습니다. "
+              "CHROMA_HOST로 ChromaDB 서버를 지정하세요.")
+
     uvicorn.run(
         "main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=True
+        workers=settings.WORKERS,
+        reload=settings.WORKERS == 1
     )
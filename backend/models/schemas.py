@@ -24,6 +24,37 @@ class IndexResponse(BaseResponse):
     """문서 인덱싱 응답"""
     chunks_created: Optional[int] = None
 
+class IndexJobInfo(BaseModel):
+    """인덱싱 작업 정보"""
+    job_id: str
+    document_id: Optional[str] = None
+    document_ids: List[str] = []
+    documents_done: int = 0
+    pages_per_sec: Optional[float] = None
+    status: str
+    pages_extracted: int = 0
+    total_pages: int = 0
+    chunks_embedded: int = 0
+    total_chunks: int = 0
+    rows_written: int = 0
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+class IndexJobResponse(BaseResponse):
+    """인덱싱 작업 응답"""
+    job: Optional[IndexJobInfo] = None
+
+class BulkUploadResponse(BaseResponse):
+    """대량 업로드 응답"""
+    documents: Optional[List[UploadResponse]] = None
+    job: Optional[IndexJobInfo] = None
+
+class IndexJobListResponse(BaseResponse):
+    """인덱싱 작업 목록 응답"""
+    jobs: Optional[List[IndexJobInfo]] = None
+
 # 채팅 관련
 class ChatRequest(BaseModel):
     """채팅 요청"""
@@ -65,6 +96,14 @@ class DocumentInfo(BaseModel):
 class DocumentListResponse(BaseResponse):
     """문서 목록 응답"""
     documents: Optional[List[DocumentInfo]] = None
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (마지막 페이지면 None)
+
+class ReindexResponse(BaseResponse):
+    """문서 재인덱싱 응답"""
+    chunks_added: Optional[int] = None
+    chunks_updated: Optional[int] = None
+    chunks_removed: Optional[int] = None
+    chunks_unchanged: Optional[int] = None
 
 class DeleteResponse(BaseResponse):
     """삭제 응답"""
@@ -0,0 +1,295 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional
+import numpy as np
+from config import settings
+
+class AnswerCache:
+    """RAG 답변 캐시 (LRU + TTL, 선택적 질문 임베딩 유사도 매칭)"""
+
+    def __init__(self, max_size: int = None, ttl: int = None, similarity_threshold: float = None):
+        self.max_size = max_size if max_size is not None else settings.ANSWER_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else settings.ANSWER_CACHE_TTL
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None
+            else settings.ANSWER_CACHE_SIMILARITY_THRESHOLD
+        )
+
+        # 정규화된 질문 키 -> 캐시 항목 (삽입/조회 순서로 LRU 관리)
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 캐시가 만들어진 시점의 코퍼스 버전 (문서 추가/삭제 시 전체 무효화)
+        self._corpus_version = None
+
+        # 통계
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        """임베딩 유사도 매칭 사용 여부"""
+        return self.similarity_threshold > 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """질문 정규화 (대소문자, 공백, 끝 문장부호 통일)"""
+        return " ".join(query.lower().split()).rstrip("?!.？！。 ")
+
+    def _make_key(self, query: str, top_k: Optional[int]) -> str:
+        return f"{top_k}|{self.normalize_query(query)}"
+
+    def _sync_version(self, corpus_version: int):
+        """코퍼스 버전이 바뀌었으면 캐시 전체 무효화 (lock 보유 상태에서 호출)"""
+        if self._corpus_version != corpus_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._corpus_version = corpus_version
+
+    def _is_expired(self, entry: Dict, now: float) -> bool:
+        return self.ttl > 0 and now - entry["created_at"] > self.ttl
+
+    def get(
+        self,
+        query: str,
+        top_k: Optional[int],
+        corpus_version: int,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Optional[Dict]:
+        """
+        캐시된 답변 조회
+
+        Args:
+            query: 사용자 질문
+            top_k: 검색 문서 개수
+            corpus_version: 현재 코퍼스 버전
+            query_embedding: 질문 임베딩 (유사도 매칭 사용 시)
+
+        Returns:
+            {"answer": str, "sources": list} 또는 None
+        """
+        key = self._make_key(query, top_k)
+        now = time.time()
+
+        with self._lock:
+            self._sync_version(corpus_version)
+
+            # 정확히 일치하는 질문
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_expired(entry, now):
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.exact_hits += 1
+                    return {"answer": entry["answer"], "sources": entry["sources"]}
+
+            # 임베딩 최근접 이웃 매칭
+            if self.semantic_enabled and query_embedding is not None:
+                query_embedding = self._normalize_embedding(query_embedding)
+                best_key, best_score = None, self.similarity_threshold
+                for candidate_key, candidate in list(self._entries.items()):
+                    if self._is_expired(candidate, now):
+                        del self._entries[candidate_key]
+                        continue
+                    if candidate["top_k"] != top_k or candidate["embedding"] is None:
+                        continue
+                    score = float(np.dot(candidate["embedding"], query_embedding))
+                    if score >= best_score:
+                        best_key, best_score = candidate_key, score
+
+                if best_key is not None:
+                    entry = self._entries[best_key]
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    return {"answer": entry["answer"], "sources": entry["sources"]}
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        query: str,
+        top_k: Optional[int],
+        corpus_version: int,
+        answer: str,
+        sources: List[Dict],
+        query_embedding: Optional[np.ndarray] = None
+    ):
+        """
+        답변 캐시에 저장
+
+        Args:
+            query: 사용자 질문
+            top_k: 검색 문서 개수
+            corpus_version: 답변 생성 시점의 코퍼스 버전
+            answer: 생성된 답변
+            sources: 출처 문서
+            query_embedding: 질문 임베딩 (유사도 매칭 사용 시)
+        """
+        if self.max_size <= 0:
+            return
+
+        key = self._make_key(query, top_k)
+
+        with self._lock:
+            self._sync_version(corpus_version)
+            self._entries[key] = {
+                "answer": answer,
+                "sources": sources,
+                "top_k": top_k,
+                "embedding": self._normalize_embedding(query_embedding),
+                "created_at": time.time()
+            }
+            self._entries.move_to_end(key)
+
+            # LRU 제거
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _normalize_embedding(embedding: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """코사인 유사도 계산을 위한 단위 벡터화"""
+        if embedding is None:
+            return None
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """캐시 통계 조회"""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            total = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "similarity_threshold": self.similarity_threshold,
+                "hits": hits,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations
+            }
+
+class EmbeddingCache:
+    """
+    쿼리 텍스트 -> 임베딩 LRU 캐시 (선택적 디스크 저장)
+
+    디스크 파일에는 임베딩을 만든 모델(model_key)과 차원을 함께 저장하며,
+    로드 시 현재 모델과 다르면 파일을 사용하지 않음
+    """
+
+    def __init__(self, max_size: int, path: str = "", model_key: str = ""):
+        self.max_size = max_size
+        self.path = path
+        self.model_key = model_key
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+
+        if self.path:
+            self.load()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """캐시된 임베딩 조회"""
+        with self._lock:
+            embedding = self._entries.get(text)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text)
+            self.hits += 1
+            return embedding
+
+    def put(self, text: str, embedding: np.ndarray):
+        """임베딩 저장 (용량 초과 시 가장 오래된 항목 제거)"""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[text] = np.asarray(embedding, dtype=np.float32)
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def load(self):
+        """디스크에서 캐시 로드"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                model_key = str(data["model"]) if "model" in data else None
+                dimension = int(data["dimension"]) if "dimension" in data else None
+                texts = data["texts"].tolist()
+                embeddings = data["embeddings"]
+
+            # 다른 모델/백엔드로 만든 캐시는 차원이나 벡터 공간이 다르므로 버림
+            if model_key != self.model_key or embeddings.ndim != 2 or embeddings.shape[1] != dimension:
+                print(f"쿼리 임베딩 캐시를 사용하지 않습니다: 저장된 모델 {model_key} (차원 {dimension}), "
+                      f"현재 모델 {self.model_key}")
+                return
+
+            with self._lock:
+                for text, embedding in zip(texts[-self.max_size:], embeddings[-self.max_size:]):
+                    self._entries[text] = embedding
+            print(f"쿼리 임베딩 캐시 로드 완료: {len(self._entries)}개")
+        except Exception as e:
+            print(f"쿼리 임베딩 캐시 로드 실패: {e}")
+
+    def save(self):
+        """캐시를 디스크에 저장 (임시 파일에 쓴 뒤 교체)"""
+        if not self.path:
+            return
+
+        with self._lock:
+            if not self._entries:
+                return
+            texts = np.array(list(self._entries.keys()))
+            embeddings = np.stack(list(self._entries.values()))
+
+        try:
+            temp_path = f"{self.path}.tmp.npz"
+            np.savez(
+                temp_path,
+                model=np.array(self.model_key),
+                dimension=np.array(embeddings.shape[1]),
+                texts=texts,
+                embeddings=embeddings
+            )
+            os.replace(temp_path, self.path)
+            print(f"쿼리 임베딩 캐시 저장 완료: {len(texts)}개")
+        except Exception as e:
+            print(f"쿼리 임베딩 캐시 저장 실패: {e}")
+
+    def get_stats(self) -> Dict:
+        """캐시 통계 조회"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+# 전역 캐시 인스턴스
+answer_cache = AnswerCache()
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Optional
+from config import settings
+
+# 출처에서 저장할 필드 (청크 텍스트는 저장하지 않고 chunk_id로 참조)
+SOURCE_REF_FIELDS = ("chunk_id", "document", "page", "score", "source_type")
+
+class ConversationStore:
+    """
+    대화 이력 저장소
+
+    - 디스크: SQLite (WAL 모드, 여러 워커 프로세스가 같은 파일 공유)
+    - 메모리: 최근 대화만 LRU로 보관 (최대 개수 / 유휴 TTL 제한)
+    출처는 청크 텍스트 대신 chunk_id 참조로 저장함
+    """
+
+    def __init__(self, db_path: str = None, max_size: int = None, ttl: int = None):
+        self.db_path = db_path or settings.CONVERSATION_DB_PATH
+        self.max_size = settings.CONVERSATION_CACHE_SIZE if max_size is None else max_size
+        self.ttl = settings.CONVERSATION_CACHE_TTL if ttl is None else ttl
+
+        self._lock = threading.Lock()
+        # conversation_id -> (마지막 사용 시각, 대화)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                conversation_id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                sources TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation_id, id);
+        """)
+        self._conn.commit()
+
+    def append_turn(self, conversation_id: str, query: str, answer: str, sources: List[Dict]):
+        """
+        질문/답변 한 쌍 추가 (하나의 트랜잭션)
+
+        Args:
+            conversation_id: 대화 세션 ID
+            query: 사용자 질문
+            answer: 시스템 답변
+            sources: 출처 문서 (chunk_id 참조로 변환하여 저장)
+        """
+        now = datetime.now().isoformat()
+        source_refs = [
+            {field: source.get(field) for field in SOURCE_REF_FIELDS}
+            for source in sources
+        ]
+        user_message = {"role": "user", "content": query, "timestamp": now}
+        assistant_message = {"role": "assistant", "content": answer, "timestamp": now, "sources": source_refs}
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO conversations (conversation_id, created_at, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(conversation_id) DO UPDATE SET updated_at = excluded.updated_at",
+                    (conversation_id, now, now)
+                )
+                self._conn.executemany(
+                    "INSERT INTO messages (conversation_id, role, content, timestamp, sources) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (conversation_id, "user", query, now, None),
+                        (conversation_id, "assistant", answer, now, json.dumps(source_refs, ensure_ascii=False))
+                    ]
+                )
+
+            # 캐시에 있는 대화는 그대로 이어 붙임
+            entry = self._cache.get(conversation_id)
+            if entry is not None:
+                entry[1]["messages"].extend([user_message, assistant_message])
+                self._touch(conversation_id, entry[1])
+
+    def get(self, conversation_id: str) -> Optional[Dict]:
+        """
+        대화 조회
+
+        캐시된 대화는 메시지 수가 디스크와 같을 때만 사용 (다른 워커가 추가한 경우 다시 로드)
+
+        Args:
+            conversation_id: 대화 세션 ID
+
+        Returns:
+            {"conversation_id": str, "messages": [...]} 또는 None
+        """
+        with self._lock:
+            self._evict_expired()
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()[0]
+
+            entry = self._cache.get(conversation_id)
+            if entry is not None and len(entry[1]["messages"]) == count:
+                self.hits += 1
+                self._touch(conversation_id, entry[1])
+                return entry[1]
+
+            self.misses += 1
+            if count == 0:
+                self._cache.pop(conversation_id, None)
+                return None
+
+            rows = self._conn.execute(
+                "SELECT role, content, timestamp, sources FROM messages WHERE conversation_id = ? ORDER BY id",
+                (conversation_id,)
+            ).fetchall()
+            messages = []
+            for role, content, timestamp, sources in rows:
+                message = {"role": role, "content": content, "timestamp": timestamp}
+                if sources is not None:
+                    message["sources"] = json.loads(sources)
+                messages.append(message)
+
+            conversation = {"conversation_id": conversation_id, "messages": messages}
+            self._touch(conversation_id, conversation)
+            return conversation
+
+    def delete(self, conversation_id: str) -> bool:
+        """
+        대화 삭제
+
+        Args:
+            conversation_id: 대화 세션 ID
+
+        Returns:
+            삭제 성공 여부 (대화가 없으면 False)
+        """
+        with self._lock:
+            self._cache.pop(conversation_id, None)
+            with self._conn:
+                self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+                deleted = self._conn.execute(
+                    "DELETE FROM conversations WHERE conversation_id = ?", (conversation_id,)
+                ).rowcount
+        return deleted > 0
+
+    def _touch(self, conversation_id: str, conversation: Dict):
+        """캐시 항목을 최근 사용으로 갱신 후 크기 제한 (lock 보유 상태에서 호출)"""
+        self._cache[conversation_id] = (time.time(), conversation)
+        self._cache.move_to_end(conversation_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _evict_expired(self):
+        """유휴 TTL이 지난 캐시 항목 제거 (lock 보유 상태에서 호출)"""
+        if self.ttl <= 0:
+            return
+        expire_before = time.time() - self.ttl
+        while self._cache:
+            conversation_id, (last_used, _) = next(iter(self._cache.items()))
+            if last_used >= expire_before:
+                break
+            self._cache.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        """저장소 통계"""
+        with self._lock:
+            conversations = self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+            return {
+                "conversations": conversations,
+                "cached": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def close(self):
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            self._conn.close()
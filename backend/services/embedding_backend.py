@@ -0,0 +1,88 @@
+import os
+from config import settings
+
+# 지원하는 임베딩 백엔드
+# - torch: SentenceTransformer 기본 (fp32 PyTorch)
+# - torch-int8: PyTorch 동적 int8 양자화 (Linear 레이어)
+# - onnx: ONNX Runtime (optimum[onnxruntime] 필요, ONNX 파일이 없으면 최초 로드 시 변환)
+# - onnx-int8: ONNX Runtime + int8 양자화 모델 (ONNX_QUANTIZED_FILE)
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def load_embedding_model(backend: str = None, model_name: str = None):
+    """
+    설정된 백엔드로 임베딩 모델 로드
+
+    반환되는 모델은 모두 SentenceTransformer 인터페이스(encode)를 따름
+
+    Args:
+        backend: 임베딩 백엔드 (기본값: settings.EMBEDDING_BACKEND)
+        model_name: 모델 이름 (기본값: settings.EMBEDDING_MODEL)
+
+    Returns:
+        SentenceTransformer 모델
+    """
+    from sentence_transformers import SentenceTransformer
+
+    backend = backend or settings.EMBEDDING_BACKEND
+    model_name = model_name or settings.EMBEDDING_MODEL
+
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {backend} (가능한 값: {', '.join(EMBEDDING_BACKENDS)})")
+
+    print(f"임베딩 모델 로드 중: {model_name} (백엔드: {backend})")
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    if backend == "torch-int8":
+        import torch
+
+        model = SentenceTransformer(model_name, device="cpu")
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name, device="cpu", backend="onnx")
+
+    # onnx-int8: 이전에 변환해 둔 양자화 모델이 있으면 바로 로드하고, 없을 때만 변환
+    for model_dir in (model_name, _quantized_onnx_dir(model_name)):
+        if os.path.isfile(os.path.join(model_dir, settings.ONNX_QUANTIZED_FILE)):
+            print(f"양자화 ONNX 모델 사용: {model_dir}")
+            return _load_quantized_onnx(model_dir)
+
+    print(f"양자화 ONNX 모델이 없어 새로 생성합니다: {_quantized_onnx_dir(model_name)}")
+    return _export_quantized_onnx(model_name)
+
+
+def _quantized_onnx_dir(model_name: str) -> str:
+    """양자화 ONNX 모델 저장 경로 (ONNX_MODEL_DIR/<모델 이름>)"""
+    return os.path.join(settings.ONNX_MODEL_DIR, model_name.replace("/", "__"))
+
+
+def _load_quantized_onnx(model_dir: str):
+    """저장된 양자화 ONNX 모델 로드"""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(
+        model_dir,
+        device="cpu",
+        backend="onnx",
+        model_kwargs={"file_name": settings.ONNX_QUANTIZED_FILE}
+    )
+
+
+def _export_quantized_onnx(model_name: str):
+    """ONNX 모델을 int8로 동적 양자화하여 로컬에 저장한 뒤 로드"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    output_dir = _quantized_onnx_dir(model_name)
+    model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    model.save(output_dir)
+    export_dynamic_quantized_onnx_model(
+        model,
+        quantization_config=settings.ONNX_QUANTIZATION_CONFIG,
+        model_name_or_path=output_dir
+    )
+
+    return _load_quantized_onnx(output_dir)
@@ -0,0 +1,178 @@
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Optional
+import numpy as np
+from config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작 (단일 워커)
+    fcntl = None
+
+class EmbeddingStore:
+    """
+    청크 임베딩 저장소 (텍스트 내용 해시 기반)
+
+    (모델 이름 + 텍스트)의 SHA-256 해시를 키로 float32 벡터를 저장하여
+    재인덱싱이나 개정판 업로드 시 동일한 청크를 다시 임베딩하지 않음
+
+    파일 구성 (모델별 디렉토리):
+        meta.json    - 모델 이름, 벡터 차원
+        keys.bin     - 32바이트 해시 키 (행 순서)
+        vectors.f32  - float32 벡터 (행 순서, 메모리 맵으로 조회)
+        .lock        - 여러 워커 프로세스의 쓰기 직렬화용 잠금 파일
+
+    다른 프로세스가 추가한 행은 키 파일 크기 변화로 감지하여 다시 읽음
+    """
+
+    KEY_SIZE = 32
+
+    def __init__(self, model_name: str, root_dir: str = None):
+        self.model_name = model_name
+        root_dir = root_dir or settings.EMBEDDING_STORE_DIR
+        self.store_dir = os.path.join(root_dir, model_name.replace("/", "__"))
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self.meta_path = os.path.join(self.store_dir, "meta.json")
+        self.keys_path = os.path.join(self.store_dir, "keys.bin")
+        self.vectors_path = os.path.join(self.store_dir, "vectors.f32")
+        self.lock_path = os.path.join(self.store_dir, ".lock")
+
+        self._lock = threading.Lock()
+        self.dim: Optional[int] = None
+        self._index: Dict[bytes, int] = {}
+        self._vectors: Optional[np.memmap] = None
+
+        self._load()
+
+    def _make_key(self, text: str) -> bytes:
+        """(모델 이름 + 텍스트) 해시 키"""
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).digest()
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 쓰기 잠금"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        """키 인덱스 로드 및 벡터 파일 메모리 맵"""
+        self._refresh()
+        if self.dim is not None:
+            print(f"임베딩 저장소 로드 완료: {len(self._index)}개 벡터 ({self.store_dir})")
+
+    def _refresh(self):
+        """다른 프로세스가 추가한 행 반영 (lock 보유 상태 또는 초기화 시 호출)"""
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.dim = json.load(f)["dim"]
+
+        known_rows = len(self._index)
+        if not os.path.exists(self.keys_path):
+            return
+        if os.path.getsize(self.keys_path) // self.KEY_SIZE <= known_rows:
+            return
+
+        with open(self.keys_path, 'rb') as f:
+            f.seek(known_rows * self.KEY_SIZE)
+            keys = f.read()
+
+        # 쓰기 도중 중단된 경우 키와 벡터가 모두 있는 행까지만 사용
+        vector_rows = 0
+        if os.path.exists(self.vectors_path):
+            vector_rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+        rows = min(known_rows + len(keys) // self.KEY_SIZE, vector_rows)
+
+        for row in range(known_rows, rows):
+            offset = (row - known_rows) * self.KEY_SIZE
+            self._index[keys[offset:offset + self.KEY_SIZE]] = row
+        self._remap(rows)
+
+    def _remap(self, rows: int):
+        """벡터 파일 메모리 맵 갱신"""
+        self._vectors = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+            if rows > 0 else None
+        )
+
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        저장된 임베딩 조회
+
+        Args:
+            texts: 청크 텍스트 리스트
+
+        Returns:
+            {texts 내 인덱스: 임베딩 벡터} (저장된 항목만)
+        """
+        found = {}
+        with self._lock:
+            self._refresh()
+            if self._vectors is None:
+                return found
+            for idx, text in enumerate(texts):
+                row = self._index.get(self._make_key(text))
+                if row is not None:
+                    found[idx] = np.array(self._vectors[row])
+        return found
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        임베딩 저장 (이미 있는 텍스트는 건너뜀)
+
+        Args:
+            texts: 청크 텍스트 리스트
+            vectors: 임베딩 배열 (len(texts) x dim)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self.meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+
+            new_keys, new_rows, seen = [], [], set()
+            for text, vector in zip(texts, vectors):
+                key = self._make_key(text)
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+
+            if not new_keys:
+                return
+
+            # 벡터를 먼저 기록하고 키를 나중에 기록 (중단 시 키 없는 벡터는 무시됨)
+            start_row = len(self._index)
+            with open(self.vectors_path, 'ab') as f:
+                f.seek(start_row * self.dim * 4)
+                f.truncate()
+                f.write(np.stack(new_rows).astype(np.float32).tobytes())
+            with open(self.keys_path, 'ab') as f:
+                f.seek(start_row * self.KEY_SIZE)
+                f.truncate()
+                f.write(b"".join(new_keys))
+
+            for offset, key in enumerate(new_keys):
+                self._index[key] = start_row + offset
+            self._remap(len(self._index))
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -0,0 +1,223 @@
+import time
+import queue
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Callable
+from config import settings
+from services.pdf_service import pdf_service
+from services.vector_service import vector_service
+
+class BulkIngestService:
+    """
+    여러 PDF 문서 대량 수집 파이프라인
+
+    - 추출: 별도 스레드에서 문서별 텍스트 추출 및 청킹 (임베딩과 동시에 진행)
+    - 임베딩: 여러 문서의 청크를 모아 BULK_EMBED_BATCH_SIZE 크기 배치로 임베딩 (모델에도 같은 크기로 전달)
+    - 기록: 임베딩된 청크를 CHROMA_WRITE_BATCH_SIZE개씩 모아 ChromaDB에 기록
+    추출 결과 큐의 크기를 제한하여 임베딩이 밀리면 추출도 대기함.
+    도중에 실패하거나 취소되면 메타데이터를 저장하지 못한 문서의 청크를 삭제함
+    """
+
+    def ingest(
+        self,
+        documents: List[Dict],
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> Dict:
+        """
+        문서 목록 수집
+
+        Args:
+            documents: [{"document_id": str, "file_path": str, "filename": str}, ...]
+            progress_callback: 진행률 콜백 (단계, 완료 수, 전체 수)
+                단계: "extracted"(페이지), "embedded"/"written"(청크), "documents"(문서)
+
+        Returns:
+            수집 결과 통계
+        """
+        started = time.perf_counter()
+        print(f"\n=== 대량 수집 시작: 문서 {len(documents)}개 ===")
+
+        extracted_queue: "queue.Queue" = queue.Queue(maxsize=settings.BULK_QUEUE_SIZE)
+        stop_event = threading.Event()
+        sentinel = object()
+
+        stats = {
+            "documents": len(documents),
+            "documents_indexed": 0,
+            "failed": [],
+            "pages": 0,
+            "chunks": 0
+        }
+        counters = {"pages_extracted": 0, "chunks_embedded": 0, "chunks_written": 0}
+
+        # 추출 진행률의 전체 페이지 수 (문서별 페이지 수를 미리 셈)
+        page_counts = {
+            document["document_id"]: pdf_service.count_pages(document["document_id"], document["file_path"])
+            for document in documents
+        }
+        total_pages = sum(page_counts.values())
+
+        def report(stage: str, done: int, total: int):
+            if progress_callback:
+                progress_callback(stage, done, total)
+
+        def extract(document: Dict):
+            """문서 하나의 텍스트 추출 및 청킹 (추출 스레드)"""
+            if stop_event.is_set():
+                return
+            try:
+                pages_data, num_pages = pdf_service.get_page_texts(
+                    document["document_id"], document["file_path"]
+                )
+                chunks = pdf_service.create_chunks(pages_data, document["document_id"], document["filename"])
+                item = {**document, "pages": num_pages, "chunks": chunks}
+            except Exception as e:
+                item = {**document, "error": str(e)}
+
+            # 큐가 가득 차면 임베딩이 따라올 때까지 대기 (백프레셔)
+            while not stop_event.is_set():
+                try:
+                    extracted_queue.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+        def produce():
+            """추출 스레드 풀 실행 후 종료 표시"""
+            with ThreadPoolExecutor(
+                max_workers=settings.BULK_EXTRACT_WORKERS,
+                thread_name_prefix="bulk-extract"
+            ) as executor:
+                list(executor.map(extract, documents))
+            while not stop_event.is_set():
+                try:
+                    extracted_queue.put(sentinel, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+        producer = threading.Thread(target=produce, name="bulk-producer", daemon=True)
+        producer.start()
+
+        # 문서별로 아직 기록되지 않은 청크 수
+        remaining: Dict[str, int] = {}
+        document_info: Dict[str, Dict] = {}
+        pending: List[Dict] = []
+        # 메타데이터 저장 전인 문서의 기록 중/기록된 청크 (실패 시 롤백 대상)
+        unfinished: Dict[str, List[Dict]] = {}
+
+        # 임베딩 후 기록 대기 중인 청크와 임베딩 (CHROMA_WRITE_BATCH_SIZE개가 모이면 기록)
+        unwritten: List[Dict] = []
+        unwritten_embeddings: List[np.ndarray] = []
+        write_batch_size = vector_service.get_write_batch_size()
+
+        def embed(batch: List[Dict]):
+            """청크 배치 임베딩 (기록 대기 청크가 충분히 모이면 기록)"""
+            embedded_before = counters["chunks_embedded"]
+            embeddings = vector_service.embed_chunk_texts(
+                [chunk["text"] for chunk in batch],
+                lambda _stage, done, _total: report("embedded", embedded_before + done, stats["chunks"]),
+                batch_size=settings.BULK_EMBED_BATCH_SIZE
+            )
+            counters["chunks_embedded"] += len(batch)
+
+            unwritten.extend(batch)
+            unwritten_embeddings.append(embeddings)
+            if len(unwritten) >= write_batch_size:
+                write()
+
+        def write(final: bool = False):
+            """기록 대기 중인 청크 기록, 완료된 문서의 메타데이터 저장"""
+            # 마지막이 아니면 CHROMA_WRITE_BATCH_SIZE의 배수만큼만 기록하고 나머지는 다음 기록으로 넘김
+            count = len(unwritten) if final else len(unwritten) - len(unwritten) % write_batch_size
+            pending_embeddings = np.concatenate(unwritten_embeddings)
+            batch, embeddings = unwritten[:count], pending_embeddings[:count]
+            del unwritten[:count]
+            unwritten_embeddings[:] = [pending_embeddings[count:]]
+
+            # 기록 도중 실패해도 일부 기록된 청크를 지울 수 있도록 기록 전에 등록
+            for chunk in batch:
+                unfinished.setdefault(chunk["document_id"], []).append(chunk)
+            written_before = counters["chunks_written"]
+            vector_service.write_chunks(
+                batch,
+                embeddings,
+                lambda _stage, done, _total: report("written", written_before + done, stats["chunks"])
+            )
+            counters["chunks_written"] += len(batch)
+
+            for chunk in batch:
+                document_id = chunk["document_id"]
+                remaining[document_id] -= 1
+                if remaining[document_id] == 0:
+                    info = document_info.pop(document_id)
+                    vector_service.save_document_metadata(
+                        document_id, info["filename"], info["pages"], len(info["chunks"])
+                    )
+                    unfinished.pop(document_id, None)
+                    stats["documents_indexed"] += 1
+                    report("documents", stats["documents_indexed"], stats["documents"])
+
+        try:
+            while True:
+                item = extracted_queue.get()
+                if item is sentinel:
+                    break
+
+                # 실패한 문서의 페이지도 처리한 것으로 계산 (진행률이 끝까지 차도록)
+                counters["pages_extracted"] += item.get("pages", page_counts[item["document_id"]])
+                total_pages = max(total_pages, counters["pages_extracted"])
+                report("extracted", counters["pages_extracted"], total_pages)
+
+                if "error" in item or not item["chunks"]:
+                    error = item.get("error", "청크가 비어있습니다.")
+                    stats["failed"].append({"document_id": item["document_id"], "error": error})
+                    print(f"  [실패] {item['filename']}: {error}")
+                    continue
+
+                stats["pages"] += item["pages"]
+                stats["chunks"] += len(item["chunks"])
+
+                remaining[item["document_id"]] = len(item["chunks"])
+                document_info[item["document_id"]] = item
+                pending.extend(item["chunks"])
+
+                # 문서 경계와 관계없이 큰 배치로 임베딩
+                while len(pending) >= settings.BULK_EMBED_BATCH_SIZE:
+                    batch = pending[:settings.BULK_EMBED_BATCH_SIZE]
+                    pending = pending[settings.BULK_EMBED_BATCH_SIZE:]
+                    embed(batch)
+
+            if pending:
+                embed(pending)
+                pending = []
+            if unwritten:
+                write(final=True)
+
+        except BaseException:
+            # 작업 실패/취소: 메타데이터가 없는 문서의 청크가 남지 않도록 삭제
+            chunks = [chunk for document_chunks in unfinished.values() for chunk in document_chunks]
+            if chunks:
+                try:
+                    vector_service.remove_chunks(chunks)
+                    print(f"  [롤백] 완료되지 않은 문서 {len(unfinished)}개의 청크 {len(chunks)}개 삭제")
+                except Exception as e:
+                    print(f"  [경고] 롤백 중 오류: {str(e)}")
+            raise
+
+        finally:
+            stop_event.set()
+            producer.join(timeout=1)
+
+        elapsed = time.perf_counter() - started
+        stats["elapsed_seconds"] = round(elapsed, 2)
+        stats["pages_per_sec"] = round(stats["pages"] / elapsed, 2) if elapsed > 0 else 0.0
+
+        print(f"=== 대량 수집 완료: 문서 {stats['documents_indexed']}/{stats['documents']}개, "
+              f"페이지 {stats['pages']}개, 청크 {stats['chunks']}개, "
+              f"{elapsed:.1f}초 ({stats['pages_per_sec']} 페이지/초) ===\n")
+        return stats
+
+# 전역 서비스 인스턴스
+bulk_ingest_service = BulkIngestService()
@@ -0,0 +1,295 @@
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Optional
+from config import settings
+from services.pdf_service import pdf_service
+from services.vector_service import vector_service
+from services.ingest_service import bulk_ingest_service
+from services.metadata_store import metadata_store
+
+class IndexJobCancelled(Exception):
+    """인덱싱 작업 취소"""
+    pass
+
+class IndexJobService:
+    """
+    백그라운드 문서 인덱싱 작업 큐
+
+    작업은 등록한 워커 프로세스에서 실행되고, 상태는 공유 저장소에도 기록되어
+    다른 워커에서도 조회/취소할 수 있음
+    """
+
+    # 작업 상태
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED_STATUSES = {COMPLETED, FAILED, CANCELLED}
+
+    def __init__(self):
+        # 인덱싱 전용 워커 풀 (동시 작업 수 제한)
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.INDEX_WORKERS,
+            thread_name_prefix="index-worker"
+        )
+
+        # 작업 저장소 (job_id -> 작업 정보)
+        self.jobs: Dict[str, Dict] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, document_id: str) -> Dict:
+        """
+        인덱싱 작업 등록
+
+        Args:
+            document_id: 문서 ID
+
+        Returns:
+            작업 정보
+        """
+        return self._enqueue(self._run_job, document_id=document_id, document_ids=[document_id])
+
+    def submit_bulk(self, documents: List[Dict]) -> Dict:
+        """
+        대량 수집 작업 등록
+
+        Args:
+            documents: [{"document_id": str, "file_path": str, "filename": str}, ...]
+
+        Returns:
+            작업 정보
+        """
+        return self._enqueue(
+            self._run_bulk_job,
+            document_id=None,
+            document_ids=[document["document_id"] for document in documents],
+            documents=documents
+        )
+
+    def _enqueue(self, runner, document_id: Optional[str], document_ids: List[str], **job_args) -> Dict:
+        """작업 정보 생성 후 워커 풀에 등록"""
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        job = {
+            "job_id": job_id,
+            "document_id": document_id,
+            "document_ids": document_ids,
+            "documents_done": 0,
+            "pages_per_sec": None,
+            "status": self.QUEUED,
+            "pages_extracted": 0,
+            "total_pages": 0,
+            "chunks_embedded": 0,
+            "total_chunks": 0,
+            "rows_written": 0,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None
+        }
+
+        with self._lock:
+            self.jobs[job_id] = job
+            self._cancel_events[job_id] = threading.Event()
+            self._prune_finished_jobs()
+            metadata_store.save_job(job)
+
+        self.executor.submit(runner, job_id, **job_args)
+        print(f"[인덱싱 작업 등록] {job_id} (문서 {len(document_ids)}개)")
+        return dict(job)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """작업 정보 조회 (다른 워커의 작업은 공유 저장소에서 조회)"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return dict(job)
+        return metadata_store.get_job(job_id)
+
+    def list_jobs(self) -> List[Dict]:
+        """전체 작업 목록 조회 (모든 워커, 최근 등록 순)"""
+        return metadata_store.list_jobs(settings.INDEX_JOB_HISTORY)
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        작업 취소 요청
+
+        대기 중인 작업은 즉시 취소되고, 실행 중인 작업은 다음 진행 단계에서 중단됨
+
+        Args:
+            job_id: 작업 ID
+
+        Returns:
+            작업 정보 또는 None (작업이 없는 경우)
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job:
+                if job["status"] not in self.FINISHED_STATUSES:
+                    self._cancel_events[job_id].set()
+                    if job["status"] == self.QUEUED:
+                        self._finish(job, self.CANCELLED)
+                return dict(job)
+
+        # 다른 워커의 작업은 취소 요청만 기록 (실행 중인 워커가 다음 진행 단계에서 확인)
+        job = metadata_store.get_job(job_id)
+        if job and job["status"] not in self.FINISHED_STATUSES:
+            metadata_store.request_job_cancel(job_id)
+        return job
+
+    def _update(self, job_id: str, persist: bool = True, **fields):
+        """작업 정보 갱신 (persist가 False면 메모리에만 반영)"""
+        with self._lock:
+            self.jobs[job_id].update(fields)
+            if persist:
+                metadata_store.save_job(self.jobs[job_id])
+
+    def _finish(self, job: Dict, status: str, error: str = None):
+        """작업 종료 처리 (lock 보유 상태에서 호출)"""
+        job["status"] = status
+        job["error"] = error
+        job["finished_at"] = datetime.now().isoformat()
+        self._cancel_events.pop(job["job_id"], None)
+        metadata_store.save_job(job)
+
+    def _prune_finished_jobs(self):
+        """오래된 완료 작업 정리 (lock 보유 상태에서 호출)"""
+        finished = [job for job in self.jobs.values() if job["status"] in self.FINISHED_STATUSES]
+        if len(finished) <= settings.INDEX_JOB_HISTORY:
+            return
+
+        finished.sort(key=lambda x: x["finished_at"] or "")
+        for job in finished[:len(finished) - settings.INDEX_JOB_HISTORY]:
+            del self.jobs[job["job_id"]]
+        metadata_store.prune_jobs(settings.INDEX_JOB_HISTORY, sorted(self.FINISHED_STATUSES))
+
+    def _start(self, job_id: str) -> Optional[threading.Event]:
+        """작업을 실행 상태로 전환 (이미 취소된 작업이면 None)"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job or job["status"] != self.QUEUED:
+                return None
+            job["status"] = self.RUNNING
+            job["started_at"] = datetime.now().isoformat()
+            metadata_store.save_job(job)
+            return self._cancel_events[job_id]
+
+    def _progress_handler(self, job_id: str, cancel_event: threading.Event):
+        """
+        진행률 콜백 생성 (취소 요청 시 IndexJobCancelled 발생)
+
+        진행률은 매번 메모리에 반영하고, 공유 저장소 기록과 다른 워커의 취소 요청 확인은
+        새 단계가 시작될 때와 INDEX_PROGRESS_INTERVAL초마다 한 번만 수행함
+        (최종 진행률은 작업 종료 시 기록)
+        """
+        seen_stages = set()
+        state = {"persisted_at": 0.0}
+
+        def on_progress(stage: str, done: int, total: int):
+            now = time.monotonic()
+            persist = stage not in seen_stages or now - state["persisted_at"] >= settings.INDEX_PROGRESS_INTERVAL
+            if persist:
+                seen_stages.add(stage)
+                state["persisted_at"] = now
+                # 다른 워커에서 들어온 취소 요청도 확인
+                if not cancel_event.is_set() and metadata_store.is_job_cancel_requested(job_id):
+                    cancel_event.set()
+            if cancel_event.is_set():
+                raise IndexJobCancelled()
+
+            if stage == "extracted":
+                self._update(job_id, persist, pages_extracted=done, total_pages=total)
+            elif stage == "embedded":
+                self._update(job_id, persist, chunks_embedded=done, total_chunks=total)
+            elif stage == "written":
+                self._update(job_id, persist, rows_written=done)
+            elif stage == "documents":
+                self._update(job_id, persist, documents_done=done)
+
+        return on_progress
+
+    def _fail(self, job_id: str, cancel_event: threading.Event, error: Exception):
+        """작업 실패 또는 취소 처리"""
+        with self._lock:
+            if self.jobs[job_id]["status"] in self.FINISHED_STATUSES:
+                return  # 종료 시 이미 취소 처리됨
+            if cancel_event.is_set():
+                self._finish(self.jobs[job_id], self.CANCELLED)
+                print(f"[인덱싱 작업 취소] {job_id}")
+            else:
+                self._finish(self.jobs[job_id], self.FAILED, str(error))
+                print(f"[인덱싱 작업 실패] {job_id}: {str(error)}")
+
+    def _run_job(self, job_id: str):
+        """인덱싱 작업 실행 (워커 스레드)"""
+        cancel_event = self._start(job_id)
+        if cancel_event is None:
+            return
+        document_id = self.get_job(job_id)["document_id"]
+        on_progress = self._progress_handler(job_id, cancel_event)
+
+        try:
+            found = pdf_service.find_uploaded_file(document_id)
+            if not found:
+                raise FileNotFoundError("문서를 찾을 수 없습니다.")
+            file_path, original_filename = found
+
+            # 페이지 → 청크 → 임베딩 배치 → 기록 파이프라인 (업로드 시 저장된 텍스트 재사용)
+            num_pages, pages = pdf_service.open_page_stream(document_id, file_path, on_progress)
+            chunks = pdf_service.iter_chunks(pages, document_id, original_filename)
+
+            # 벡터 DB에 저장
+            vector_service.add_documents_stream(chunks, document_id, original_filename, num_pages, on_progress)
+
+            with self._lock:
+                self.jobs[job_id]["documents_done"] = 1
+                self._finish(self.jobs[job_id], self.COMPLETED)
+            print(f"[인덱싱 작업 완료] {job_id}")
+
+        except Exception as e:
+            self._fail(job_id, cancel_event, e)
+
+    def _run_bulk_job(self, job_id: str, documents: List[Dict]):
+        """대량 수집 작업 실행 (워커 스레드)"""
+        cancel_event = self._start(job_id)
+        if cancel_event is None:
+            return
+        on_progress = self._progress_handler(job_id, cancel_event)
+
+        try:
+            stats = bulk_ingest_service.ingest(documents, on_progress)
+
+            # 일부 문서 실패는 작업 실패로 처리하지 않고 오류 내용만 기록
+            error = None
+            if stats["failed"]:
+                error = "; ".join(f"{item['document_id']}: {item['error']}" for item in stats["failed"])
+
+            with self._lock:
+                self.jobs[job_id]["pages_per_sec"] = stats["pages_per_sec"]
+                self._finish(self.jobs[job_id], self.COMPLETED, error)
+            print(f"[대량 수집 작업 완료] {job_id}")
+
+        except Exception as e:
+            self._fail(job_id, cancel_event, e)
+
+    def shutdown(self):
+        """
+        대기 중/실행 중인 작업을 취소하고 워커 풀 종료
+
+        종료 후 공유 저장소에 queued/running 상태로 남지 않도록 취소 상태로 기록함
+        """
+        with self._lock:
+            for event in self._cancel_events.values():
+                event.set()
+            for job in self.jobs.values():
+                if job["status"] not in self.FINISHED_STATUSES:
+                    self._finish(job, self.CANCELLED, "서버 종료로 작업이 중단되었습니다.")
+        self.executor.shutdown(wait=False)
+
+# 전역 서비스 인스턴스
+index_job_service = IndexJobService()
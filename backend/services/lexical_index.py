@@ -0,0 +1,133 @@
+import re
+import math
+import heapq
+import threading
+from collections import Counter
+from typing import List, Dict, Tuple
+
+# 영문/숫자 단어, 한글 어절
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[가-힣]+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]+")
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토큰화 (한글 고려)
+
+    영문/숫자는 소문자 단어 단위, 한글 어절은 어절 전체와 음절 바이그램으로 분리하여
+    조사가 붙은 어절("인젝션을")도 원형("인젝션")과 매칭되도록 함
+
+    Args:
+        text: 원문 텍스트
+
+    Returns:
+        토큰 리스트
+    """
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL_PATTERN.fullmatch(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+class BM25Index:
+    """
+    청크 텍스트 BM25 역색인 (메모리)
+
+    ChromaDB 컬렉션과 함께 유지되며, 컬렉션 로드 시 저장된 청크로 다시 구성됨
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        # 용어 -> {청크 ID: 용어 빈도}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # 청크 ID -> (문서 ID, 길이, 고유 용어 리스트)
+        self._chunks: Dict[str, Tuple[str, int, List[str]]] = {}
+        self._total_length = 0
+
+    def add(self, chunk_id: str, document_id: str, text: str):
+        """
+        청크 추가 (같은 ID가 있으면 교체)
+
+        Args:
+            chunk_id: 청크 ID
+            document_id: 문서 ID
+            text: 청크 텍스트
+        """
+        term_counts = Counter(tokenize(text))
+        length = sum(term_counts.values())
+
+        with self._lock:
+            self._remove_locked(chunk_id)
+            for term, count in term_counts.items():
+                self._postings.setdefault(term, {})[chunk_id] = count
+            self._chunks[chunk_id] = (document_id, length, list(term_counts))
+            self._total_length += length
+
+    def remove(self, chunk_ids: List[str]):
+        """청크 제거"""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self._remove_locked(chunk_id)
+
+    def remove_document(self, document_id: str):
+        """문서의 모든 청크 제거"""
+        with self._lock:
+            chunk_ids = [cid for cid, entry in self._chunks.items() if entry[0] == document_id]
+            for chunk_id in chunk_ids:
+                self._remove_locked(chunk_id)
+
+    def _remove_locked(self, chunk_id: str):
+        """청크 제거 (lock 보유 상태에서 호출)"""
+        entry = self._chunks.pop(chunk_id, None)
+        if entry is None:
+            return
+
+        _, length, terms = entry
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """
+        BM25 검색
+
+        Args:
+            query: 검색 쿼리
+            top_k: 반환할 결과 개수
+
+        Returns:
+            [(청크 ID, BM25 점수), ...] (점수 내림차순)
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            num_chunks = len(self._chunks)
+            if num_chunks == 0:
+                return []
+            avg_length = self._total_length / num_chunks
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (num_chunks - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, freq in postings.items():
+                    length = self._chunks[chunk_id][1]
+                    norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda x: x[1])
+
+    def __len__(self) -> int:
+        return len(self._chunks)
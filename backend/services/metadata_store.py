@@ -0,0 +1,363 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from config import settings
+
+# 코퍼스 변경 기록 보관 버전 수 (이보다 오래 동기화하지 않은 워커는 색인 전체를 다시 구성)
+CORPUS_CHANGE_LOG_SIZE = 1000
+
+class MetadataStore:
+    """
+    공유 메타데이터 저장소 (SQLite, WAL 모드)
+
+    여러 워커 프로세스가 같은 파일을 사용하며 모든 쓰기는 트랜잭션 단위로 반영됨
+    - documents: 문서 메타데이터 (행 단위 upsert/delete, 정렬/페이지 조회는 인덱스 사용)
+    - state: 코퍼스 버전 (문서/청크 변경 시 증가, 다른 워커의 변경 감지에 사용),
+             문서 목록 버전 (문서 메타데이터 변경 시 같은 트랜잭션에서 증가, 목록 ETag에 사용)
+    - corpus_changes: 코퍼스 버전별로 바뀐 문서 ID (다른 워커가 바뀐 문서만 색인에 반영)
+    - index_jobs: 인덱싱 작업 상태 (어느 워커에서든 조회/취소 가능)
+    - uploaded_files: 업로드 파일 경로 (업로드 시 기록, 문서 ID로 바로 조회)
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.METADATA_DB_PATH
+        self._lock = threading.Lock()
+
+        # 연결은 처음 사용할 때 생성 (모듈을 불러오기만 해서는 파일을 만들지 않음)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connect_lock = threading.Lock()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """SQLite 연결 (최초 사용 시 생성 및 스키마 준비)"""
+        if self._connection is None:
+            with self._connect_lock:
+                if self._connection is None:
+                    self._connection = self._connect()
+        return self._connection
+
+    def _connect(self) -> sqlite3.Connection:
+        """데이터베이스 연결 및 테이블 생성"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # 커밋된 트랜잭션은 비정상 종료(전원 차단 포함) 후에도 유지
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                upload_date TEXT NOT NULL,
+                pages INTEGER NOT NULL,
+                chunks INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_upload_date ON documents (upload_date, id);
+            CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents (filename, id);
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS corpus_changes (
+                version INTEGER NOT NULL,
+                document_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_corpus_changes_version ON corpus_changes (version);
+            CREATE TABLE IF NOT EXISTS index_jobs (
+                job_id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS uploaded_files (
+                document_id TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                filename TEXT NOT NULL
+            );
+            INSERT OR IGNORE INTO state (key, value) VALUES ('corpus_version', 0);
+            INSERT OR IGNORE INTO state (key, value) VALUES ('documents_version', 0);
+        """)
+        conn.commit()
+        return conn
+
+    def import_legacy_json(self, path: str):
+        """
+        기존 documents_metadata.json 내용을 한 번만 가져옴 (가져온 파일은 .migrated로 이름 변경)
+
+        서버 시작 시에만 호출함 (모듈을 불러오는 스크립트/테스트가 작업 트리를 바꾸지 않도록)
+
+        Args:
+            path: 기존 메타데이터 JSON 파일 경로
+        """
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                documents = json.load(f)
+        except Exception as e:
+            print(f"기존 메타데이터 파일을 읽을 수 없습니다: {e}")
+            return
+
+        with self._lock, self._conn:
+            self._bump_documents_version()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO documents (id, filename, upload_date, pages, chunks) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (doc_id, doc.get("filename", ""), doc.get("upload_date", ""), doc.get("pages", 0), doc.get("chunks", 0))
+                    for doc_id, doc in documents.items()
+                ]
+            )
+        try:
+            os.replace(path, path + ".migrated")
+        except FileNotFoundError:
+            return  # 다른 워커가 먼저 옮김
+        print(f"기존 메타데이터 {len(documents)}건을 {self.db_path}로 옮겼습니다.")
+
+    # ============================================
+    # 문서 메타데이터
+    # ============================================
+
+    def upsert_document(self, document_id: str, filename: str, total_pages: int, chunk_count: int):
+        """
+        문서 메타데이터 저장 (기존 문서는 업로드 날짜 유지)
+
+        Args:
+            document_id: 문서 ID
+            filename: 파일명
+            total_pages: 총 페이지 수
+            chunk_count: 청크 수
+        """
+        with self._lock, self._conn:
+            self._bump_documents_version()
+            self._conn.execute(
+                "INSERT INTO documents (id, filename, upload_date, pages, chunks) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET filename = excluded.filename, "
+                "pages = excluded.pages, chunks = excluded.chunks",
+                (document_id, filename, datetime.now().isoformat(), total_pages, chunk_count)
+            )
+
+    def delete_document(self, document_id: str) -> bool:
+        """문서 메타데이터 삭제 (없으면 False)"""
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM documents WHERE id = ?", (document_id,)).rowcount > 0
+            if deleted:
+                self._bump_documents_version()
+            return deleted
+
+    def _bump_documents_version(self):
+        """문서 목록 버전 증가 (lock 보유 상태, 문서 변경과 같은 트랜잭션에서 호출)"""
+        self._conn.execute("UPDATE state SET value = value + 1 WHERE key = 'documents_version'")
+
+    def get_documents_version(self) -> int:
+        """문서 목록 버전 (문서가 추가/변경/삭제될 때마다 증가)"""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM state WHERE key = 'documents_version'").fetchone()[0]
+
+    def get_document(self, document_id: str) -> Optional[Dict]:
+        """문서 메타데이터 조회"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE id = ?", (document_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find_document_id(self, filename: str) -> Optional[str]:
+        """파일명으로 문서 ID 조회"""
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM documents WHERE filename = ? LIMIT 1", (filename,)).fetchone()
+        return row["id"] if row else None
+
+    def set_uploaded_file(self, document_id: str, file_path: str, filename: str):
+        """
+        업로드 파일 경로 기록 (같은 문서 ID면 교체)
+
+        Args:
+            document_id: 문서 ID
+            file_path: 저장된 파일 경로
+            filename: 원본 파일명
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploaded_files (document_id, file_path, filename) VALUES (?, ?, ?)",
+                (document_id, file_path, filename)
+            )
+
+    def get_uploaded_file(self, document_id: str) -> Optional[Tuple[str, str]]:
+        """업로드 파일 조회 ((파일 경로, 원본 파일명) 튜플, 없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_path, filename FROM uploaded_files WHERE document_id = ?", (document_id,)
+            ).fetchone()
+        return (row["file_path"], row["filename"]) if row else None
+
+    def delete_uploaded_file(self, document_id: str) -> bool:
+        """업로드 파일 기록 삭제 (없으면 False)"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM uploaded_files WHERE document_id = ?", (document_id,)
+            ).rowcount > 0
+
+    def page_documents(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, str]] = None,
+        prefix: str = None
+    ) -> Tuple[List[Dict], bool]:
+        """
+        문서 목록 커서 페이지 조회 (업로드 날짜 내림차순)
+
+        OFFSET 대신 마지막 항목의 (업로드 날짜, 문서 ID) 다음부터 조회하므로
+        페이지가 뒤로 가도 조회 비용이 일정함
+
+        Args:
+            limit: 페이지 크기
+            after: 이전 페이지 마지막 항목의 (업로드 날짜, 문서 ID)
+            prefix: 파일명 접두어 필터
+
+        Returns:
+            (문서 메타데이터 리스트, 다음 페이지 존재 여부) 튜플
+        """
+        conditions, params = [], []
+        if prefix:
+            # 인덱스를 사용할 수 있도록 LIKE 대신 범위 조건 사용
+            conditions.append("filename >= ? AND filename < ?")
+            params.extend([prefix, prefix + "\U0010ffff"])
+        if after:
+            conditions.append("(upload_date, id) < (?, ?)")
+            params.extend(after)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM documents {where} ORDER BY upload_date DESC, id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        return [dict(row) for row in rows[:limit]], len(rows) > limit
+
+    def all_documents(self) -> Dict[str, Dict]:
+        """전체 문서 메타데이터 ({문서 ID: 메타데이터})"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM documents").fetchall()
+        return {row["id"]: dict(row) for row in rows}
+
+    # ============================================
+    # 코퍼스 버전
+    # ============================================
+
+    def get_version(self) -> int:
+        """현재 코퍼스 버전"""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM state WHERE key = 'corpus_version'").fetchone()[0]
+
+    def bump_version(self, document_ids: List[str] = None) -> tuple:
+        """
+        코퍼스 버전 증가 (바뀐 문서 ID를 같은 트랜잭션에서 변경 기록에 남김)
+
+        Args:
+            document_ids: 청크가 바뀐 문서 ID 리스트 (없으면 어떤 문서인지 알 수 없는 변경으로 기록)
+
+        Returns:
+            (증가 전 버전, 증가 후 버전) 튜플
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            previous = self._conn.execute("SELECT value FROM state WHERE key = 'corpus_version'").fetchone()[0]
+            current = previous + 1
+            self._conn.execute("UPDATE state SET value = ? WHERE key = 'corpus_version'", (current,))
+            self._conn.executemany(
+                "INSERT INTO corpus_changes (version, document_id) VALUES (?, ?)",
+                [(current, document_id) for document_id in (document_ids or [None])]
+            )
+            self._conn.execute(
+                "DELETE FROM corpus_changes WHERE version <= ?", (current - CORPUS_CHANGE_LOG_SIZE,)
+            )
+        return previous, current
+
+    def get_changes(self, since_version: int) -> Tuple[int, Optional[List[str]]]:
+        """
+        특정 버전 이후 바뀐 문서 ID 조회
+
+        Args:
+            since_version: 마지막으로 반영한 코퍼스 버전
+
+        Returns:
+            (현재 버전, 바뀐 문서 ID 리스트) 튜플
+            변경 기록이 정리되었거나 문서를 알 수 없는 변경이 있으면 문서 ID 리스트 대신 None
+        """
+        with self._lock, self._conn:
+            # 버전과 변경 기록을 같은 스냅샷에서 읽음
+            self._conn.execute("BEGIN")
+            current = self._conn.execute("SELECT value FROM state WHERE key = 'corpus_version'").fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT version, document_id FROM corpus_changes WHERE version > ? AND version <= ?",
+                (since_version, current)
+            ).fetchall()
+
+        versions = {row["version"] for row in rows}
+        if len(versions) != current - since_version or any(row["document_id"] is None for row in rows):
+            return current, None
+        return current, sorted({row["document_id"] for row in rows})
+
+    # ============================================
+    # 인덱싱 작업
+    # ============================================
+
+    def save_job(self, job: Dict):
+        """작업 정보 저장 (취소 요청 여부는 유지)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO index_jobs (job_id, created_at, status, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET status = excluded.status, data = excluded.data",
+                (job["job_id"], job["created_at"], job["status"], json.dumps(job, ensure_ascii=False))
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """작업 정보 조회"""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM index_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def list_jobs(self, limit: int) -> List[Dict]:
+        """최근 등록 순 작업 목록"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM index_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def request_job_cancel(self, job_id: str):
+        """다른 워커에서 실행 중인 작업에 취소 요청 표시"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE index_jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+
+    def is_job_cancel_requested(self, job_id: str) -> bool:
+        """취소 요청 여부"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM index_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def prune_jobs(self, keep: int, finished_statuses: List[str]):
+        """오래된 완료 작업 정리 (최근 keep개만 유지)"""
+        placeholders = ", ".join("?" for _ in finished_statuses)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM index_jobs WHERE status IN ({placeholders}) AND job_id NOT IN ("
+                f"SELECT job_id FROM index_jobs WHERE status IN ({placeholders}) "
+                f"ORDER BY created_at DESC LIMIT ?)",
+                (*finished_statuses, *finished_statuses, keep)
+            )
+
+    def close(self):
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+# 전역 저장소 인스턴스
+metadata_store = MetadataStore()
@@ -1,8 +1,22 @@
 import os
+import json
 import uuid
-from typing import List, Dict, Tuple
+import shutil
+import tempfile
+import aiofiles
+from fastapi import UploadFile
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Tuple, Optional, Callable, Iterator, Iterable
 import PyPDF2
 from config import settings
+from services.metadata_store import metadata_store
+from utils.executor import get_process_pool, shutdown_process_pool
+from utils.pdf_extract import extract_page_range
+
+# 업로드 파일과 페이지 텍스트는 문서 ID 앞부분(uuid hex)으로 나눈 하위 디렉토리에 저장 (2자리 = 최대 256개)
+UPLOAD_SHARD_LENGTH = 2
+
 
 class PDFService:
     """PDF 파일 처리 서비스"""
@@ -11,35 +25,176 @@ class PDFService:
         self.chunk_size = settings.CHUNK_SIZE
         self.chunk_overlap = settings.CHUNK_OVERLAP
 
-    def save_uploaded_file(self, file_content: bytes, filename: str) -> Tuple[str, str]:
+    def _shard_dir(self, base_dir: str, document_id: str, create: bool = False) -> str:
         """
-        업로드된 파일을 저장
+        문서 ID 앞 2자리(uuid hex)로 나눈 하위 디렉토리 경로
 
         Args:
-            file_content: 파일 내용
+            base_dir: 상위 디렉토리 (UPLOAD_DIR 또는 PAGE_TEXT_DIR)
+            document_id: 문서 ID
+            create: 디렉토리가 없으면 생성할지 여부
+
+        Returns:
+            하위 디렉토리 경로
+        """
+        shard = document_id.split("_", 1)[-1][:UPLOAD_SHARD_LENGTH]
+        shard_dir = os.path.join(base_dir, shard)
+        if create:
+            os.makedirs(shard_dir, exist_ok=True)
+        return shard_dir
+
+    def _upload_path(self, document_id: str, filename: str) -> str:
+        """업로드 파일 저장 경로 (UPLOAD_DIR/<문서 ID 앞 2자리>/<문서 ID>_<파일명>, 하위 디렉토리 생성 포함)"""
+        return os.path.join(self._shard_dir(settings.UPLOAD_DIR, document_id, create=True), f"{document_id}_{filename}")
+
+    def migrate_flat_layout(self):
+        """
+        UPLOAD_DIR / PAGE_TEXT_DIR 바로 아래에 저장된 기존 파일을 하위 디렉토리로 이동 (서버 시작 시 실행)
+
+        업로드 파일은 경로도 함께 기록함. 이동이 끝나면 두 디렉토리에는 하위 디렉토리만
+        남으므로 이후 실행에서는 검사 비용이 작음. 여러 워커가 동시에 실행해도 안전함
+        """
+        moved = 0
+        for entry in os.scandir(settings.UPLOAD_DIR):
+            if not entry.is_file() or not entry.name.startswith("doc_"):
+                continue
+            # 파일명 형식: doc_<12자리 hex>_<원본 파일명>
+            document_id, _, filename = entry.name.partition("_")[2].partition("_")
+            document_id = f"doc_{document_id}"
+            if not filename:
+                continue
+
+            file_path = self._upload_path(document_id, filename)
+            try:
+                os.replace(entry.path, file_path)
+            except FileNotFoundError:
+                # 다른 워커가 먼저 옮긴 경우
+                continue
+            metadata_store.set_uploaded_file(document_id, file_path, filename)
+            moved += 1
+
+        for entry in os.scandir(settings.PAGE_TEXT_DIR):
+            if not entry.is_file() or not entry.name.endswith(".jsonl"):
+                continue
+            try:
+                os.replace(entry.path, self._page_text_path(entry.name[:-len(".jsonl")], create=True))
+            except FileNotFoundError:
+                continue
+            moved += 1
+
+        if moved:
+            print(f"기존 업로드 파일 / 페이지 텍스트 {moved}개를 하위 디렉토리로 이동했습니다.")
+
+    async def save_uploaded_stream(
+        self,
+        upload_file: UploadFile,
+        filename: str,
+        document_id: str = None
+    ) -> Tuple[str, str, int]:
+        """
+        업로드 파일을 고정 크기 단위로 임시 파일에 기록한 뒤 업로드 디렉토리로 이동
+
+        파일 전체를 메모리에 올리지 않으며, 크기 제한은 기록 중에 검사함
+
+        Args:
+            upload_file: 업로드 파일
             filename: 파일명
+            document_id: 기존 문서 ID (지정하면 해당 문서의 파일과 저장된 페이지 텍스트를 교체)
 
         Returns:
-            (document_id, file_path) 튜플
+            (document_id, file_path, 파일 크기) 튜플
+
+        Raises:
+            ValueError: 파일 형식이 허용되지 않거나 크기 제한을 초과한 경우
         """
+        # 확장자 검사
+        is_valid, error_message = self.validate_file(filename, 0)
+        if not is_valid:
+            raise ValueError(error_message)
+
         # 고유 문서 ID 생성
-        document_id = f"doc_{uuid.uuid4().hex[:12]}"
+        replace_existing = document_id is not None
+        if not replace_existing:
+            document_id = f"doc_{uuid.uuid4().hex[:12]}"
+        file_path = self._upload_path(document_id, filename)
+
+        # 같은 디렉토리에 임시 파일 생성 (원자적 이동을 위해)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix=".upload_", suffix=".part")
+        os.close(fd)
+
+        file_size = 0
+        try:
+            async with aiofiles.open(temp_path, "wb") as f:
+                while True:
+                    chunk = await upload_file.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    # 크기 제한 검사
+                    file_size += len(chunk)
+                    is_valid, error_message = self.validate_file(filename, file_size)
+                    if not is_valid:
+                        raise ValueError(error_message)
 
-        # 파일 저장 경로
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{document_id}_{filename}")
+                    await f.write(chunk)
 
-        # 파일 저장
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+            # 기존 문서 교체 시 이전 파일과 페이지 텍스트 제거
+            if replace_existing:
+                self.delete_file(document_id)
+
+            os.replace(temp_path, file_path)
+            metadata_store.set_uploaded_file(document_id, file_path, filename)
+
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return document_id, file_path, file_size
+
+    def save_file_object(self, file_obj, filename: str) -> Tuple[str, str]:
+        """
+        로컬 파일 객체(디렉토리의 PDF, ZIP 내부 파일 등)를 업로드 디렉토리로 복사
+
+        Args:
+            file_obj: 읽기 가능한 바이너리 파일 객체
+            filename: 파일명
+
+        Returns:
+            (document_id, file_path) 튜플
+        """
+        document_id = f"doc_{uuid.uuid4().hex[:12]}"
+        file_path = self._upload_path(document_id, filename)
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix=".upload_", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(file_obj, f, settings.UPLOAD_CHUNK_SIZE)
+            os.replace(temp_path, file_path)
+            metadata_store.set_uploaded_file(document_id, file_path, filename)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
 
         return document_id, file_path
 
-    def extract_text_from_pdf(self, file_path: str) -> Tuple[List[Dict], int]:
+    def extract_text_from_pdf(
+        self,
+        file_path: str,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        workers: int = None
+    ) -> Tuple[List[Dict], int]:
         """
         PDF 파일에서 페이지별 텍스트 추출
 
+        페이지 수가 PDF_PARALLEL_MIN_PAGES 이상이고 워커가 2개 이상이면
+        페이지 구간을 프로세스 풀에 나누어 추출한 뒤 페이지 순서대로 합침
+
         Args:
             file_path: PDF 파일 경로
+            progress_callback: 진행률 콜백 ("extracted", 완료 페이지 수, 전체 페이지 수)
+            workers: 추출 프로세스 수 (기본값: settings.PDF_EXTRACT_WORKERS)
 
         Returns:
             (페이지별 텍스트 리스트, 페이지 수) 튜플
@@ -52,6 +207,12 @@ class PDFService:
                 pdf_reader = PyPDF2.PdfReader(file)
                 num_pages = len(pdf_reader.pages)
 
+                if workers is None:
+                    workers = settings.PDF_EXTRACT_WORKERS
+                if workers > 1 and num_pages >= settings.PDF_PARALLEL_MIN_PAGES:
+                    pages_data = self._extract_parallel(file_path, num_pages, workers, progress_callback)
+                    return pages_data, num_pages
+
                 for page_num in range(num_pages):
                     page = pdf_reader.pages[page_num]
                     text = page.extract_text()
@@ -65,11 +226,225 @@ class PDFService:
                         "text": text
                     })
 
+                    if progress_callback:
+                        progress_callback("extracted", page_num + 1, num_pages)
+
                 return pages_data, num_pages
 
         except Exception as e:
             raise Exception(f"PDF 텍스트 추출 중 오류 발생: {str(e)}")
 
+    def _page_text_path(self, document_id: str, create: bool = False) -> str:
+        """문서의 페이지 텍스트 파일 경로 (PAGE_TEXT_DIR/<문서 ID 앞 2자리>/<문서 ID>.jsonl)"""
+        return os.path.join(self._shard_dir(settings.PAGE_TEXT_DIR, document_id, create), f"{document_id}.jsonl")
+
+    def save_page_texts(self, document_id: str, pages_data: List[Dict]):
+        """
+        추출한 페이지별 텍스트를 JSONL로 저장 (페이지당 한 줄)
+
+        Args:
+            document_id: 문서 ID
+            pages_data: 페이지별 텍스트 리스트
+        """
+        path = self._page_text_path(document_id, create=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for page_data in pages_data:
+                f.write(json.dumps(page_data, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+        os.replace(temp_path, path)
+
+    def load_page_texts(self, document_id: str) -> Optional[Tuple[List[Dict], int]]:
+        """
+        저장된 페이지별 텍스트 로드
+
+        Args:
+            document_id: 문서 ID
+
+        Returns:
+            (페이지별 텍스트 리스트, 페이지 수) 튜플 또는 None (저장된 텍스트가 없는 경우)
+        """
+        path = self._page_text_path(document_id)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                pages_data = [json.loads(line) for line in f if line.strip()]
+            return pages_data, len(pages_data)
+        except Exception as e:
+            print(f"페이지 텍스트 로드 실패 ({document_id}): {str(e)}")
+            return None
+
+    def count_pages(self, document_id: str, file_path: str) -> int:
+        """
+        문서 페이지 수 (저장된 페이지 텍스트가 있으면 줄 수, 없으면 PDF 페이지 수)
+
+        Args:
+            document_id: 문서 ID
+            file_path: PDF 파일 경로
+
+        Returns:
+            페이지 수 (읽을 수 없으면 0)
+        """
+        path = self._page_text_path(document_id)
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return sum(1 for line in f if line.strip())
+            with open(file_path, 'rb') as f:
+                return len(PyPDF2.PdfReader(f).pages)
+        except Exception:
+            return 0
+
+    def get_page_texts(
+        self,
+        document_id: str,
+        file_path: str,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> Tuple[List[Dict], int]:
+        """
+        페이지별 텍스트 조회 (저장된 텍스트가 있으면 재사용, 없으면 추출 후 저장)
+
+        Args:
+            document_id: 문서 ID
+            file_path: PDF 파일 경로
+            progress_callback: 진행률 콜백
+
+        Returns:
+            (페이지별 텍스트 리스트, 페이지 수) 튜플
+        """
+        loaded = self.load_page_texts(document_id)
+        if loaded:
+            pages_data, num_pages = loaded
+            if progress_callback:
+                progress_callback("extracted", num_pages, num_pages)
+            return pages_data, num_pages
+
+        pages_data, num_pages = self.extract_text_from_pdf(file_path, progress_callback)
+        self.save_page_texts(document_id, pages_data)
+        return pages_data, num_pages
+
+    def open_page_stream(
+        self,
+        document_id: str,
+        file_path: str,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> Tuple[int, Iterator[Dict]]:
+        """
+        페이지별 텍스트를 한 페이지씩 반환하는 스트림 열기
+
+        저장된 페이지 텍스트가 있으면 그대로 사용하고, 없으면 PDF에서 한 페이지씩 추출하며
+        모든 페이지를 추출한 뒤 페이지 텍스트 파일을 저장함.
+        PDF_EXTRACT_WORKERS가 2 이상이고 페이지 수가 PDF_PARALLEL_MIN_PAGES 이상이면
+        extract_text_from_pdf와 같이 프로세스 풀로 먼저 모두 추출한 뒤 스트림으로 반환함
+
+        Args:
+            document_id: 문서 ID
+            file_path: PDF 파일 경로
+            progress_callback: 진행률 콜백 ("extracted", 완료 페이지 수, 전체 페이지 수)
+
+        Returns:
+            (페이지 수, 페이지별 텍스트 이터레이터) 튜플
+        """
+        loaded = self.load_page_texts(document_id)
+        if loaded:
+            pages_data, num_pages = loaded
+            if progress_callback:
+                progress_callback("extracted", num_pages, num_pages)
+            return num_pages, iter(pages_data)
+
+        try:
+            with open(file_path, 'rb') as file:
+                num_pages = len(PyPDF2.PdfReader(file).pages)
+        except Exception as e:
+            raise Exception(f"PDF 텍스트 추출 중 오류 발생: {str(e)}")
+
+        if settings.PDF_EXTRACT_WORKERS > 1 and num_pages >= settings.PDF_PARALLEL_MIN_PAGES:
+            try:
+                pages_data = self._extract_parallel(
+                    file_path, num_pages, settings.PDF_EXTRACT_WORKERS, progress_callback
+                )
+            except Exception as e:
+                raise Exception(f"PDF 텍스트 추출 중 오류 발생: {str(e)}")
+            self.save_page_texts(document_id, pages_data)
+            return num_pages, iter(pages_data)
+
+        def iter_pages() -> Iterator[Dict]:
+            # 파일은 스트림을 읽기 시작할 때 열고, 끝나거나 중단되면 닫음
+            pages_data = []
+            with open(file_path, 'rb') as file:
+                try:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                except Exception as e:
+                    raise Exception(f"PDF 텍스트 추출 중 오류 발생: {str(e)}")
+
+                for page_num in range(num_pages):
+                    try:
+                        text = self._clean_text(pdf_reader.pages[page_num].extract_text())
+                    except Exception as e:
+                        raise Exception(f"PDF 텍스트 추출 중 오류 발생: {str(e)}")
+
+                    page_data = {"page_number": page_num + 1, "text": text}
+                    pages_data.append(page_data)
+                    if progress_callback:
+                        progress_callback("extracted", page_num + 1, num_pages)
+                    yield page_data
+
+            self.save_page_texts(document_id, pages_data)
+
+        return num_pages, iter_pages()
+
+    def _extract_parallel(
+        self,
+        file_path: str,
+        num_pages: int,
+        workers: int,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> List[Dict]:
+        """
+        페이지 구간을 프로세스 풀에 나누어 텍스트 추출
+
+        Args:
+            file_path: PDF 파일 경로
+            num_pages: 전체 페이지 수
+            workers: 프로세스 수
+            progress_callback: 진행률 콜백
+
+        Returns:
+            페이지 순서대로 정렬된 페이지별 텍스트 리스트
+        """
+        # 워커마다 PDF를 한 번만 파싱하도록 워커 수만큼 구간을 나눔
+        num_shards = min(num_pages, workers)
+        shard_size = -(-num_pages // num_shards)
+        ranges = [(start, min(start + shard_size, num_pages)) for start in range(0, num_pages, shard_size)]
+
+        texts: List[Optional[str]] = [None] * num_pages
+        pages_done = 0
+
+        # 문서마다 프로세스를 새로 띄우지 않도록 공유 프로세스 풀 사용
+        executor = get_process_pool(workers)
+        futures = [executor.submit(extract_page_range, file_path, start, end) for start, end in ranges]
+        try:
+            for future in as_completed(futures):
+                for page_num, text in future.result():
+                    texts[page_num] = text
+                    pages_done += 1
+                if progress_callback:
+                    progress_callback("extracted", pages_done, num_pages)
+        except BaseException as e:
+            for future in futures:
+                future.cancel()
+            # 워커 프로세스가 비정상 종료되면 다음 호출 때 풀을 새로 만듦
+            if isinstance(e, BrokenProcessPool):
+                shutdown_process_pool()
+            raise
+
+        return [
+            {"page_number": page_num + 1, "text": self._clean_text(text)}
+            for page_num, text in enumerate(texts)
+        ]
+
     def _clean_text(self, text: str) -> str:
         """
         텍스트 정제
@@ -117,11 +492,24 @@ class PDFService:
         Returns:
             청크 리스트 (메타데이터 포함)
         """
-        chunk_documents = []
+        return list(self.iter_chunks(pages_data, document_id, filename))
+
+    def iter_chunks(self, pages: Iterable[Dict], document_id: str, filename: str) -> Iterator[Dict]:
+        """
+        페이지별 텍스트를 청크로 분할하며 하나씩 반환 (페이지 번호 유지)
+
+        Args:
+            pages: 페이지별 텍스트 이터러블 [{"page_number": int, "text": str}, ...]
+            document_id: 문서 ID
+            filename: 파일명
+
+        Yields:
+            청크 (메타데이터 포함)
+        """
         chunk_counter = 0
 
         # 각 페이지별로 청크 생성
-        for page_data in pages_data:
+        for page_data in pages:
             page_number = page_data["page_number"]
             page_text = page_data["text"]
 
@@ -134,23 +522,37 @@ class PDFService:
 
             # 각 청크에 페이지 번호 메타데이터 추가
             for chunk_idx, chunk_text in enumerate(page_chunks):
-                chunk_doc = {
-                    "chunk_id": f"{document_id}_chunk_{chunk_counter}",
+                yield {
+                    # 페이지 기준 ID (다른 페이지가 바뀌어도 유지되어 증분 재인덱싱이 가능)
+                    "chunk_id": f"{document_id}_p{page_number}_c{chunk_idx}",
                     "document_id": document_id,
                     "filename": filename,
                     "chunk_index": chunk_counter,
                     "text": chunk_text,
                     "metadata": {
                         "source": filename,
+                        "document_id": document_id,
                         "page_number": page_number,  # 실제 PDF 페이지 번호
                         "chunk_index": chunk_counter,
                         "page_chunk_index": chunk_idx  # 해당 페이지 내 청크 번호
                     }
                 }
-                chunk_documents.append(chunk_doc)
                 chunk_counter += 1
 
-        return chunk_documents
+    def find_uploaded_file(self, document_id: str) -> Optional[Tuple[str, str]]:
+        """
+        문서 ID로 업로드된 파일 찾기 (업로드 시 기록한 경로 조회)
+
+        Args:
+            document_id: 문서 ID
+
+        Returns:
+            (파일 경로, 원본 파일명) 튜플 또는 None
+        """
+        found = metadata_store.get_uploaded_file(document_id)
+        if found and os.path.exists(found[0]):
+            return found
+        return None
 
     def validate_file(self, filename: str, file_size: int) -> Tuple[bool, str]:
         """
@@ -186,13 +588,20 @@ class PDFService:
             삭제 성공 여부
         """
         try:
-            # 업로드 디렉토리에서 해당 document_id로 시작하는 파일 찾기
-            for filename in os.listdir(settings.UPLOAD_DIR):
-                if filename.startswith(document_id):
-                    file_path = os.path.join(settings.UPLOAD_DIR, filename)
-                    os.remove(file_path)
-                    return True
-            return False
+            # 저장된 페이지 텍스트 삭제
+            page_text_path = self._page_text_path(document_id)
+            if os.path.exists(page_text_path):
+                os.remove(page_text_path)
+
+            # 업로드 시 기록한 경로의 파일 삭제
+            found = metadata_store.get_uploaded_file(document_id)
+            if not found:
+                return False
+            metadata_store.delete_uploaded_file(document_id)
+            if not os.path.exists(found[0]):
+                return False
+            os.remove(found[0])
+            return True
         except Exception as e:
             print(f"파일 삭제 중 오류: {str(e)}")
             return False
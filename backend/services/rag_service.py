@@ -1,21 +1,58 @@
 import uuid
-from typing import List, Dict, Tuple
-import google.generativeai as genai
+import threading
+from typing import List, Dict, Tuple, Iterator, Optional
+import numpy as np
 from config import settings
 from services.vector_service import vector_service
+from services.cache_service import answer_cache
+from services.conversation_store import ConversationStore
 
 class RAGService:
     """RAG (Retrieval-Augmented Generation) 서비스"""
 
     def __init__(self):
-        # Gemini API 설정
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-
-        # Gemini 모델 초기화
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
-
-        # 대화 이력 저장소 (메모리)
-        self.conversations = {}
+        # Gemini 모델은 처음 사용할 때 초기화
+        self._model = None
+        self._load_lock = threading.Lock()
+
+        # 대화 이력 저장소 (SQLite + 최근 대화 메모리 캐시)
+        self.conversations = ConversationStore()
+
+        # 프롬프트 크기 통계
+        self._stats_lock = threading.Lock()
+        self.prompt_stats = {
+            "requests": 0,
+            "total_prompt_tokens": 0,
+            "max_prompt_tokens": 0,
+            "total_results": 0,
+            "total_included": 0,
+            "last": None
+        }
+
+    @property
+    def model(self):
+        """Gemini 모델 (최초 사용 시 API 설정 및 초기화)"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=settings.GEMINI_API_KEY)
+                    self._model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    @property
+    def is_ready(self) -> bool:
+        """Gemini 모델 초기화 여부"""
+        return self._model is not None
+
+    def warm_up(self):
+        """Gemini 모델 미리 초기화"""
+        _ = self.model
 
     def generate_answer(
         self,
@@ -38,24 +75,32 @@ class RAGService:
         if not conversation_id:
             conversation_id = f"conv_{uuid.uuid4().hex[:12]}"
 
+        # 답변 캐시 조회
+        cached, corpus_version, query_embedding = self._lookup_cache(query, top_k)
+        if cached is not None:
+            self._save_conversation(conversation_id, query, cached["answer"], cached["sources"])
+            return cached["answer"], cached["sources"], conversation_id
+
         # 관련 문서 검색
-        search_results = vector_service.search(query, top_k)
+        search_results = vector_service.search(query, top_k, query_embedding=query_embedding)
 
         # 검색 결과가 없는 경우
         if not search_results:
             answer = "죄송합니다. 업로드된 문서에서 관련 정보를 찾을 수 없습니다. 문서를 업로드하거나 다른 질문을 해주세요."
             return answer, [], conversation_id
 
-        # 컨텍스트 구성
-        context = self._build_context(search_results)
+        # 컨텍스트 구성 (토큰 예산 안에 들어간 결과만 출처로 사용)
+        context, search_results, context_stats = self._build_context(search_results)
 
         # 프롬프트 생성
         prompt = self._create_prompt(query, context)
+        self._record_prompt(prompt, context_stats)
 
         # Gemini API를 통한 답변 생성
         try:
             response = self.model.generate_content(prompt)
             answer = response.text
+            answer_cache.put(query, top_k, corpus_version, answer, search_results, query_embedding)
         except Exception as e:
             answer = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
 
@@ -64,27 +109,243 @@ class RAGService:
 
         return answer, search_results, conversation_id
 
-    def _build_context(self, search_results: List[Dict]) -> str:
+    def stream_answer(
+        self,
+        query: str,
+        conversation_id: str = None,
+        top_k: int = None
+    ) -> Iterator[Dict]:
         """
-        검색 결과로부터 컨텍스트 구성
+        질문에 대한 답변을 스트리밍으로 생성 (RAG)
+
+        검색 직후 출처를 먼저 내보내고, 이후 모델이 생성하는 토큰을 순서대로 내보냄
 
         Args:
-            search_results: 검색 결과 리스트
+            query: 사용자 질문
+            conversation_id: 대화 세션 ID (선택적)
+            top_k: 검색할 문서 개수
 
-        Returns:
-            컨텍스트 문자열
+        Yields:
+            {"type": "sources", "sources": [...], "conversation_id": str}
+            {"type": "token", "text": str}
+            {"type": "done", "conversation_id": str}
         """
-        context_parts = []
+        # 대화 ID가 없으면 새로 생성
+        if not conversation_id:
+            conversation_id = f"conv_{uuid.uuid4().hex[:12]}"
+
+        # 답변 캐시 조회
+        cached, corpus_version, query_embedding = self._lookup_cache(query, top_k)
+        if cached is not None:
+            yield {"type": "sources", "sources": cached["sources"], "conversation_id": conversation_id}
+            yield {"type": "token", "text": cached["answer"]}
+            self._save_conversation(conversation_id, query, cached["answer"], cached["sources"])
+            yield {"type": "done", "conversation_id": conversation_id}
+            return
+
+        # 관련 문서 검색
+        search_results = vector_service.search(query, top_k, query_embedding=query_embedding)
+
+        # 검색 결과가 없는 경우
+        if not search_results:
+            answer = "죄송합니다. 업로드된 문서에서 관련 정보를 찾을 수 없습니다. 문서를 업로드하거나 다른 질문을 해주세요."
+            yield {"type": "sources", "sources": [], "conversation_id": conversation_id}
+            yield {"type": "token", "text": answer}
+            yield {"type": "done", "conversation_id": conversation_id}
+            return
+
+        # 컨텍스트 및 프롬프트 구성 (토큰 예산 안에 들어간 결과만 출처로 사용)
+        context, search_results, context_stats = self._build_context(search_results)
+        prompt = self._create_prompt(query, context)
+        self._record_prompt(prompt, context_stats)
+        yield {"type": "sources", "sources": search_results, "conversation_id": conversation_id}
 
-        for result in search_results:
-            # 페이지 번호를 직접 참조 형식으로 사용
-            context_parts.append(
-                f"[{result['document']}, 페이지 {result['page']}]\n"
-                f"{result['text']}\n"
+        # Gemini API 스트리밍 응답
+        answer_parts = []
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                text = chunk.text
+                if text:
+                    answer_parts.append(text)
+                    yield {"type": "token", "text": text}
+            answer_cache.put(
+                query, top_k, corpus_version, "".join(answer_parts), search_results, query_embedding
             )
+        except Exception as e:
+            error_text = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
+            answer_parts.append(error_text)
+            yield {"type": "token", "text": error_text}
+
+        # 대화 이력 저장
+        self._save_conversation(conversation_id, query, "".join(answer_parts), search_results)
 
+        yield {"type": "done", "conversation_id": conversation_id}
+
+    def _lookup_cache(self, query: str, top_k: int = None) -> Tuple[Optional[Dict], int, Optional[np.ndarray]]:
+        """
+        답변 캐시 조회
+
+        Args:
+            query: 사용자 질문
+            top_k: 검색할 문서 개수
+
+        Returns:
+            (캐시 항목 또는 None, 코퍼스 버전, 질문 임베딩) 튜플
+            질문 임베딩은 유사도 매칭을 사용할 때만 계산되며, 캐시 실패 시 검색에 재사용됨
+        """
+        corpus_version = vector_service.corpus_version
+        query_embedding = vector_service.encode_query(query) if answer_cache.semantic_enabled else None
+        cached = answer_cache.get(query, top_k, corpus_version, query_embedding)
+        if cached is not None:
+            print(f"[캐시 적중] {query}")
+        return cached, corpus_version, query_embedding
+
+    def _build_context(self, search_results: List[Dict]) -> Tuple[str, List[Dict], Dict]:
+        """
+        검색 결과로부터 토큰 예산 안에서 컨텍스트 구성
+
+        - 순위가 높은 결과부터 CONTEXT_TOKEN_BUDGET 안에 들어가는 만큼만 포함
+        - 같은 텍스트의 청크는 한 번만 포함
+        - 같은 페이지의 연속된 청크는 겹치는 부분(CHUNK_OVERLAP)을 제거하고 하나로 병합
+
+        Args:
+            search_results: 검색 결과 리스트
+
+        Returns:
+            (컨텍스트 문자열, 컨텍스트에 포함된 검색 결과 리스트, 컨텍스트 통계) 튜플
+        """
+        budget = settings.CONTEXT_TOKEN_BUDGET
+        groups: Dict[Tuple[str, int], List[Dict]] = {}
+        group_tokens: Dict[Tuple[str, int], int] = {}
+        seen_texts = set()
+        used_tokens = 0
+        duplicates = 0
+        skipped = 0
+
+        ranked = sorted(
+            search_results,
+            key=lambda x: (x.get("source_type") == "direct", x.get("rank_score", x["score"])),
+            reverse=True
+        )
+        for result in ranked:
+            if result["text"] in seen_texts:
+                duplicates += 1
+                continue
+
+            key = (result["document"], result["page"])
+            candidate = groups.get(key, []) + [result]
+            tokens = self._estimate_tokens(self._format_page(key, candidate))
+            cost = tokens - group_tokens.get(key, 0)
+
+            if used_tokens + cost > budget:
+                if used_tokens > 0:
+                    skipped += 1
+                    continue
+                # 첫 결과부터 예산을 넘으면 예산 크기로 잘라서 포함
+                max_chars = int(budget * settings.CONTEXT_CHARS_PER_TOKEN)
+                result = {**result, "text": result["text"][:max_chars]}
+                candidate = [result]
+                tokens = self._estimate_tokens(self._format_page(key, candidate))
+                cost = tokens
+
+            groups[key] = candidate
+            group_tokens[key] = tokens
+            used_tokens += cost
+            seen_texts.add(result["text"])
+
+        # 페이지 순서대로 출력 (페이지 번호를 직접 참조 형식으로 사용)
+        context_parts = [self._format_page(key, groups[key]) for key in sorted(groups)]
         context = "\n".join(context_parts)
-        return context
+
+        included = [result for key in sorted(groups) for result in groups[key]]
+        stats = {
+            "results": len(search_results),
+            "included": len(included),
+            "duplicates": duplicates,
+            "skipped": skipped,
+            "pages": len(groups),
+            "context_tokens": self._estimate_tokens(context)
+        }
+        print(f"[컨텍스트] 결과 {stats['results']}개 중 {stats['included']}개 포함 "
+              f"(중복 {duplicates}, 예산 초과 {skipped}), 약 {stats['context_tokens']} 토큰")
+        return context, included, stats
+
+    def _format_page(self, key: Tuple[str, int], results: List[Dict]) -> str:
+        """같은 페이지의 청크를 병합하여 컨텍스트 항목 하나로 구성"""
+        document, page = key
+        return f"[{document}, 페이지 {page}]\n{self._merge_page_chunks(results)}\n"
+
+    def _merge_page_chunks(self, results: List[Dict]) -> str:
+        """
+        같은 페이지의 청크 병합 (페이지 내 순서대로, 연속된 청크는 겹치는 부분 제거)
+
+        Args:
+            results: 같은 페이지의 검색 결과 리스트
+
+        Returns:
+            병합된 텍스트
+        """
+        ordered = sorted(
+            results,
+            key=lambda x: x["page_chunk_index"] if x.get("page_chunk_index") is not None else -1
+        )
+
+        merged = ordered[0]["text"]
+        previous_index = ordered[0].get("page_chunk_index")
+        for result in ordered[1:]:
+            index = result.get("page_chunk_index")
+            text = result["text"]
+            overlap = self._overlap_length(merged, text)
+            if previous_index is not None and index == previous_index + 1 and overlap:
+                merged += text[overlap:]
+            else:
+                merged += "\n...\n" + text
+            previous_index = index
+        return merged
+
+    def _overlap_length(self, previous: str, text: str) -> int:
+        """앞 청크의 끝과 다음 청크의 시작이 겹치는 길이 (없으면 0)"""
+        for length in range(min(len(previous), len(text), settings.CHUNK_OVERLAP), 0, -1):
+            if previous.endswith(text[:length]):
+                return length
+        return 0
+
+    def _estimate_tokens(self, text: str) -> int:
+        """토큰 수 추정 (글자 수 기준 근사값)"""
+        return int(len(text) / settings.CONTEXT_CHARS_PER_TOKEN) + 1
+
+    def _record_prompt(self, prompt: str, context_stats: Dict):
+        """프롬프트 크기 통계 기록"""
+        prompt_tokens = self._estimate_tokens(prompt)
+        with self._stats_lock:
+            self.prompt_stats["requests"] += 1
+            self.prompt_stats["total_prompt_tokens"] += prompt_tokens
+            self.prompt_stats["max_prompt_tokens"] = max(self.prompt_stats["max_prompt_tokens"], prompt_tokens)
+            self.prompt_stats["total_results"] += context_stats["results"]
+            self.prompt_stats["total_included"] += context_stats["included"]
+            self.prompt_stats["last"] = {**context_stats, "prompt_chars": len(prompt), "prompt_tokens": prompt_tokens}
+        print(f"[프롬프트] {len(prompt)}자, 약 {prompt_tokens} 토큰")
+
+    def get_prompt_stats(self) -> Dict:
+        """
+        프롬프트 크기 통계 조회
+
+        Returns:
+            요청 수, 평균/최대 프롬프트 토큰 수(추정), 컨텍스트에 포함된 검색 결과 비율, 마지막 요청 통계
+        """
+        with self._stats_lock:
+            stats = dict(self.prompt_stats)
+        requests = stats.pop("requests")
+        total_results = stats.pop("total_results")
+        total_included = stats.pop("total_included")
+        return {
+            "token_budget": settings.CONTEXT_TOKEN_BUDGET,
+            "requests": requests,
+            "avg_prompt_tokens": round(stats.pop("total_prompt_tokens") / requests, 1) if requests else 0.0,
+            "max_prompt_tokens": stats["max_prompt_tokens"],
+            "included_ratio": round(total_included / total_results, 4) if total_results else 0.0,
+            "last": stats["last"]
+        }
 
     def _create_prompt(self, query: str, context: str) -> str:
         """
@@ -143,32 +404,11 @@ class RAGService:
             answer: 시스템 답변
             sources: 출처 문서
         """
-        from datetime import datetime
-
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = {
-                "conversation_id": conversation_id,
-                "messages": []
-            }
-
-        # 사용자 메시지 추가
-        self.conversations[conversation_id]["messages"].append({
-            "role": "user",
-            "content": query,
-            "timestamp": datetime.now().isoformat()
-        })
-
-        # 어시스턴트 메시지 추가
-        self.conversations[conversation_id]["messages"].append({
-            "role": "assistant",
-            "content": answer,
-            "timestamp": datetime.now().isoformat(),
-            "sources": sources
-        })
+        self.conversations.append_turn(conversation_id, query, answer, sources)
 
     def get_conversation(self, conversation_id: str) -> Dict:
         """
-        대화 이력 조회
+        대화 이력 조회 (출처의 청크 텍스트는 벡터 DB에서 다시 조회)
 
         Args:
             conversation_id: 대화 세션 ID
@@ -176,7 +416,30 @@ class RAGService:
         Returns:
             대화 이력
         """
-        return self.conversations.get(conversation_id, {})
+        conversation = self.conversations.get(conversation_id)
+        if not conversation:
+            return {}
+
+        chunk_ids = [
+            source["chunk_id"]
+            for message in conversation["messages"]
+            for source in message.get("sources", [])
+            if source.get("chunk_id")
+        ]
+        texts = vector_service.get_chunk_texts(chunk_ids)
+
+        messages = []
+        for message in conversation["messages"]:
+            if "sources" in message:
+                message = {
+                    **message,
+                    "sources": [
+                        {**source, "text": texts.get(source.get("chunk_id"), "")}
+                        for source in message["sources"]
+                    ]
+                }
+            messages.append(message)
+        return {"conversation_id": conversation_id, "messages": messages}
 
     def clear_conversation(self, conversation_id: str) -> bool:
         """
@@ -188,10 +451,7 @@ class RAGService:
         Returns:
             삭제 성공 여부
         """
-        if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
-            return True
-        return False
+        return self.conversations.delete(conversation_id)
 
 # 전역 서비스 인스턴스
 rag_service = RAGService()
@@ -0,0 +1,117 @@
+import time
+import threading
+from typing import List, Dict
+from config import settings
+
+class RerankService:
+    """
+    Cross-encoder 재순위화 서비스 (CPU)
+
+    1차 검색에서 넉넉히 가져온 후보를 (질문, 청크) 쌍으로 다시 점수화하여 상위 결과만 남김.
+    후보는 1차 검색 순위대로 배치 단위로 점수화하고, 시간 예산을 넘으면 남은 후보는
+    점수화하지 않고 1차 검색 순서대로 뒤에 붙임
+
+    Cross-encoder 점수(rerank_score)는 모델 출력(로짓 등) 그대로이므로 코사인 유사도나
+    결합 순위 점수와 비교하지 않음. rank_score는 최종 순위로부터 다시 매김
+    """
+
+    def __init__(self):
+        # Cross-encoder 모델은 처음 사용할 때 로드
+        self._model = None
+        self._load_lock = threading.Lock()
+
+        # 통계 (여러 실행기 스레드에서 갱신)
+        self._stats_lock = threading.Lock()
+        self.queries = 0
+        self.budget_exceeded = 0
+        self.total_ms = 0.0
+
+    @property
+    def model(self):
+        """Cross-encoder 모델 (최초 사용 시 로드)"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    print(f"재순위화 모델 로드 중: {settings.RERANKER_MODEL}")
+                    self._model = CrossEncoder(settings.RERANKER_MODEL, device="cpu")
+        return self._model
+
+    @property
+    def is_ready(self) -> bool:
+        """재순위화 모델 로드 여부"""
+        return self._model is not None
+
+    def warm_up(self):
+        """재순위화 모델 미리 로드"""
+        _ = self.model
+
+    def rerank(self, query: str, results: List[Dict], top_n: int) -> List[Dict]:
+        """
+        검색 결과 재순위화
+
+        Args:
+            query: 검색 쿼리
+            results: 1차 검색 결과 리스트 (순위 순)
+            top_n: 남길 결과 개수
+
+        Returns:
+            재순위화된 상위 결과 리스트
+            (점수화된 결과에는 rerank_score 추가, 모든 결과의 rank_score는 최종 순위 기준 0~1)
+        """
+        if not results:
+            return []
+
+        model = self.model  # 모델 로드 시간은 예산에서 제외
+        budget = settings.RERANK_TIME_BUDGET_MS / 1000
+        batch_size = settings.RERANK_BATCH_SIZE
+        started = time.perf_counter()
+
+        scored = []
+        for start in range(0, len(results), batch_size):
+            if scored and time.perf_counter() - started > budget:
+                with self._stats_lock:
+                    self.budget_exceeded += 1
+                print(f"  [재순위화] 시간 예산 초과: {len(scored)}/{len(results)}개만 점수화")
+                break
+
+            batch = results[start:start + batch_size]
+            scores = model.predict(
+                [(query, result["text"]) for result in batch],
+                batch_size=batch_size,
+                show_progress_bar=False
+            )
+            for result, score in zip(batch, scores):
+                scored.append({**result, "rerank_score": round(float(score), 4)})
+
+        scored.sort(key=lambda x: x["rerank_score"], reverse=True)
+        reranked = (scored + results[len(scored):])[:top_n]
+
+        # 점수화된 결과와 점수화되지 않은 결과의 점수 척도가 다르므로
+        # 컨텍스트 구성에 쓰는 rank_score는 최종 순위로 매김 (1위 1.0)
+        reranked = [
+            {**result, "rank_score": round(1.0 - idx / len(reranked), 4)}
+            for idx, result in enumerate(reranked)
+        ]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.queries += 1
+            self.total_ms += elapsed_ms
+        print(f"  [재순위화] 후보 {len(results)}개 중 {len(reranked)}개 선택 ({elapsed_ms:.1f}ms)")
+        return reranked
+
+    def get_stats(self) -> Dict:
+        """재순위화 통계"""
+        with self._stats_lock:
+            return {
+                "enabled": settings.RERANK_ENABLED,
+                "model": settings.RERANKER_MODEL,
+                "queries": self.queries,
+                "budget_exceeded": self.budget_exceeded,
+                "avg_ms": round(self.total_ms / self.queries, 2) if self.queries else 0.0
+            }
+
+# 전역 서비스 인스턴스
+rerank_service = RerankService()
@@ -1,32 +1,110 @@
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Optional, Tuple, Callable, Iterable
+import numpy as np
 from config import settings
-import json
-import os
+from services.cache_service import EmbeddingCache
+from services.embedding_backend import load_embedding_model
+from services.embedding_store import EmbeddingStore
+from services.lexical_index import BM25Index
+from services.rerank_service import rerank_service
+from services.metadata_store import metadata_store
+from utils.pipeline import prefetch
+import time
+import threading
 
 class VectorService:
     """ChromaDB 벡터 데이터베이스 서비스"""
 
     def __init__(self):
-        # ChromaDB 클라이언트 초기화
-        self.client = chromadb.PersistentClient(
-            path=settings.CHROMA_DB_PATH,
-            settings=ChromaSettings(
-                anonymized_telemetry=False
-            )
+        # ChromaDB 클라이언트, 컬렉션, 임베딩 모델은 처음 사용할 때 로드
+        # (서버 시작 시에는 warm_up()으로 미리 로드)
+        self._client = None
+        self._collection = None
+        self._embedding_model = None
+        self._load_lock = threading.RLock()
+
+        # 임베딩 모델 식별자 (모델/백엔드가 바뀌면 저장된 임베딩을 재사용하지 않음)
+        model_key = f"{settings.EMBEDDING_MODEL}@{settings.EMBEDDING_BACKEND}"
+
+        # 쿼리 임베딩 캐시 (/query, /chat 공용)
+        self.query_embedding_cache = EmbeddingCache(
+            max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            path=settings.QUERY_EMBEDDING_CACHE_PATH,
+            model_key=model_key
         )
 
-        # 임베딩 모델 로드
-        self.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
-
-        # 컬렉션 가져오기 또는 생성
-        self.collection = self._get_or_create_collection()
-
-        # 문서 메타데이터 저장소 (간단한 JSON 파일)
-        self.metadata_file = os.path.join(settings.CHROMA_DB_PATH, "documents_metadata.json")
-        self.documents_metadata = self._load_metadata()
+        # 청크 임베딩 저장소 (모델/백엔드별로 분리)
+        self.embedding_store = EmbeddingStore(model_key) if settings.EMBEDDING_STORE_ENABLED else None
+
+        # 문서 메타데이터 / 코퍼스 버전 저장소 (SQLite, 워커 프로세스 간 공유)
+        self.metadata_store = metadata_store
+
+        # (document_id, page_number) -> 청크 ID 리스트 (인접 페이지 조회용, 컬렉션 로드 시 구성)
+        self.page_index: Dict[Tuple[str, int], List[str]] = {}
+        # 페이지 인덱스 갱신/순회 보호 (작업 스레드와 요청 스레드가 함께 사용)
+        self._index_lock = threading.RLock()
+
+        # BM25 키워드 색인 (하이브리드 검색용, 컬렉션 로드 시 구성)
+        self.lexical_index = BM25Index() if settings.SEARCH_MODE == "hybrid" else None
+
+        # 페이지 인덱스 / BM25 색인이 반영하고 있는 코퍼스 버전
+        # (다른 워커가 코퍼스를 바꾸면 저장소 버전과 달라지며, 다음 검색 시 색인을 다시 구성)
+        self._synced_version: Optional[int] = None
+
+    @property
+    def client(self):
+        """ChromaDB 클라이언트 (최초 사용 시 초기화)"""
+        if self._client is None:
+            with self._load_lock:
+                if self._client is None:
+                    import chromadb
+                    from chromadb.config import Settings as ChromaSettings
+
+                    if settings.CHROMA_HOST:
+                        # ChromaDB 서버 (여러 워커가 같은 컬렉션을 공유)
+                        self._client = chromadb.HttpClient(
+                            host=settings.CHROMA_HOST,
+                            port=settings.CHROMA_PORT,
+                            settings=ChromaSettings(
+                                anonymized_telemetry=False
+                            )
+                        )
+                    else:
+                        self._client = chromadb.PersistentClient(
+                            path=settings.CHROMA_DB_PATH,
+                            settings=ChromaSettings(
+                                anonymized_telemetry=False
+                            )
+                        )
+        return self._client
+
+    @property
+    def collection(self):
+        """ChromaDB 컬렉션 (최초 사용 시 로드 후 페이지 인덱스 구성)"""
+        if self._collection is None:
+            with self._load_lock:
+                if self._collection is None:
+                    self._collection = self._get_or_create_collection()
+                    self._build_page_index()
+        return self._collection
+
+    @property
+    def embedding_model(self):
+        """임베딩 모델 (최초 사용 시 로드)"""
+        if self._embedding_model is None:
+            with self._load_lock:
+                if self._embedding_model is None:
+                    self._embedding_model = load_embedding_model()
+        return self._embedding_model
+
+    @property
+    def is_ready(self) -> bool:
+        """컬렉션과 임베딩 모델이 모두 로드되었는지 여부"""
+        return self._collection is not None and self._embedding_model is not None
+
+    def warm_up(self):
+        """컬렉션과 임베딩 모델 미리 로드"""
+        _ = self.collection
+        _ = self.embedding_model
 
     def _get_or_create_collection(self):
         """컬렉션 가져오기 또는 생성"""
@@ -51,101 +129,547 @@ class VectorService:
                 print(f"기존 컬렉션 '{settings.COLLECTION_NAME}' 사용 (코사인 유사도)")
 
         except Exception:
-            # 컬렉션이 없으면 새로 생성
-            collection = self.client.create_collection(
+            # 컬렉션이 없으면 새로 생성 (여러 워커가 동시에 생성해도 같은 컬렉션을 사용)
+            collection = self.client.get_or_create_collection(
                 name=settings.COLLECTION_NAME,
                 metadata={"description": "PDF 문서 임베딩 컬렉션", "hnsw:space": "cosine"}
             )
-            print(f"새 컬렉션 '{settings.COLLECTION_NAME}' 생성됨 (코사인 유사도)")
+            print(f"컬렉션 '{settings.COLLECTION_NAME}' 사용 (코사인 유사도)")
 
         return collection
 
-    def _load_metadata(self) -> Dict:
-        """문서 메타데이터 로드"""
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+    @property
+    def corpus_version(self) -> int:
+        """코퍼스 버전 (문서 추가/삭제 시 증가, 답변 캐시 무효화에 사용, 워커 간 공유)"""
+        return self.metadata_store.get_version()
 
-    def _save_metadata(self):
-        """문서 메타데이터 저장"""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.documents_metadata, f, ensure_ascii=False, indent=2)
+    def _bump_corpus_version(self, document_ids: List[str]):
+        """코퍼스 버전 증가 (그 사이 다른 워커의 변경이 있었으면 다음 동기화 때 반영)"""
+        previous, current = self.metadata_store.bump_version(document_ids)
+        if previous == self._synced_version:
+            self._synced_version = current
 
-    def add_documents(self, chunks: List[Dict], document_id: str, filename: str, total_pages: int):
+    def _sync_indexes(self):
         """
-        문서 청크를 벡터 DB에 추가
+        다른 워커의 코퍼스 변경을 페이지 인덱스와 BM25 색인에 반영
+
+        변경 기록에서 바뀐 문서만 찾아 그 문서의 청크만 다시 읽고,
+        변경 기록으로 알 수 없는 경우(기록 정리, 문서를 모르는 변경)에만 전체를 다시 구성함
+        """
+        _ = self.collection  # 최초 로드 시 색인 구성
+        if self.metadata_store.get_version() == self._synced_version:
+            return
+        with self._load_lock:
+            version, document_ids = self.metadata_store.get_changes(self._synced_version)
+            if version == self._synced_version:
+                return
+            if document_ids is None:
+                print(f"다른 워커의 코퍼스 변경 감지: 색인 다시 구성")
+                self._build_page_index()
+                return
+
+            self._reload_documents(document_ids)
+            self._synced_version = version
+            print(f"다른 워커의 코퍼스 변경 반영: 문서 {len(document_ids)}개")
+
+    def _reload_documents(self, document_ids: List[str]):
+        """문서들의 청크를 컬렉션에서 다시 읽어 페이지 인덱스와 BM25 색인의 해당 문서 항목 교체"""
+        chunks = []
+        if document_ids:
+            include = ["metadatas", "documents"] if self.lexical_index is not None else ["metadatas"]
+            results = self.collection.get(where={"document_id": {"$in": document_ids}}, include=include)
+            for idx, (chunk_id, metadata) in enumerate(zip(results["ids"], results["metadatas"])):
+                chunks.append({
+                    "chunk_id": chunk_id,
+                    "document_id": metadata["document_id"],
+                    "metadata": metadata,
+                    "text": results["documents"][idx] if results.get("documents") else ""
+                })
+
+        with self._index_lock:
+            for document_id in document_ids:
+                self._unindex_document(document_id)
+            self._index_chunks(chunks)
+
+    def save_document_metadata(
+        self,
+        document_id: str,
+        filename: str,
+        total_pages: int,
+        chunk_count: int,
+        bump_version: bool = True
+    ):
+        """
+        문서 메타데이터 갱신 후 저장 (기존 문서는 업로드 날짜 유지)
+
+        문서의 모든 청크를 기록한 뒤 호출하며, 코퍼스 버전은 여기서 문서당 한 번만 증가시킴
+        (청크 배치마다 증가시키면 다른 워커가 문서 하나를 인덱싱하는 동안 색인을 여러 번 다시 구성함)
 
         Args:
-            chunks: 청크 리스트
             document_id: 문서 ID
             filename: 파일명
             total_pages: 총 페이지 수
+            chunk_count: 청크 수
+            bump_version: 코퍼스 버전 증가 여부 (호출 측에서 이미 증가시킨 경우 False)
         """
-        if not chunks:
-            raise ValueError("청크가 비어있습니다.")
+        self.metadata_store.upsert_document(document_id, filename, total_pages, chunk_count)
+        if bump_version:
+            self._bump_corpus_version([document_id])
+
+    def _build_page_index(self):
+        """컬렉션의 청크 메타데이터로 문서별 페이지 인덱스 (및 BM25 색인) 구성"""
+        # 구성 도중의 변경을 놓치지 않도록 조회 전에 버전 기록
+        version = self.metadata_store.get_version()
+        page_index: Dict[Tuple[str, int], List[str]] = {}
+        lexical_index = BM25Index() if self.lexical_index is not None else None
+
+        if self.collection.count() > 0:
+            # document_id가 없는 기존 청크는 파일명으로 문서 ID를 찾음
+            filename_to_id = {
+                metadata["filename"]: doc_id
+                for doc_id, metadata in self.metadata_store.all_documents().items()
+            }
+
+            include = ["metadatas", "documents"] if lexical_index is not None else ["metadatas"]
+            results = self.collection.get(include=include)
+            for idx, (chunk_id, metadata) in enumerate(zip(results["ids"], results["metadatas"])):
+                source = metadata.get("source", "Unknown")
+                document_id = metadata.get("document_id") or filename_to_id.get(source, source)
+                key = (document_id, metadata.get("page_number", 0))
+                page_index.setdefault(key, []).append(chunk_id)
+
+                if lexical_index is not None:
+                    lexical_index.add(chunk_id, document_id, results["documents"][idx])
+
+        with self._index_lock:
+            self.page_index = page_index
+            self.lexical_index = lexical_index
+            self._synced_version = version
+
+        print(f"페이지 인덱스 구성 완료: {len(self.page_index)}개 페이지")
+        if self.lexical_index is not None:
+            print(f"BM25 색인 구성 완료: {len(self.lexical_index)}개 청크")
+
+    def _index_chunks(self, chunks: List[Dict]):
+        """새로 추가된 청크를 페이지 인덱스와 BM25 색인에 반영 (각 청크의 document_id 기준)"""
+        with self._index_lock:
+            for chunk in chunks:
+                key = (chunk["document_id"], chunk["metadata"].get("page_number", 0))
+                self.page_index.setdefault(key, []).append(chunk["chunk_id"])
+                if self.lexical_index is not None:
+                    self.lexical_index.add(chunk["chunk_id"], chunk["document_id"], chunk["text"])
+
+    def _unindex_document(self, document_id: str):
+        """문서의 모든 페이지를 페이지 인덱스와 BM25 색인에서 제거"""
+        with self._index_lock:
+            for key in [key for key in self.page_index if key[0] == document_id]:
+                del self.page_index[key]
+            if self.lexical_index is not None:
+                self.lexical_index.remove_document(document_id)
+
+    def add_documents_stream(
+        self,
+        chunks: Iterable[Dict],
+        document_id: str,
+        filename: str,
+        total_pages: int,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> int:
+        """
+        청크 스트림을 배치 단위로 임베딩하며 벡터 DB에 추가
+
+        청크 생성(페이지 추출 + 분할)은 백그라운드 스레드에서 진행되고, 임베딩 배치가
+        모이는 대로 임베딩하며, 임베딩된 청크가 CHROMA_WRITE_BATCH_SIZE개 모이면 기록함.
+        대기 중인 청크 수가 INDEX_PREFETCH_CHUNKS를 넘으면 청크 생성이 대기하므로
+        문서 크기와 관계없이 메모리 사용량이 제한됨. 도중에 실패하면 이미 기록한 청크를 삭제함
 
-        print(f"\n=== 문서 인덱싱 시작 ===")
+        Args:
+            chunks: 청크 이터러블 (pdf_service.iter_chunks 결과)
+            document_id: 문서 ID
+            filename: 파일명
+            total_pages: 총 페이지 수
+            progress_callback: 진행률 콜백 (단계("embedded"/"written"), 완료 수, 현재까지 생성된 청크 수)
+
+        Returns:
+            저장된 청크 수
+        """
+        print(f"\n=== 문서 인덱싱 시작 (스트리밍) ===")
         print(f"문서 ID: {document_id}")
         print(f"파일명: {filename}")
         print(f"총 페이지: {total_pages}")
-        print(f"청크 개수: {len(chunks)}")
 
-        try:
-            # 텍스트 추출
-            texts = [chunk["text"] for chunk in chunks]
-            print(f"[1/4] 텍스트 추출 완료: {len(texts)}개 청크")
-
-            # 임베딩 생성
-            print(f"[2/4] 임베딩 생성 중...")
-            embeddings = self.embedding_model.encode(texts, convert_to_numpy=True).tolist()
-            print(f"[2/4] 임베딩 생성 완료: {len(embeddings)}개 벡터")
-
-            # ChromaDB에 추가할 데이터 준비
-            ids = [chunk["chunk_id"] for chunk in chunks]
-            metadatas = [chunk["metadata"] for chunk in chunks]
-            print(f"[3/4] 데이터 준비 완료")
-
-            # ChromaDB에 추가
-            print(f"[4/4] ChromaDB에 저장 중...")
-            self.collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=metadatas
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        write_batch_size = self.get_write_batch_size()
+        written: List[Dict] = []  # 기록 중/기록된 청크 (실패 시 롤백 대상)
+        unwritten: List[Dict] = []  # 임베딩 후 기록 대기 중인 청크
+        unwritten_embeddings: List[np.ndarray] = []
+        counts = {"seen": 0, "embedded": 0}
+
+        def report(stage: str, done: int):
+            if progress_callback:
+                progress_callback(stage, done, counts["seen"])
+
+        def embed(batch: List[Dict]):
+            # 임베딩은 EMBEDDING_BATCH_SIZE 단위, 기록은 CHROMA_WRITE_BATCH_SIZE개가 모이면 수행
+            embedded_before = counts["embedded"]
+            embeddings = self.embed_chunk_texts(
+                [chunk["text"] for chunk in batch],
+                lambda _stage, done, _total: report("embedded", embedded_before + done)
+            )
+            counts["embedded"] += len(batch)
+
+            unwritten.extend(batch)
+            unwritten_embeddings.append(embeddings)
+            if len(unwritten) >= write_batch_size:
+                write()
+
+        def write(final: bool = False):
+            # 마지막이 아니면 CHROMA_WRITE_BATCH_SIZE의 배수만큼만 기록하고 나머지는 다음 기록으로 넘김
+            count = len(unwritten) if final else len(unwritten) - len(unwritten) % write_batch_size
+            pending_embeddings = np.concatenate(unwritten_embeddings)
+            chunks_to_write, embeddings = unwritten[:count], pending_embeddings[:count]
+            del unwritten[:count]
+            unwritten_embeddings[:] = [pending_embeddings[count:]]
+
+            # 기록 도중 실패해도 일부 기록된 청크를 지울 수 있도록 기록 전에 등록
+            written_before = len(written)
+            written.extend(chunks_to_write)
+            self.write_chunks(
+                chunks_to_write,
+                embeddings,
+                lambda _stage, done, _total: report("written", written_before + done)
             )
 
-            # 저장 확인
-            count_after = self.collection.count()
-            print(f"[4/4] ChromaDB 저장 완료!")
-            print(f"      현재 ChromaDB 총 청크 수: {count_after}")
-
-            # 문서 메타데이터 저장
-            from datetime import datetime
-            self.documents_metadata[document_id] = {
-                "id": document_id,
-                "filename": filename,
-                "upload_date": datetime.now().isoformat(),
-                "pages": total_pages,
-                "chunks": len(chunks)
-            }
-            self._save_metadata()
-            print(f"[완료] 메타데이터 저장 완료")
+        try:
+            batch: List[Dict] = []
+            for chunk in prefetch(chunks, settings.INDEX_PREFETCH_CHUNKS):
+                batch.append(chunk)
+                counts["seen"] += 1
+                if len(batch) >= batch_size:
+                    embed(batch)
+                    batch = []
+            if batch:
+                embed(batch)
+            if unwritten:
+                write(final=True)
+
+            if not written:
+                raise ValueError("청크가 비어있습니다.")
+
+            # 문서 메타데이터 저장 (코퍼스 버전 증가 포함)
+            self.save_document_metadata(document_id, filename, total_pages, len(written))
+            print(f"[완료] 청크 {len(written)}개 저장, 현재 ChromaDB 총 청크 수: {self.collection.count()}")
             print(f"=== 문서 인덱싱 성공 ===\n")
+            return len(written)
 
         except Exception as e:
+            # 일부만 기록된 문서가 검색되지 않도록 기록한 청크 삭제
+            if written:
+                self.remove_chunks(written)
+                print(f"[롤백] 기록된 청크 {len(written)}개 삭제")
             print(f"\n[ERROR] 문서 인덱싱 실패!")
             print(f"오류 내용: {str(e)}")
             print(f"오류 타입: {type(e).__name__}")
-            import traceback
-            print(f"상세 스택:\n{traceback.format_exc()}")
             print(f"=== 문서 인덱싱 실패 ===\n")
             raise
 
-    def search(self, query: str, top_k: int = None, include_adjacent: bool = True) -> List[Dict]:
+    def remove_chunks(self, chunks: List[Dict]):
+        """기록된 청크를 ChromaDB와 페이지 인덱스에서 제거 (실패한 인덱싱 롤백용)"""
+        chunk_ids = [chunk["chunk_id"] for chunk in chunks]
+        self.collection.delete(ids=chunk_ids)
+
+        removed = set(chunk_ids)
+        with self._index_lock:
+            if self.lexical_index is not None:
+                self.lexical_index.remove(chunk_ids)
+
+            for chunk in chunks:
+                key = (chunk["document_id"], chunk["metadata"].get("page_number", 0))
+                if key in self.page_index:
+                    self.page_index[key] = [cid for cid in self.page_index[key] if cid not in removed]
+                    if not self.page_index[key]:
+                        del self.page_index[key]
+        self._bump_corpus_version(sorted({chunk["document_id"] for chunk in chunks}))
+
+    def embed_chunk_texts(
+        self,
+        texts: List[str],
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        batch_size: int = None
+    ) -> np.ndarray:
+        """
+        청크 임베딩 생성 (임베딩 저장소에 있는 텍스트는 모델을 거치지 않음)
+
+        Args:
+            texts: 청크 텍스트 리스트
+            progress_callback: 진행률 콜백 ("embedded", 완료 수, 전체 수)
+            batch_size: 모델 1회 인코딩 크기 (기본값은 EMBEDDING_BATCH_SIZE 설정)
+
+        Returns:
+            임베딩 배열 (len(texts) x 차원, texts와 같은 순서)
+        """
+        vectors: Dict[int, np.ndarray] = {}
+
+        # 저장소에서 재사용
+        if self.embedding_store is not None:
+            vectors.update(self.embedding_store.get_many(texts))
+
+        missing = [idx for idx in range(len(texts)) if idx not in vectors]
+        done = len(texts) - len(missing)
+        print(f"      저장소 재사용: {done}개, 새로 임베딩: {len(missing)}개")
+        if progress_callback:
+            progress_callback("embedded", done, len(texts))
+
+        # 새 청크만 모델로 임베딩 (모델 내부에서 다시 나누지 않도록 batch_size도 전달)
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        for start in range(0, len(missing), batch_size):
+            batch_indices = missing[start:start + batch_size]
+            batch_texts = [texts[idx] for idx in batch_indices]
+            batch_vectors = self.embedding_model.encode(batch_texts, batch_size=batch_size, convert_to_numpy=True)
+
+            if self.embedding_store is not None:
+                self.embedding_store.put_many(batch_texts, batch_vectors)
+
+            vectors.update(zip(batch_indices, batch_vectors))
+
+            done += len(batch_indices)
+            if progress_callback:
+                progress_callback("embedded", done, len(texts))
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([vectors[idx] for idx in range(len(texts))]).astype(np.float32, copy=False)
+
+    def get_write_batch_size(self) -> int:
+        """ChromaDB 1회 기록 크기 (설정값과 ChromaDB 최대 배치 크기 중 작은 값)"""
+        batch_size = settings.CHROMA_WRITE_BATCH_SIZE
+        get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        if get_max_batch_size is not None:
+            batch_size = min(batch_size, get_max_batch_size())
+        return max(1, batch_size)
+
+    def _write_batches(
+        self,
+        write: Callable,
+        ids: List[str],
+        embeddings: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict],
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ):
+        """
+        ChromaDB에 배치 단위로 기록 (실패한 배치만 재시도)
+
+        임베딩은 numpy 배열 그대로 전달하여 파이썬 리스트 변환을 거치지 않음
+
+        Args:
+            write: 기록 메서드 (collection.add 또는 collection.upsert)
+            ids: 청크 ID 리스트
+            embeddings: 임베딩 배열 (ids와 같은 순서)
+            documents: 청크 텍스트 리스트
+            metadatas: 메타데이터 리스트
+            progress_callback: 진행률 콜백 ("written", 완료 수, 전체 수)
+        """
+        batch_size = self.get_write_batch_size()
+        total = len(ids)
+
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+
+            for attempt in range(settings.CHROMA_WRITE_RETRIES + 1):
+                try:
+                    write(
+                        ids=ids[start:end],
+                        embeddings=embeddings[start:end],
+                        documents=documents[start:end],
+                        metadatas=metadatas[start:end]
+                    )
+                    break
+                except Exception as e:
+                    if attempt >= settings.CHROMA_WRITE_RETRIES:
+                        raise
+                    delay = settings.CHROMA_WRITE_RETRY_DELAY * (2 ** attempt)
+                    print(f"      [재시도] 청크 {start}~{end - 1} 기록 실패 ({str(e)}), {delay:.1f}초 후 재시도")
+                    time.sleep(delay)
+
+            if progress_callback:
+                progress_callback("written", end, total)
+
+    def write_chunks(
+        self,
+        chunks: List[Dict],
+        embeddings: np.ndarray,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ):
+        """
+        임베딩이 끝난 청크를 ChromaDB에 기록 (여러 문서의 청크를 한 번에 기록 가능)
+
+        문서 메타데이터와 코퍼스 버전은 갱신하지 않으므로 문서의 모든 청크를 기록한 뒤
+        save_document_metadata()를 호출해야 함
+
+        Args:
+            chunks: 청크 리스트 (각 청크에 document_id 포함)
+            embeddings: 청크와 같은 순서의 임베딩 배열
+            progress_callback: 기록 배치마다 호출되는 진행률 콜백 ("written", 완료 수, 전체 수)
+        """
+        if not chunks:
+            return
+
+        self._write_batches(
+            self.collection.add,
+            [chunk["chunk_id"] for chunk in chunks],
+            embeddings,
+            [chunk["text"] for chunk in chunks],
+            [chunk["metadata"] for chunk in chunks],
+            progress_callback
+        )
+
+        # 페이지 인덱스 및 BM25 색인 갱신
+        self._index_chunks(chunks)
+
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        검색 쿼리 임베딩 생성 (캐시된 쿼리는 모델을 거치지 않음)
+
+        Args:
+            query: 검색 쿼리
+
+        Returns:
+            쿼리 임베딩 벡터
+        """
+        embedding = self.query_embedding_cache.get(query)
+        if embedding is None:
+            embedding = self.embedding_model.encode([query], convert_to_numpy=True)[0]
+            self.query_embedding_cache.put(query, embedding)
+        return embedding
+
+    def get_chunk_texts(self, chunk_ids: List[str]) -> Dict[str, str]:
+        """
+        청크 ID로 청크 텍스트 조회
+
+        Args:
+            chunk_ids: 청크 ID 리스트
+
+        Returns:
+            {청크 ID: 텍스트} (존재하는 청크만)
+        """
+        if not chunk_ids:
+            return {}
+        results = self.collection.get(ids=list(set(chunk_ids)), include=["documents"])
+        return dict(zip(results["ids"], results["documents"]))
+
+    def get_document_chunk_ids(self, document_id: str) -> List[str]:
+        """
+        문서에 속한 모든 청크 ID 조회 (페이지 인덱스 사용)
+
+        Args:
+            document_id: 문서 ID
+
+        Returns:
+            청크 ID 리스트
+        """
+        self._sync_indexes()  # 페이지 인덱스 로드 및 다른 워커의 변경 반영
+        chunk_ids = []
+        with self._index_lock:
+            for (doc_id, _page), ids in self.page_index.items():
+                if doc_id == document_id:
+                    chunk_ids.extend(ids)
+        return chunk_ids
+
+    def reindex_document(self, chunks: List[Dict], document_id: str, filename: str, total_pages: int) -> Dict:
+        """
+        문서 증분 재인덱싱
+
+        저장된 청크와 새 청크 집합을 비교하여 추가/변경된 청크만 임베딩 후 upsert하고,
+        없어진 청크는 삭제함. 텍스트가 같고 메타데이터만 다른 청크는 메타데이터만 갱신
+
+        Args:
+            chunks: 새 청크 리스트
+            document_id: 문서 ID
+            filename: 파일명
+            total_pages: 총 페이지 수
+
+        Returns:
+            {"added": int, "updated": int, "removed": int, "unchanged": int}
+        """
+        print(f"\n=== 문서 재인덱싱 시작 ===")
+        print(f"문서 ID: {document_id}")
+
+        # 저장된 청크 조회
+        stored_ids = self.get_document_chunk_ids(document_id)
+        stored = {}
+        if stored_ids:
+            results = self.collection.get(ids=stored_ids, include=["documents", "metadatas"])
+            for chunk_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"]):
+                stored[chunk_id] = (text, metadata)
+
+        # 차이 계산
+        new_ids = {chunk["chunk_id"] for chunk in chunks}
+        removed_ids = [chunk_id for chunk_id in stored if chunk_id not in new_ids]
+        added = [chunk for chunk in chunks if chunk["chunk_id"] not in stored]
+        changed = [
+            chunk for chunk in chunks
+            if chunk["chunk_id"] in stored and stored[chunk["chunk_id"]][0] != chunk["text"]
+        ]
+        metadata_only = [
+            chunk for chunk in chunks
+            if chunk["chunk_id"] in stored
+            and stored[chunk["chunk_id"]][0] == chunk["text"]
+            and stored[chunk["chunk_id"]][1] != chunk["metadata"]
+        ]
+        to_embed = added + changed
+        unchanged = len(chunks) - len(to_embed) - len(metadata_only)
+
+        print(f"추가: {len(added)}, 변경: {len(changed)}, 메타데이터 변경: {len(metadata_only)}, "
+              f"삭제: {len(removed_ids)}, 유지: {unchanged}")
+
+        # 없어진 청크 삭제
+        if removed_ids:
+            self.collection.delete(ids=removed_ids)
+
+        # 추가/변경된 청크만 임베딩 후 upsert
+        if to_embed:
+            embeddings = self.embed_chunk_texts([chunk["text"] for chunk in to_embed])
+            self._write_batches(
+                self.collection.upsert,
+                [chunk["chunk_id"] for chunk in to_embed],
+                embeddings,
+                [chunk["text"] for chunk in to_embed],
+                [chunk["metadata"] for chunk in to_embed]
+            )
+
+        # 텍스트가 같은 청크는 메타데이터만 갱신
+        if metadata_only:
+            self.collection.update(
+                ids=[chunk["chunk_id"] for chunk in metadata_only],
+                metadatas=[chunk["metadata"] for chunk in metadata_only]
+            )
+
+        # 페이지 인덱스 및 메타데이터 갱신
+        self._unindex_document(document_id)
+        self._index_chunks(chunks)
+        self.save_document_metadata(
+            document_id, filename, total_pages, len(chunks),
+            bump_version=bool(to_embed or metadata_only or removed_ids)
+        )
+
+        print(f"=== 문서 재인덱싱 완료 ===\n")
+        return {
+            "added": len(added),
+            "updated": len(changed) + len(metadata_only),
+            "removed": len(removed_ids),
+            "unchanged": unchanged
+        }
+
+    def search(
+        self,
+        query: str,
+        top_k: int = None,
+        include_adjacent: bool = True,
+        query_embedding: Optional[np.ndarray] = None,
+        mode: str = None,
+        rerank: bool = None
+    ) -> List[Dict]:
         """
         유사도 검색 (인접 페이지 포함 옵션)
 
@@ -153,109 +677,77 @@ class VectorService:
             query: 검색 쿼리
             top_k: 반환할 결과 개수
             include_adjacent: 검색된 페이지의 인접 페이지도 포함할지 여부
+            query_embedding: 미리 계산된 쿼리 임베딩 (없으면 새로 생성)
+            mode: 검색 모드 ("vector" 또는 "hybrid", 기본값은 SEARCH_MODE 설정)
+            rerank: Cross-encoder 재순위화 여부 (기본값은 RERANK_ENABLED 설정)
+                재순위화 시 RERANK_CANDIDATES개 후보를 가져와 최대 RERANK_TOP_N개만 반환
 
         Returns:
-            검색 결과 리스트
+            검색 결과 리스트 (직접 검색 최대 top_k개 + 인접 페이지 청크 최대 MAX_ADJACENT_CHUNKS개)
         """
         if top_k is None:
             top_k = settings.DEFAULT_TOP_K
+        if mode is None:
+            mode = settings.SEARCH_MODE
+        if rerank is None:
+            rerank = settings.RERANK_ENABLED
+
+        # 재순위화 시 후보를 넉넉히 가져오고 결과 수는 줄임
+        n_retrieve = top_k
+        if rerank:
+            top_k = min(top_k, settings.RERANK_TOP_N)
+            n_retrieve = max(top_k, settings.RERANK_CANDIDATES)
+
+        # 다른 워커의 코퍼스 변경 반영
+        self._sync_indexes()
 
         print(f"\n=== 벡터 검색 시작 ===")
         print(f"쿼리: {query}")
         print(f"Top-K: {top_k}")
+        print(f"검색 모드: {mode}{' + 재순위화' if rerank else ''}")
         print(f"인접 페이지 포함: {include_adjacent}")
         print(f"ChromaDB 총 청크 수: {self.collection.count()}")
 
         # 쿼리 임베딩 생성
-        query_embedding = self.embedding_model.encode([query], convert_to_numpy=True).tolist()
-        print(f"쿼리 임베딩 생성 완료")
+        if query_embedding is None:
+            query_embedding = self.encode_query(query)
+            print(f"쿼리 임베딩 생성 완료")
 
-        # ChromaDB에서 검색
-        results = self.collection.query(
-            query_embeddings=query_embedding,
-            n_results=top_k,
-            include=["documents", "metadatas", "distances"]
-        )
+        # 직접 검색 (벡터 또는 BM25 + 벡터)
+        search_results = self._retrieve(query, query_embedding, n_retrieve, mode)
+        if rerank:
+            search_results = rerank_service.rerank(query, search_results, top_k)
 
-        # 결과 포맷팅
-        search_results = []
-        found_pages = set()  # 검색된 페이지 번호 추적
-
-        if results["ids"] and len(results["ids"][0]) > 0:
-            print(f"초기 검색 결과: {len(results['ids'][0])}개 발견")
-            for idx in range(len(results["ids"][0])):
-                # 코사인 거리를 유사도로 변환
-                distance = results["distances"][0][idx]
-                similarity_score = 1.0 - distance
-                similarity_score = max(0.0, min(1.0, similarity_score))
-
-                # 실제 PDF 페이지 번호 가져오기
-                page_number = results["metadatas"][0][idx].get("page_number", 0)
-                found_pages.add(page_number)
-
-                full_text = results["documents"][0][idx]
-
-                result = {
-                    "document": results["metadatas"][0][idx].get("source", "Unknown"),
-                    "page": page_number,
-                    "score": round(similarity_score, 4),
-                    "text": full_text,
-                    "source_type": "direct"  # 직접 검색된 결과
-                }
-                search_results.append(result)
+        # 직접 검색 결과는 top_k개로 제한 (인접 페이지는 남은 결과의 페이지 기준으로만 확장)
+        search_results = search_results[:top_k]
+        found_pages = set()  # 검색된 (문서 ID, 페이지 번호) 추적
+
+        if search_results:
+            print(f"초기 검색 결과: {len(search_results)}개 발견")
+            for idx, result in enumerate(search_results):
+                found_pages.add((result["document_id"], result["page"]))
 
                 # 로그 출력
-                print(f"  [{idx+1}] 유사도: {similarity_score:.4f} ({similarity_score*100:.1f}%), 페이지: {page_number}, 텍스트 길이: {len(full_text)}자")
+                similarity_score = result["score"]
+                print(f"  [{idx+1}] 유사도: {similarity_score:.4f} ({similarity_score*100:.1f}%), 페이지: {result['page']}, 텍스트 길이: {len(result['text'])}자")
 
             # 인접 페이지 포함
             if include_adjacent:
                 print(f"\n인접 페이지 검색 중...")
-                adjacent_pages = set()
-                for page_num in found_pages:
-                    # 이전/다음 페이지 추가 (±1)
-                    adjacent_pages.add(page_num - 1)
-                    adjacent_pages.add(page_num + 1)
-
-                # 이미 검색된 페이지는 제외
-                adjacent_pages = adjacent_pages - found_pages
-
-                # 인접 페이지의 청크 가져오기
-                for adj_page in sorted(adjacent_pages):
-                    if adj_page <= 0:  # 0 이하는 건너뛰기
-                        continue
-
-                    try:
-                        adj_results = self.collection.get(
-                            where={"page_number": adj_page},
-                            include=["documents", "metadatas"]
-                        )
-
-                        if adj_results["ids"]:
-                            print(f"  [인접] 페이지 {adj_page}: {len(adj_results['ids'])}개 청크 추가")
-                            for idx in range(len(adj_results["ids"])):
-                                result = {
-                                    "document": adj_results["metadatas"][idx].get("source", "Unknown"),
-                                    "page": adj_page,
-                                    "score": 0.5,  # 인접 페이지는 중간 점수
-                                    "text": adj_results["documents"][idx],
-                                    "source_type": "adjacent"  # 인접 페이지로 추가된 결과
-                                }
-                                search_results.append(result)
-                    except Exception as e:
-                        print(f"  [경고] 페이지 {adj_page} 가져오기 실패: {e}")
-
-                # 유사도 순으로 정렬하여 상위 결과만 유지
-                # direct 검색 결과를 우선하되, 인접 페이지도 포함하여 균형있게 선택
+                # 순위가 높은 결과의 인접 페이지부터 (같은 문서의 이전/다음 페이지, ±1)
+                adjacent_pages = []
+                for result in search_results:
+                    for page_num in (result["page"] - 1, result["page"] + 1):
+                        key = (result["document_id"], page_num)
+                        # 0 이하와 이미 검색된 페이지는 제외
+                        if page_num > 0 and key not in found_pages and key not in adjacent_pages:
+                            adjacent_pages.append(key)
+
+                # 인접 페이지의 청크를 한 번의 조회로 최대 MAX_ADJACENT_CHUNKS개까지 가져오기
+                # (고정 점수는 직접 검색 점수와 비교할 수 없으므로 top_k 제한과 별도로 상한 적용)
+                search_results.extend(self._fetch_adjacent_chunks(adjacent_pages, settings.MAX_ADJACENT_CHUNKS))
                 print(f"인접 페이지 포함 후 총 결과: {len(search_results)}개")
 
-                # 최종 결과 수 제한 (기본 top_k 값 사용)
-                max_results = top_k
-                if len(search_results) > max_results:
-                    # 유사도 순으로 정렬 (score 내림차순)
-                    search_results.sort(key=lambda x: x["score"], reverse=True)
-                    search_results = search_results[:max_results]
-                    print(f"최종 결과를 {max_results}개로 제한")
-
                 # 최종적으로 페이지 순서대로 정렬
                 search_results.sort(key=lambda x: (x["page"], 0 if x["source_type"] == "direct" else 1))
                 print(f"최종 반환 결과: {len(search_results)}개")
@@ -266,20 +758,166 @@ class VectorService:
         print(f"=== 벡터 검색 완료 ===\n")
         return search_results
 
-    def get_all_documents(self) -> List[Dict]:
+    def _retrieve(self, query: str, query_embedding: np.ndarray, top_k: int, mode: str) -> List[Dict]:
         """
-        모든 문서 메타데이터 조회
+        직접 검색 결과 조회
+
+        hybrid 모드에서는 벡터 검색과 BM25 검색 후보를 각각 HYBRID_CANDIDATES개씩 가져와
+        Reciprocal Rank Fusion으로 순위를 결합함. 결과의 score는 항상 코사인 유사도이고,
+        rank_score는 결합 순위 점수(최고 점수 기준 0~1)임
+
+        Args:
+            query: 검색 쿼리
+            query_embedding: 쿼리 임베딩
+            top_k: 반환할 결과 개수
+            mode: 검색 모드 ("vector" 또는 "hybrid")
 
         Returns:
-            문서 정보 리스트
+            검색 결과 리스트 (순위 순)
         """
-        documents = []
-        for doc_id, metadata in self.documents_metadata.items():
-            documents.append(metadata)
+        hybrid = mode == "hybrid" and self.lexical_index is not None
+        n_candidates = max(top_k, settings.HYBRID_CANDIDATES) if hybrid else top_k
 
-        # 업로드 날짜 기준 내림차순 정렬
-        documents.sort(key=lambda x: x.get("upload_date", ""), reverse=True)
-        return documents
+        # ChromaDB에서 검색
+        results = self.collection.query(
+            query_embeddings=[query_embedding.tolist()],
+            n_results=n_candidates,
+            include=["documents", "metadatas", "distances"]
+        )
+
+        # 청크 ID -> (텍스트, 메타데이터, 코사인 유사도)
+        candidates: Dict[str, Tuple[str, Dict, float]] = {}
+        vector_ranking = results["ids"][0] if results["ids"] else []
+        for idx, chunk_id in enumerate(vector_ranking):
+            # 코사인 거리를 유사도로 변환
+            similarity_score = max(0.0, min(1.0, 1.0 - results["distances"][0][idx]))
+            candidates[chunk_id] = (results["documents"][0][idx], results["metadatas"][0][idx], similarity_score)
+
+        if hybrid:
+            lexical_ranking = [chunk_id for chunk_id, _ in self.lexical_index.search(query, n_candidates)]
+            print(f"벡터 후보: {len(vector_ranking)}개, BM25 후보: {len(lexical_ranking)}개")
+
+            fused: Dict[str, float] = {}
+            for ranking in (vector_ranking, lexical_ranking):
+                for rank, chunk_id in enumerate(ranking):
+                    fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (settings.RRF_K + rank + 1)
+            ranked = sorted(fused, key=fused.get, reverse=True)[:top_k]
+
+            # BM25로만 찾은 청크는 저장된 임베딩으로 코사인 유사도 계산
+            lexical_only = [chunk_id for chunk_id in ranked if chunk_id not in candidates]
+            if lexical_only:
+                fetched = self.collection.get(ids=lexical_only, include=["documents", "metadatas", "embeddings"])
+                query_norm = np.linalg.norm(query_embedding) or 1.0
+                for idx, chunk_id in enumerate(fetched["ids"]):
+                    embedding = np.asarray(fetched["embeddings"][idx], dtype=np.float32)
+                    similarity_score = float(np.dot(query_embedding, embedding) / (query_norm * (np.linalg.norm(embedding) or 1.0)))
+                    candidates[chunk_id] = (fetched["documents"][idx], fetched["metadatas"][idx], max(0.0, min(1.0, similarity_score)))
+
+            top_score = fused[ranked[0]] if ranked else 1.0
+            rank_scores = {chunk_id: fused[chunk_id] / top_score for chunk_id in ranked}
+        else:
+            ranked = vector_ranking
+            rank_scores = {}
+
+        search_results = []
+        for chunk_id in ranked:
+            if chunk_id not in candidates:
+                continue
+            full_text, metadata, similarity_score = candidates[chunk_id]
+            result = {
+                "chunk_id": chunk_id,
+                "document": metadata.get("source", "Unknown"),
+                "document_id": self._document_id_of(metadata),
+                "page": metadata.get("page_number", 0),  # 실제 PDF 페이지 번호
+                "page_chunk_index": metadata.get("page_chunk_index"),  # 페이지 내 청크 번호 (컨텍스트 병합용)
+                "score": round(similarity_score, 4),
+                "text": full_text,
+                "source_type": "direct"  # 직접 검색된 결과
+            }
+            if chunk_id in rank_scores:
+                result["rank_score"] = round(rank_scores[chunk_id], 4)
+            search_results.append(result)
+
+        return search_results
+
+    def _document_id_of(self, metadata: Dict) -> str:
+        """청크 메타데이터의 문서 ID (document_id가 없는 기존 청크는 파일명으로 조회)"""
+        if metadata.get("document_id"):
+            return metadata["document_id"]
+
+        source = metadata.get("source", "Unknown")
+        return self.metadata_store.find_document_id(source) or source
+
+    def _fetch_adjacent_chunks(self, pages: List[Tuple[str, int]], max_chunks: int) -> List[Dict]:
+        """
+        인접 페이지 청크 일괄 조회
+
+        페이지 인덱스에서 같은 문서의 인접 페이지 청크 ID만 찾아 한 번에 조회
+
+        Args:
+            pages: 조회할 (문서 ID, 페이지 번호) 리스트 (우선순위 순)
+            max_chunks: 최대 청크 수 (앞쪽 페이지부터 채움)
+
+        Returns:
+            인접 페이지 결과 리스트
+        """
+        chunk_ids = []
+        with self._index_lock:
+            for key in pages:
+                chunk_ids.extend(self.page_index.get(key, []))
+        chunk_ids = chunk_ids[:max(0, max_chunks)]
+
+        if not chunk_ids:
+            return []
+
+        try:
+            adj_results = self.collection.get(
+                ids=chunk_ids,
+                include=["documents", "metadatas"]
+            )
+        except Exception as e:
+            print(f"  [경고] 인접 페이지 청크 {len(chunk_ids)}개 가져오기 실패: {e}")
+            return []
+
+        adjacent_results = []
+        page_counts = {}
+        for idx in range(len(adj_results["ids"])):
+            metadata = adj_results["metadatas"][idx]
+            source = metadata.get("source", "Unknown")
+            page_number = metadata.get("page_number", 0)
+            page_counts[(source, page_number)] = page_counts.get((source, page_number), 0) + 1
+            adjacent_results.append({
+                "chunk_id": adj_results["ids"][idx],
+                "document": source,
+                "page": page_number,
+                "page_chunk_index": metadata.get("page_chunk_index"),
+                "score": 0.5,  # 인접 페이지는 중간 점수
+                "text": adj_results["documents"][idx],
+                "source_type": "adjacent"  # 인접 페이지로 추가된 결과
+            })
+
+        for source, page_number in sorted(page_counts):
+            print(f"  [인접] {source} 페이지 {page_number}: {page_counts[(source, page_number)]}개 청크 추가")
+
+        return adjacent_results
+
+    def get_document_page(self, limit: int, after: tuple = None, prefix: str = None) -> tuple:
+        """
+        문서 목록 커서 페이지 조회 (업로드 날짜 내림차순)
+
+        Args:
+            limit: 페이지 크기
+            after: 이전 페이지 마지막 항목의 (업로드 날짜, 문서 ID)
+            prefix: 파일명 접두어 필터
+
+        Returns:
+            (문서 정보 리스트, 다음 페이지 존재 여부) 튜플
+        """
+        return self.metadata_store.page_documents(limit, after, prefix)
+
+    def get_documents_version(self) -> int:
+        """문서 목록 버전 (문서 메타데이터가 바뀔 때마다 증가, 목록 ETag에 사용)"""
+        return self.metadata_store.get_documents_version()
 
     def delete_document(self, document_id: str) -> bool:
         """
@@ -292,19 +930,33 @@ class VectorService:
             삭제 성공 여부
         """
         try:
-            # ChromaDB에서 해당 문서의 모든 청크 찾기
-            results = self.collection.get(
-                where={"source": self.documents_metadata[document_id]["filename"]}
-            )
+            document = self.metadata_store.get_document(document_id)
+
+            # 해당 문서의 모든 청크 찾기 (페이지 인덱스 + document_id 메타데이터)
+            chunk_ids = set(self.get_document_chunk_ids(document_id))
+            chunk_ids.update(self.collection.get(where={"document_id": document_id})["ids"])
+
+            # document_id가 없는 기존 청크만 파일명으로 찾음 (같은 파일명의 다른 문서 청크는 제외)
+            if document is not None:
+                legacy = self.collection.get(where={"source": document["filename"]}, include=["metadatas"])
+                chunk_ids.update(
+                    chunk_id for chunk_id, metadata in zip(legacy["ids"], legacy["metadatas"])
+                    if not metadata.get("document_id")
+                )
 
-            if results["ids"]:
+            if document is None and not chunk_ids:
+                return False
+
+            if chunk_ids:
                 # 청크 삭제
-                self.collection.delete(ids=results["ids"])
+                self.collection.delete(ids=list(chunk_ids))
+
+            # 페이지 인덱스에서 삭제
+            self._unindex_document(document_id)
+            self._bump_corpus_version([document_id])
 
             # 메타데이터에서 삭제
-            if document_id in self.documents_metadata:
-                del self.documents_metadata[document_id]
-                self._save_metadata()
+            self.metadata_store.delete_document(document_id)
 
             return True
 
@@ -322,7 +974,7 @@ class VectorService:
         Returns:
             문서 정보 또는 None
         """
-        return self.documents_metadata.get(document_id)
+        return self.metadata_store.get_document(document_id)
 
 # 전역 서비스 인스턴스
 vector_service = VectorService()
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+from config import settings
+
+# 블로킹 작업용 공유 스레드 풀 (최초 사용 시 생성)
+_executor: Optional[ThreadPoolExecutor] = None
+
+# CPU 작업(PDF 텍스트 추출)용 공유 프로세스 풀 (최초 사용 시 생성)
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """공유 스레드 풀 반환"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.WORKER_POOL_SIZE,
+            thread_name_prefix="rag-worker"
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    동기 함수를 스레드 풀에서 실행 (이벤트 루프 블로킹 방지)
+
+    Args:
+        func: 실행할 동기 함수
+        *args, **kwargs: 함수 인자
+
+    Returns:
+        함수 실행 결과
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+async def iterate_blocking(iterator: Iterator) -> AsyncIterator:
+    """
+    동기 이터레이터를 스레드 풀에서 한 항목씩 진행하는 비동기 이터레이터로 변환
+
+    Args:
+        iterator: 블로킹 동기 이터레이터 (예: 스트리밍 LLM 응답)
+
+    Yields:
+        이터레이터 항목
+    """
+    sentinel = object()
+    while True:
+        item = await run_blocking(next, iterator, sentinel)
+        if item is sentinel:
+            break
+        yield item
+
+
+def shutdown_executor():
+    """공유 스레드 풀 종료"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    공유 프로세스 풀 반환 (워커 수가 바뀌면 다시 생성)
+
+    모델 등을 로드한 부모 프로세스를 fork하지 않도록 spawn을 사용하며,
+    워커 프로세스 시작 비용은 풀을 처음 만들 때 한 번만 발생함
+
+    Args:
+        workers: 프로세스 수
+
+    Returns:
+        프로세스 풀
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool_workers != workers:
+            _process_pool.shutdown(wait=True)
+            _process_pool = None
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _process_pool_workers = workers
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """공유 프로세스 풀 종료 (대기 중인 작업은 취소)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
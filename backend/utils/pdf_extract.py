@@ -0,0 +1,22 @@
+from typing import List, Tuple
+import PyPDF2
+
+# 프로세스 풀 워커에서 실행되는 함수 모음
+# spawn으로 시작한 워커는 이 모듈만 불러오므로 설정/서비스 모듈을 불러오지 않음
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    PDF의 페이지 구간 텍스트 추출 (프로세스 풀 워커에서 실행)
+
+    Args:
+        file_path: PDF 파일 경로
+        start: 시작 페이지 인덱스 (0부터, 포함)
+        end: 끝 페이지 인덱스 (미포함)
+
+    Returns:
+        (페이지 인덱스, 원본 텍스트) 리스트
+    """
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [(page_num, pdf_reader.pages[page_num].extract_text()) for page_num in range(start, end)]
@@ -0,0 +1,57 @@
+import queue
+import threading
+from typing import Iterable, Iterator
+
+_SENTINEL = object()
+
+
+def prefetch(iterable: Iterable, maxsize: int) -> Iterator:
+    """
+    이터러블을 백그라운드 스레드에서 미리 진행시키는 이터레이터
+
+    생산자(예: PDF 추출 + 청킹)와 소비자(예: 임베딩 + 기록)가 동시에 진행되며,
+    큐에 maxsize개가 쌓이면 생산자가 대기하여 메모리 사용량이 제한됨
+
+    Args:
+        iterable: 생산자 이터러블
+        maxsize: 미리 만들어 둘 최대 항목 수
+
+    Yields:
+        생산자 항목 (생산자에서 발생한 예외는 소비자 쪽에서 다시 발생)
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=maxsize)
+    stop_event = threading.Event()
+
+    def put(item) -> bool:
+        # 소비자가 중단하면 대기 중인 생산자도 종료
+        while not stop_event.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put((_SENTINEL, e))
+            return
+        put((_SENTINEL, None))
+
+    producer = threading.Thread(target=produce, name="prefetch-producer", daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if isinstance(item, tuple) and len(item) == 2 and item[0] is _SENTINEL:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            yield item
+    finally:
+        stop_event.set()
@@ -0,0 +1,156 @@
+"""
+인접 페이지 조회 마이크로 벤치마크
+- 기존 방식: 인접 페이지마다 collection.get 호출
+- 개선 방식: $in 필터로 한 번에 조회
+- 인덱스 방식: (문서 ID, 페이지) 인덱스에서 청크 ID를 찾아 ids로 한 번에 조회
+- 임시 ChromaDB에 10,000개 이상의 청크를 넣고 p50 / p99 지연 시간 비교
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import statistics
+
+import numpy as np
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+NUM_CHUNKS = int(os.getenv("BENCH_NUM_CHUNKS", "12000"))
+CHUNKS_PER_PAGE = 4
+EMBEDDING_DIM = 768
+NUM_QUERIES = int(os.getenv("BENCH_NUM_QUERIES", "200"))
+TOP_K_VALUES = [5, 10, 20]
+BATCH_SIZE = 2000
+
+
+def percentile(values, pct):
+    """단순 백분위 계산"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_collection(path):
+    """벤치마크용 컬렉션 생성"""
+    client = chromadb.PersistentClient(
+        path=path,
+        settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    collection = client.create_collection(
+        name="bench_adjacent",
+        metadata={"hnsw:space": "cosine"}
+    )
+
+    rng = np.random.default_rng(42)
+    for start in range(0, NUM_CHUNKS, BATCH_SIZE):
+        end = min(start + BATCH_SIZE, NUM_CHUNKS)
+        ids = [f"chunk_{i}" for i in range(start, end)]
+        embeddings = rng.standard_normal((end - start, EMBEDDING_DIM)).astype(np.float32)
+        metadatas = [
+            {
+                "source": "bench.pdf",
+                "document_id": "doc_bench",
+                "page_number": i // CHUNKS_PER_PAGE + 1,
+                "chunk_index": i
+            }
+            for i in range(start, end)
+        ]
+        documents = [f"벤치마크 청크 {i}" for i in range(start, end)]
+        collection.add(ids=ids, embeddings=embeddings.tolist(), documents=documents, metadatas=metadatas)
+
+    return collection, rng
+
+
+def adjacent_pages_of(results):
+    """검색 결과의 인접 페이지 계산"""
+    found_pages = {m.get("page_number", 0) for m in results["metadatas"][0]}
+    adjacent = set()
+    for page in found_pages:
+        adjacent.add(page - 1)
+        adjacent.add(page + 1)
+    return sorted(p for p in adjacent - found_pages if p > 0)
+
+
+def legacy_fetch(collection, pages):
+    """기존 방식: 페이지별 조회"""
+    rows = 0
+    for page in pages:
+        result = collection.get(where={"page_number": page}, include=["documents", "metadatas"])
+        rows += len(result["ids"])
+    return rows
+
+
+def batched_fetch(collection, pages):
+    """개선 방식: $in 필터 일괄 조회"""
+    if not pages:
+        return 0
+    result = collection.get(where={"page_number": {"$in": pages}}, include=["documents", "metadatas"])
+    return len(result["ids"])
+
+
+def build_page_index(collection):
+    """(document_id, page_number) -> 청크 ID 인덱스 구성"""
+    page_index = {}
+    results = collection.get(include=["metadatas"])
+    for chunk_id, metadata in zip(results["ids"], results["metadatas"]):
+        key = (metadata["document_id"], metadata["page_number"])
+        page_index.setdefault(key, []).append(chunk_id)
+    return page_index
+
+
+def indexed_fetch_factory(page_index):
+    """인덱스 방식: 페이지 인덱스로 청크 ID를 찾아 일괄 조회"""
+    def indexed_fetch(collection, pages):
+        chunk_ids = []
+        for page in pages:
+            chunk_ids.extend(page_index.get(("doc_bench", page), []))
+        if not chunk_ids:
+            return 0
+        result = collection.get(ids=chunk_ids, include=["documents", "metadatas"])
+        return len(result["ids"])
+    return indexed_fetch
+
+
+def run(collection, rng, top_k, fetch):
+    """검색 + 인접 페이지 조회 지연 시간 측정 (ms)"""
+    latencies = []
+    for _ in range(NUM_QUERIES):
+        query = rng.standard_normal((1, EMBEDDING_DIM)).astype(np.float32).tolist()
+        started = time.perf_counter()
+        results = collection.query(
+            query_embeddings=query,
+            n_results=top_k,
+            include=["documents", "metadatas", "distances"]
+        )
+        fetch(collection, adjacent_pages_of(results))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    temp_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    try:
+        print("=" * 80)
+        print(f"인접 페이지 조회 벤치마크 (청크 {NUM_CHUNKS}개, 쿼리 {NUM_QUERIES}회)")
+        print("=" * 80)
+
+        collection, rng = build_collection(temp_dir)
+        print(f"컬렉션 생성 완료: {collection.count()}개 청크\n")
+        indexed_fetch = indexed_fetch_factory(build_page_index(collection))
+
+        print(f"{'top_k':>6} | {'방식':<8} | {'p50 (ms)':>10} | {'p99 (ms)':>10} | {'평균 (ms)':>10}")
+        print("-" * 60)
+        for top_k in TOP_K_VALUES:
+            for label, fetch in (("기존", legacy_fetch), ("일괄", batched_fetch), ("인덱스", indexed_fetch)):
+                latencies = run(collection, rng, top_k, fetch)
+                print(
+                    f"{top_k:>6} | {label:<8} | {percentile(latencies, 50):>10.2f} | "
+                    f"{percentile(latencies, 99):>10.2f} | {statistics.mean(latencies):>10.2f}"
+                )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
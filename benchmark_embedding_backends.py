@@ -0,0 +1,129 @@
+"""
+임베딩 백엔드 벤치마크
+- 기존 ChromaDB의 청크 텍스트로 백엔드별 임베딩 처리량(청크/초) 측정
+- torch(fp32) 백엔드의 검색 결과를 기준으로 백엔드별 recall@k 계산
+
+사용법:
+    python benchmark_embedding_backends.py [ChromaDB 경로] [백엔드,...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+sys.path.append('backend')
+
+from config import settings
+from services.embedding_backend import load_embedding_model, EMBEDDING_BACKENDS
+
+MAX_CHUNKS = int(os.getenv("BENCH_MAX_CHUNKS", "1000"))
+TOP_K = 10
+REFERENCE_BACKEND = "torch"  # recall 기준 (fp32)
+QUERIES = [
+    "SQL Injection 대응 방법",
+    "크로스사이트 스크립트 방지",
+    "세션 관리 취약점",
+    "파일 업로드 검증",
+    "암호화 알고리즘 사용",
+    "경로 조작 공격",
+    "부적절한 에러 처리",
+    "인증 정보 하드코딩",
+    "표준프레임워크 실행환경 구성",
+    "트랜잭션 처리 방법",
+]
+
+
+def load_chunks(chroma_path):
+    """기존 ChromaDB에서 청크 텍스트 로드"""
+    client = chromadb.PersistentClient(
+        path=chroma_path,
+        settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    collection = client.get_collection(name=settings.COLLECTION_NAME)
+    results = collection.get(limit=MAX_CHUNKS, include=["documents"])
+    return results["ids"], results["documents"]
+
+
+def normalize(vectors):
+    """코사인 유사도를 위한 단위 벡터화"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def top_k_ids(query_vectors, doc_vectors, k):
+    """정확한 코사인 유사도 top-k 인덱스"""
+    scores = normalize(query_vectors) @ normalize(doc_vectors).T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def measure(backend, texts):
+    """
+    백엔드 하나의 로드 시간 / 처리량 / 쿼리 지연 시간 측정
+
+    Returns:
+        (로드 시간(s), 청크/초, 쿼리당 ms, 쿼리별 top-k 인덱스) 튜플
+    """
+    started = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_time = time.perf_counter() - started
+
+    # 워밍업 후 측정
+    model.encode(texts[:8], convert_to_numpy=True)
+
+    started = time.perf_counter()
+    doc_vectors = model.encode(texts, batch_size=settings.EMBEDDING_BATCH_SIZE, convert_to_numpy=True)
+    throughput = len(texts) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    query_vectors = np.stack([model.encode([q], convert_to_numpy=True)[0] for q in QUERIES])
+    query_ms = (time.perf_counter() - started) * 1000 / len(QUERIES)
+
+    return load_time, throughput, query_ms, top_k_ids(query_vectors, doc_vectors, TOP_K)
+
+
+def main():
+    chroma_path = sys.argv[1] if len(sys.argv) > 1 else settings.CHROMA_DB_PATH
+    backends = sys.argv[2].split(",") if len(sys.argv) > 2 else list(EMBEDDING_BACKENDS)
+
+    print("=" * 80)
+    print("임베딩 백엔드 벤치마크")
+    print("=" * 80)
+
+    ids, texts = load_chunks(chroma_path)
+    print(f"ChromaDB: {chroma_path} ({len(texts)}개 청크)\n")
+    if not texts:
+        print("청크가 없습니다.")
+        return 1
+
+    # recall 기준은 요청한 순서/목록과 관계없이 항상 torch(fp32)
+    backends = [REFERENCE_BACKEND] + [backend for backend in backends if backend != REFERENCE_BACKEND]
+
+    reference = None
+    print(f"{'백엔드':<12} | {'로드 (s)':>8} | {'청크/초':>8} | {'쿼리 (ms)':>9} | {f'recall@{TOP_K}':>10}")
+    print("-" * 62)
+    for backend in backends:
+        try:
+            load_time, throughput, query_ms, ranked = measure(backend, texts)
+        except Exception as e:
+            print(f"{backend:<12} | 로드 실패: {e}")
+            if backend == REFERENCE_BACKEND:
+                print(f"\n기준 백엔드({REFERENCE_BACKEND})를 로드할 수 없어 recall을 계산할 수 없습니다.")
+                return 1
+            continue
+
+        if reference is None:
+            reference = ranked
+        recall = np.mean([
+            len(set(ranked[i]) & set(reference[i])) / TOP_K for i in range(len(QUERIES))
+        ])
+
+        print(f"{backend:<12} | {load_time:>8.1f} | {throughput:>8.1f} | {query_ms:>9.1f} | {recall:>10.3f}")
+
+    print(f"\n* recall@{TOP_K}은 {REFERENCE_BACKEND}(fp32) 백엔드의 검색 결과를 기준으로 계산됩니다.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+하이브리드 검색 (BM25 + 벡터) 벤치마크
+- 현재 코퍼스(ChromaDB)에 대해 vector / hybrid 검색 모드 비교
+- 정답: 쿼리 키워드가 그대로 들어있는 청크 (find_sql_injection_page.py와 같은 기준)
+- 지표: 적중률(top_k 안에 정답 청크가 하나라도 있는 쿼리 비율), recall@k, p50 / p99 지연 시간
+
+사용법:
+    python benchmark_hybrid_search.py [top_k]
+"""
+import io
+import sys
+import time
+import contextlib
+import statistics
+sys.path.append('backend')
+
+from services.vector_service import vector_service
+
+# (쿼리, 정답 판정 키워드)
+QUERIES = [
+    ("SQL Injection 대응 방법은?", ["sql injection"]),
+    ("크로스사이트 스크립트 XSS 방지", ["xss"]),
+    ("CSRF 공격 대책", ["csrf"]),
+    ("세션 고정 취약점", ["세션 고정"]),
+    ("경로 조작 Path Traversal", ["경로 조작"]),
+    ("LDAP 삽입", ["ldap"]),
+    ("XML 외부 개체 XXE", ["xxe"]),
+    ("하드코드된 비밀번호", ["하드코드"]),
+    ("파일 업로드 확장자 검증", ["업로드"]),
+    ("암호화 알고리즘 취약 DES", ["des"]),
+]
+MODES = ["vector", "hybrid"]
+REPEAT = 5
+
+
+def percentile(values, pct):
+    """단순 백분위 계산"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def relevant_texts(keywords):
+    """키워드가 들어있는 청크 텍스트 집합"""
+    results = vector_service.collection.get(include=["documents"])
+    return {
+        text for text in results["documents"]
+        if any(keyword in text.lower() for keyword in keywords)
+    }
+
+
+def main():
+    top_k = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 80)
+    print(f"하이브리드 검색 벤치마크 (청크 {vector_service.collection.count()}개, top_k={top_k})")
+    print("=" * 80)
+
+    if vector_service.lexical_index is None:
+        print("SEARCH_MODE=hybrid 로 실행해야 BM25 색인이 구성됩니다.")
+        return 1
+
+    # 쿼리 임베딩은 미리 계산하여 검색 단계 지연 시간만 측정
+    cases = []
+    for query, keywords in QUERIES:
+        relevant = relevant_texts(keywords)
+        if not relevant:
+            print(f"  [건너뜀] 정답 청크 없음: {query}")
+            continue
+        cases.append((query, relevant, vector_service.encode_query(query)))
+
+    if not cases:
+        print("정답 청크가 있는 쿼리가 없습니다. 문서를 먼저 인덱싱하세요.")
+        return 1
+
+    print(f"\n{'모드':<8} | {'적중률':>8} | {'recall@k':>9} | {'p50 (ms)':>9} | {'p99 (ms)':>9}")
+    print("-" * 60)
+    for mode in MODES:
+        hits, recalls, latencies = 0, [], []
+        for query, relevant, embedding in cases:
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = vector_service.search(
+                        query, top_k, include_adjacent=False, query_embedding=embedding, mode=mode
+                    )
+                latencies.append((time.perf_counter() - started) * 1000)
+
+            found = sum(1 for result in results if result["text"] in relevant)
+            hits += 1 if found else 0
+            recalls.append(found / min(len(relevant), top_k))
+
+        print(
+            f"{mode:<8} | {hits / len(cases):>8.2%} | {statistics.mean(recalls):>9.3f} | "
+            f"{percentile(latencies, 50):>9.2f} | {percentile(latencies, 99):>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+PDF 텍스트 추출 벤치마크
+- 순차 추출과 프로세스 풀 병렬 추출의 소요 시간 / 처리량 비교
+- 병렬 결과가 순차 결과와 동일한지 확인
+- 프로세스 풀은 서버에서처럼 재사용되므로 풀 시작 비용은 측정에서 제외
+
+사용법:
+    python benchmark_pdf_extract.py [PDF 경로]
+"""
+import os
+import sys
+import glob
+import time
+
+sys.path.append('backend')
+
+from services.pdf_service import pdf_service
+from utils.executor import get_process_pool, shutdown_process_pool
+
+WORKER_COUNTS = [1, 2, 4, os.cpu_count() or 4]
+
+
+def main():
+    if len(sys.argv) > 1:
+        pdf_path = sys.argv[1]
+    else:
+        candidates = sorted(
+            glob.glob("uploads/**/*.pdf", recursive=True) + glob.glob("backend/uploads/**/*.pdf", recursive=True)
+        )
+        if not candidates:
+            print("PDF 파일을 찾을 수 없습니다. 경로를 인자로 전달해주세요.")
+            return 1
+        pdf_path = candidates[0]
+
+    print("=" * 80)
+    print("PDF 텍스트 추출 벤치마크")
+    print("=" * 80)
+    print(f"파일: {pdf_path}\n")
+
+    baseline = None
+    print(f"{'프로세스':>8} | {'페이지':>6} | {'소요 시간 (s)':>13} | {'페이지/초':>10} | {'결과 일치':>8}")
+    print("-" * 60)
+    for workers in sorted(set(WORKER_COUNTS)):
+        if workers > 1:
+            # 프로세스 풀 시작 (워커 프로세스 생성은 처음 한 번만 발생)
+            list(get_process_pool(workers).map(abs, range(workers)))
+
+        started = time.perf_counter()
+        pages_data, num_pages = pdf_service.extract_text_from_pdf(pdf_path, workers=workers)
+        elapsed = time.perf_counter() - started
+
+        if baseline is None:
+            baseline = pages_data
+        matches = "O" if pages_data == baseline else "X"
+
+        print(f"{workers:>8} | {num_pages:>6} | {elapsed:>13.2f} | {num_pages / elapsed:>10.1f} | {matches:>8}")
+
+    shutdown_process_pool()
+    print("\n* 병렬 추출은 페이지 수가 PDF_PARALLEL_MIN_PAGES 이상일 때만 사용됩니다.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+서버 시작 시간 벤치마크
+- api.routes 임포트 시간 (uvicorn이 포트를 열기 전까지 걸리는 시간)
+- 서비스 준비(warm-up) 완료까지 걸리는 시간
+- 매 측정마다 새 프로세스에서 실행하여 임포트 캐시 영향을 제거
+
+사용법:
+    python benchmark_startup.py [반복 횟수]
+"""
+import sys
+import json
+import statistics
+import subprocess
+
+MEASURE_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.warm_up_services()
+ready = time.perf_counter()
+print(json.dumps({"import": imported - started, "ready": ready - started}))
+"""
+
+
+def measure():
+    """새 프로세스에서 임포트 / 준비 완료 시간 측정 (초)"""
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT],
+        cwd="backend",
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print("=" * 80)
+    print(f"서버 시작 시간 벤치마크 ({runs}회)")
+    print("=" * 80)
+
+    results = []
+    for i in range(runs):
+        result = measure()
+        results.append(result)
+        print(f"  [{i+1}] 임포트: {result['import']:.2f}초, 준비 완료: {result['ready']:.2f}초")
+
+    print("-" * 80)
+    print(f"임포트 → 포트 바인딩 가능 (중앙값): {statistics.median(r['import'] for r in results):.2f}초")
+    print(f"임포트 → 서비스 준비 완료 (중앙값): {statistics.median(r['ready'] for r in results):.2f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+PDF 대량 수집 CLI
+- PDF 파일, 디렉토리(하위 폴더 포함), ZIP 파일을 받아 업로드 디렉토리로 복사한 뒤
+  추출/임베딩/저장을 파이프라인으로 처리
+- 전체 처리량(페이지/초) 출력
+
+사용법:
+    python bulk_ingest.py <PDF|디렉토리|ZIP> [...]
+"""
+import os
+import sys
+import time
+import zipfile
+
+sys.path.append('backend')
+
+from services.pdf_service import pdf_service
+from services.ingest_service import bulk_ingest_service
+
+
+def collect_documents(paths):
+    """입력 경로에서 PDF를 찾아 업로드 디렉토리로 복사"""
+    documents = []
+
+    def add(file_obj, filename):
+        document_id, file_path = pdf_service.save_file_object(file_obj, filename)
+        documents.append({"document_id": document_id, "file_path": file_path, "filename": filename})
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        with open(os.path.join(root, name), "rb") as f:
+                            add(f, name)
+        elif path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.infolist():
+                    if not member.is_dir() and member.filename.lower().endswith(".pdf"):
+                        with archive.open(member) as f:
+                            add(f, os.path.basename(member.filename))
+        elif path.lower().endswith(".pdf"):
+            with open(path, "rb") as f:
+                add(f, os.path.basename(path))
+        else:
+            print(f"[건너뜀] PDF/디렉토리/ZIP이 아닙니다: {path}")
+
+    return documents
+
+
+def print_progress(stage, done, total):
+    """진행률 출력"""
+    labels = {"documents": "문서", "written": "청크 저장"}
+    if stage in labels:
+        print(f"  [{labels[stage]}] {done}/{total}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+
+    print("=" * 80)
+    print("PDF 대량 수집")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    documents = collect_documents(sys.argv[1:])
+    print(f"복사 완료: {len(documents)}개 PDF ({time.perf_counter() - started:.1f}초)")
+    if not documents:
+        return 1
+
+    stats = bulk_ingest_service.ingest(documents, print_progress)
+
+    print("-" * 80)
+    print(f"수집 문서: {stats['documents_indexed']}/{stats['documents']}")
+    print(f"페이지: {stats['pages']}, 청크: {stats['chunks']}")
+    print(f"소요 시간: {stats['elapsed_seconds']}초")
+    print(f"처리량: {stats['pages_per_sec']} 페이지/초")
+    for failed in stats["failed"]:
+        print(f"[실패] {failed['document_id']}: {failed['error']}")
+
+    return 0 if not stats["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 """PDF에서 'SQL Injection' 키워드가 있는 페이지 찾기"""
 import PyPDF2
 
-pdf_path = "backend/uploads/doc_73d98794a215_표준프레임워크_보안개발_가이드(2024.02).pdf"
+pdf_path = "backend/uploads/73/doc_73d98794a215_표준프레임워크_보안개발_가이드(2024.02).pdf"
 
 print("=" * 80)
 print("'SQL Injection' 키워드 검색")
@@ -61,6 +61,56 @@ class API {
         }
     }
 
+    /**
+     * 백그라운드 인덱싱 작업 등록
+     * @param {string} documentId - 문서 ID
+     * @returns {Promise<Object>} 작업 응답
+     */
+    static async createIndexJob(documentId) {
+        try {
+            const response = await fetch(`${API_BASE_URL}/index/jobs`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ document_id: documentId })
+            });
+
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.detail || '인덱싱 작업 등록 실패');
+            }
+
+            return await response.json();
+        } catch (error) {
+            console.error('Create index job error:', error);
+            throw error;
+        }
+    }
+
+    /**
+     * 인덱싱 작업 상태 조회
+     * @param {string} jobId - 작업 ID
+     * @returns {Promise<Object>} 작업 응답
+     */
+    static async getIndexJob(jobId) {
+        try {
+            const response = await fetch(`${API_BASE_URL}/index/jobs/${jobId}`, {
+                method: 'GET'
+            });
+
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.detail || '인덱싱 작업 조회 실패');
+            }
+
+            return await response.json();
+        } catch (error) {
+            console.error('Get index job error:', error);
+            throw error;
+        }
+    }
+
     /**
      * 채팅 메시지 전송
      * @param {string} message - 사용자 메시지
@@ -94,6 +144,88 @@ class API {
         }
     }
 
+    /**
+     * 채팅 메시지 스트리밍 전송 (Server-Sent Events)
+     * @param {string} message - 사용자 메시지
+     * @param {string|null} conversationId - 대화 ID (선택적)
+     * @param {Object} handlers - 이벤트 콜백 { onSources, onToken, onDone }
+     * @returns {Promise<void>}
+     */
+    static async sendMessageStream(message, conversationId = null, handlers = {}) {
+        try {
+            const requestBody = { message };
+            if (conversationId) {
+                requestBody.conversation_id = conversationId;
+            }
+
+            const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream'
+                },
+                body: JSON.stringify(requestBody)
+            });
+
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.detail || '메시지 전송 실패');
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder('utf-8');
+            let buffer = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) {
+                    break;
+                }
+
+                buffer += decoder.decode(value, { stream: true });
+
+                // 이벤트는 빈 줄로 구분됨
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const rawEvent = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+                    API.dispatchStreamEvent(rawEvent, handlers);
+                }
+            }
+        } catch (error) {
+            console.error('Chat stream error:', error);
+            throw error;
+        }
+    }
+
+    /**
+     * SSE 이벤트 하나를 파싱하여 콜백 호출
+     * @param {string} rawEvent - "event: ...\ndata: ..." 형식의 이벤트 문자열
+     * @param {Object} handlers - 이벤트 콜백
+     */
+    static dispatchStreamEvent(rawEvent, handlers) {
+        const dataLines = rawEvent
+            .split('\n')
+            .filter(line => line.startsWith('data:'))
+            .map(line => line.slice(5).trim());
+
+        if (dataLines.length === 0) {
+            return;
+        }
+
+        const event = JSON.parse(dataLines.join('\n'));
+
+        if (event.type === 'sources' && handlers.onSources) {
+            handlers.onSources(event.sources, event.conversation_id);
+        } else if (event.type === 'token' && handlers.onToken) {
+            handlers.onToken(event.text);
+        } else if (event.type === 'done' && handlers.onDone) {
+            handlers.onDone(event.conversation_id);
+        } else if (event.type === 'error') {
+            throw new Error(event.detail || '메시지 전송 실패');
+        }
+    }
+
     /**
      * 문서 검색
      * @param {string} query - 검색 쿼리
@@ -126,12 +258,19 @@ class API {
     }
 
     /**
-     * 문서 목록 조회
+     * 문서 목록 조회 (커서 기반 페이지)
+     * @param {string|null} cursor - 이전 응답의 next_cursor (없으면 첫 페이지)
+     * @param {string} prefix - 파일명 접두어 필터
      * @returns {Promise<Object>} 문서 목록 응답
      */
-    static async getDocuments() {
+    static async getDocuments(cursor = null, prefix = '') {
         try {
-            const response = await fetch(`${API_BASE_URL}/documents`, {
+            const params = new URLSearchParams();
+            if (cursor) params.set('cursor', cursor);
+            if (prefix) params.set('prefix', prefix);
+            const query = params.toString();
+
+            const response = await fetch(`${API_BASE_URL}/documents${query ? `?${query}` : ''}`, {
                 method: 'GET'
             });
 
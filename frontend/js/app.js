@@ -6,6 +6,7 @@
 class App {
     constructor() {
         this.conversationId = null;
+        this.documentsCursor = null;
         this.init();
     }
 
@@ -119,13 +120,15 @@ class App {
 
             UI.showUploadProgress(true, 50, '문서 처리 중...');
 
-            // 문서 인덱싱
-            const indexResponse = await API.indexDocument(uploadResponse.document_id);
+            // 문서 인덱싱 (백그라운드 작업)
+            const jobResponse = await API.createIndexJob(uploadResponse.document_id);
 
-            if (!indexResponse.success) {
-                throw new Error(indexResponse.message);
+            if (!jobResponse.success) {
+                throw new Error(jobResponse.message);
             }
 
+            await this.waitForIndexJob(jobResponse.job.job_id);
+
             UI.showUploadProgress(true, 100, '완료!');
 
             // 성공 메시지
@@ -147,20 +150,72 @@ class App {
     }
 
     /**
-     * 문서 목록 로드
+     * 인덱싱 작업이 끝날 때까지 진행률 표시
+     * @param {string} jobId - 작업 ID
+     */
+    async waitForIndexJob(jobId) {
+        while (true) {
+            const response = await API.getIndexJob(jobId);
+            const job = response.job;
+
+            if (job.status === 'completed') {
+                return job;
+            }
+            if (job.status === 'failed' || job.status === 'cancelled') {
+                throw new Error(job.error || '문서 인덱싱이 취소되었습니다.');
+            }
+
+            // 추출 50~70%, 임베딩 70~95%, 저장 95~100%
+            let progress = 50;
+            let text = '문서 처리 대기 중...';
+            if (job.total_chunks > 0) {
+                progress = 70 + Math.round(25 * job.chunks_embedded / job.total_chunks);
+                text = `임베딩 생성 중... (${job.chunks_embedded}/${job.total_chunks} 청크)`;
+            } else if (job.total_pages > 0) {
+                progress = 50 + Math.round(20 * job.pages_extracted / job.total_pages);
+                text = `텍스트 추출 중... (${job.pages_extracted}/${job.total_pages} 페이지)`;
+            }
+            UI.showUploadProgress(true, progress, text);
+
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+
+    /**
+     * 문서 목록 로드 (첫 페이지)
      */
     async loadDocuments() {
         try {
             const response = await API.getDocuments();
 
             if (response.success && response.documents) {
-                UI.renderDocumentList(response.documents);
+                this.documentsCursor = response.next_cursor;
+                UI.renderDocumentList(response.documents, false, Boolean(this.documentsCursor));
             }
         } catch (error) {
             console.error('Load documents error:', error);
         }
     }
 
+    /**
+     * 문서 목록 다음 페이지 로드
+     */
+    async loadMoreDocuments() {
+        if (!this.documentsCursor) return;
+
+        try {
+            const response = await API.getDocuments(this.documentsCursor);
+
+            if (response.success && response.documents) {
+                this.documentsCursor = response.next_cursor;
+                UI.renderDocumentList(response.documents, true, Boolean(this.documentsCursor));
+            }
+        } catch (error) {
+            console.error('Load more documents error:', error);
+            UI.showToast(`문서 목록 조회 실패: ${error.message}`, 'error');
+        }
+    }
+
     /**
      * 문서 삭제
      * @param {string} documentId - 문서 ID
@@ -209,23 +264,26 @@ class App {
         UI.addLoadingMessage();
 
         try {
-            // API 호출
-            const response = await API.sendMessage(message, this.conversationId);
-
-            // 로딩 메시지 제거
-            UI.removeLoadingMessage();
-
-            if (response.success) {
-                // 대화 ID 저장
-                if (response.conversation_id) {
-                    this.conversationId = response.conversation_id;
+            // 스트리밍 API 호출
+            let messageDiv = null;
+            let answer = '';
+
+            await API.sendMessageStream(message, this.conversationId, {
+                onSources: (sources, conversationId) => {
+                    // 대화 ID 저장
+                    if (conversationId) {
+                        this.conversationId = conversationId;
+                    }
+
+                    // 로딩 메시지를 출처가 포함된 빈 AI 응답으로 교체
+                    UI.removeLoadingMessage();
+                    messageDiv = UI.addAssistantMessage('', sources);
+                },
+                onToken: (text) => {
+                    answer += text;
+                    UI.updateAssistantMessage(messageDiv, answer);
                 }
-
-                // AI 응답 표시
-                UI.addAssistantMessage(response.answer, response.sources);
-            } else {
-                throw new Error(response.message);
-            }
+            });
         } catch (error) {
             console.error('Chat error:', error);
             UI.removeLoadingMessage();
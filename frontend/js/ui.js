@@ -34,16 +34,21 @@ class UI {
     /**
      * 문서 목록 렌더링
      * @param {Array} documents - 문서 목록
+     * @param {boolean} append - 기존 목록 뒤에 이어 붙일지 여부
+     * @param {boolean} hasMore - 다음 페이지 존재 여부 ("더 보기" 버튼 표시)
      */
-    static renderDocumentList(documents) {
+    static renderDocumentList(documents, append = false, hasMore = false) {
         const documentList = document.getElementById('documentList');
 
-        if (!documents || documents.length === 0) {
+        const moreButton = documentList.querySelector('.btn-more');
+        if (moreButton) moreButton.remove();
+
+        if (!append && (!documents || documents.length === 0)) {
             documentList.innerHTML = '<p class="empty-message">업로드된 문서가 없습니다.</p>';
             return;
         }
 
-        documentList.innerHTML = documents.map(doc => `
+        const items = documents.map(doc => `
             <div class="document-item" data-id="${doc.id}">
                 <div class="document-name">
                     📄 ${doc.filename}
@@ -60,6 +65,19 @@ class UI {
                 </button>
             </div>
         `).join('');
+
+        if (append) {
+            documentList.insertAdjacentHTML('beforeend', items);
+        } else {
+            documentList.innerHTML = items;
+        }
+
+        if (hasMore) {
+            documentList.insertAdjacentHTML(
+                'beforeend',
+                '<button class="btn-more" onclick="app.loadMoreDocuments()">더 보기</button>'
+            );
+        }
     }
 
     /**
@@ -126,6 +144,7 @@ class UI {
      * AI 메시지 추가
      * @param {string} message - 메시지 내용
      * @param {Array} sources - 출처 문서 목록
+     * @returns {HTMLElement} 메시지 요소
      */
     static addAssistantMessage(message, sources = []) {
         const chatMessages = document.getElementById('chatMessages');
@@ -158,6 +177,19 @@ class UI {
 
         chatMessages.appendChild(messageDiv);
         this.scrollToBottom();
+
+        return messageDiv;
+    }
+
+    /**
+     * AI 메시지 내용 갱신 (스트리밍 응답용)
+     * @param {HTMLElement} messageDiv - addAssistantMessage가 반환한 메시지 요소
+     * @param {string} message - 현재까지 생성된 메시지 내용
+     */
+    static updateAssistantMessage(messageDiv, message) {
+        const bubble = messageDiv.querySelector('.message-bubble');
+        bubble.innerHTML = this.formatMessage(message);
+        this.scrollToBottom();
     }
 
     /**
@@ -0,0 +1,85 @@
+"""
+/api/chat, /api/query 동시 처리량 부하 테스트
+- 실행 중인 서버에 동시 요청을 보내고 처리량(req/s)과 지연 시간 측정
+- 동시 요청 수를 늘려가며 이벤트 루프가 블로킹되지 않는지 확인
+
+사용법:
+    python loadtest_chat.py [엔드포인트(chat|query)] [총 요청 수]
+"""
+import os
+import sys
+import json
+import time
+import statistics
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api")
+CONCURRENCY_LEVELS = [1, 4, 8, 16]
+QUERIES = [
+    "SQL Injection 대응 방법은?",
+    "크로스사이트 스크립팅 설명해줘",
+    "세션 관리 취약점 대책은?",
+    "파일 업로드 취약점은 무엇인가요?",
+]
+
+
+def send_request(endpoint, index):
+    """요청 1건 전송 후 지연 시간(초) 반환"""
+    query = QUERIES[index % len(QUERIES)]
+    if endpoint == "chat":
+        body = {"message": query}
+    else:
+        body = {"query": query, "top_k": 5}
+
+    request = urllib.request.Request(
+        f"{API_BASE_URL}/{endpoint}",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=300) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def probe_health():
+    """부하 중 헬스 체크 응답 시간(초) 측정 - 이벤트 루프 블로킹 여부 확인용"""
+    started = time.perf_counter()
+    with urllib.request.urlopen(f"{API_BASE_URL}/health", timeout=300) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def main():
+    endpoint = sys.argv[1] if len(sys.argv) > 1 else "query"
+    total_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    print("=" * 80)
+    print(f"부하 테스트: /api/{endpoint} (요청 {total_requests}건)")
+    print("=" * 80)
+    print(f"{'동시성':>6} | {'처리량 (req/s)':>14} | {'p50 (s)':>8} | {'p99 (s)':>8} | {'헬스 체크 (ms)':>14}")
+    print("-" * 70)
+
+    for concurrency in CONCURRENCY_LEVELS:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool, \
+                ThreadPoolExecutor(max_workers=1) as probe_pool:
+            started = time.perf_counter()
+            futures = [pool.submit(send_request, endpoint, i) for i in range(total_requests)]
+            # 요청이 처리되는 도중에 헬스 체크 응답 시간 측정
+            time.sleep(0.5)
+            health_future = probe_pool.submit(probe_health)
+            latencies = sorted(f.result() for f in futures)
+            elapsed = time.perf_counter() - started
+            health_ms = health_future.result() * 1000
+
+        p99_index = min(len(latencies) - 1, int(round(0.99 * (len(latencies) - 1))))
+        print(
+            f"{concurrency:>6} | {total_requests / elapsed:>14.2f} | "
+            f"{statistics.median(latencies):>8.2f} | {latencies[p99_index]:>8.2f} | {health_ms:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
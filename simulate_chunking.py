@@ -1,7 +1,7 @@
 """청킹 프로세스 시뮬레이션 - 페이지 6 내용이 어느 청크에 있는지 확인"""
 import PyPDF2
 
-pdf_path = "backend/uploads/doc_73d98794a215_표준프레임워크_보안개발_가이드(2024.02).pdf"
+pdf_path = "backend/uploads/73/doc_73d98794a215_표준프레임워크_보안개발_가이드(2024.02).pdf"
 
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
@@ -0,0 +1,174 @@
+"""
+채팅 스트리밍 (/api/chat/stream) 테스트
+- 토큰을 하나씩 내보내는 가짜 모델과 고정 검색 결과로 SSE 이벤트를 검사
+- 정상 응답: sources -> token... -> done 순서, 토큰이 생성되는 대로 전송되는지 확인
+- 오류: 모델이 도중에 실패하면 오류 문구 token 후 done, 검색이 실패하면 error 이벤트
+- Gemini / ChromaDB / 임베딩 모델 없이 실행하며, 실제 uvicorn 서버(임의 포트)에 요청
+
+사용법:
+    python test_chat_stream.py
+"""
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import tempfile
+import threading
+
+data_dir = tempfile.mkdtemp(prefix="chat_stream_")
+os.environ["CHROMA_DB_PATH"] = data_dir
+os.environ["UPLOAD_DIR"] = os.path.join(data_dir, "uploads")
+os.environ["QUERY_EMBEDDING_CACHE_PATH"] = ""
+os.environ["ANSWER_CACHE_SIMILARITY_THRESHOLD"] = "0"
+sys.path.append('backend')
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from api.routes import router
+from services.rag_service import rag_service
+from services.vector_service import vector_service
+
+TOKENS = ["SQL ", "Injection은 ", "입력값 ", "검증으로 ", "막습니다."]
+TOKEN_DELAY = 0.2  # 초
+
+SEARCH_RESULTS = [
+    {
+        "chunk_id": "doc_test_p3_c0",
+        "document": "guide.pdf",
+        "document_id": "doc_test",
+        "page": 3,
+        "page_chunk_index": 0,
+        "score": 0.82,
+        "text": "SQL Injection 대응: 입력값 검증 및 PreparedStatement 사용",
+        "source_type": "direct"
+    }
+]
+
+
+class FakeChunk:
+    """generate_content(stream=True)가 내보내는 응답 조각"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """토큰을 하나씩 일정 간격으로 내보내는 가짜 모델 (fail_after개 이후 예외)"""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+
+    def generate_content(self, prompt, stream=False):
+        for idx, token in enumerate(TOKENS):
+            if self.fail_after is not None and idx >= self.fail_after:
+                raise RuntimeError("모델 연결 끊김")
+            time.sleep(TOKEN_DELAY)
+            yield FakeChunk(token)
+
+
+def start_server():
+    """테스트용 uvicorn 서버를 임의 포트로 백그라운드 실행 (응답을 모아 보내지 않는 실제 서버로 검사)"""
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def read_events(base_url, message):
+    """SSE 응답을 읽어 (수신 시각, 이벤트 이름, 데이터) 리스트로 반환"""
+    events = []
+    with httpx.stream("POST", f"{base_url}/api/chat/stream", json={"message": message}, timeout=30) as response:
+        assert response.status_code == 200, response.status_code
+        assert response.headers["content-type"].startswith("text/event-stream")
+        buffer = ""
+        for text in response.iter_text():
+            buffer += text
+            while "\n\n" in buffer:
+                raw, buffer = buffer.split("\n\n", 1)
+                lines = dict(line.split(": ", 1) for line in raw.split("\n") if line)
+                events.append((time.perf_counter(), lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def check(failures, condition, message):
+    """조건을 만족하지 않으면 실패 목록에 추가"""
+    print(f"  [{'OK' if condition else '실패'}] {message}")
+    if not condition:
+        failures.append(message)
+
+
+def main():
+    server, base_url = start_server()
+    failures = []
+
+    try:
+        vector_service.search = lambda query, top_k=None, **kwargs: [dict(r) for r in SEARCH_RESULTS]
+
+        print("=" * 80)
+        print("1. 정상 스트리밍")
+        print("=" * 80)
+        rag_service.model = FakeModel()
+        events = read_events(base_url, "SQL Injection 대응 방법은?")
+        names = [name for _, name, _ in events]
+        tokens = [data["text"] for _, name, data in events if name == "token"]
+        check(failures, names == ["sources"] + ["token"] * len(TOKENS) + ["done"], f"이벤트 순서: {names}")
+        check(failures, tokens == TOKENS, "토큰이 생성 순서대로 전송됨")
+        check(failures, events[0][2]["sources"][0]["page"] == 3, "sources 이벤트에 검색 결과 포함")
+        check(
+            failures,
+            events[0][2]["conversation_id"] == events[-1][2]["conversation_id"],
+            "sources와 done의 conversation_id 일치"
+        )
+        token_times = [at for at, name, _ in events if name == "token"]
+        spread = token_times[-1] - token_times[0]
+        check(
+            failures,
+            spread >= TOKEN_DELAY * (len(TOKENS) - 2),
+            f"토큰이 모아지지 않고 생성되는 대로 도착 (첫 토큰~마지막 토큰 {spread:.2f}초)"
+        )
+
+        print("\n" + "=" * 80)
+        print("2. 모델이 생성 도중 실패")
+        print("=" * 80)
+        rag_service.model = FakeModel(fail_after=2)
+        events = read_events(base_url, "XSS 대응 방법은?")
+        names = [name for _, name, _ in events]
+        check(failures, names == ["sources", "token", "token", "token", "done"], f"이벤트 순서: {names}")
+        check(failures, "모델 연결 끊김" in events[-2][2]["text"], "오류 문구가 마지막 token으로 전송됨")
+
+        print("\n" + "=" * 80)
+        print("3. 검색 실패")
+        print("=" * 80)
+
+        def failing_search(query, top_k=None, **kwargs):
+            raise RuntimeError("ChromaDB 연결 실패")
+
+        vector_service.search = failing_search
+        events = read_events(base_url, "CSRF 대응 방법은?")
+        names = [name for _, name, _ in events]
+        check(failures, names == ["error"], f"이벤트 순서: {names}")
+        check(failures, "ChromaDB 연결 실패" in events[0][2]["detail"], "error 이벤트에 오류 내용 포함")
+
+        if failures:
+            print(f"\n실패: {len(failures)}개")
+            return 1
+
+        print("\n성공: 스트리밍 이벤트가 올바른 순서로 전송됩니다.")
+        return 0
+    finally:
+        server.should_exit = True
+        rag_service.conversations.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+여러 워커 프로세스 동시 실행 테스트
+1. 공유 저장소: N개 프로세스가 동시에 문서 메타데이터를 저장/조회하고 임베딩 저장소에 기록
+   - 끝난 뒤 유실된 문서, 코퍼스 버전, 임베딩 저장소 행 수/내용을 확인
+2. VectorService: N개 프로세스가 같은 ChromaDB 서버(chroma run)에 문서를 인덱싱하고 목록 조회
+   - 각 워커가 다른 워커의 문서를 페이지 인덱스 / BM25 색인에서 찾을 수 있는지 확인
+   - 코퍼스 버전이 청크 배치가 아닌 문서당 한 번만 증가하는지 확인
+   - 다른 워커의 변경을 색인 전체 재구성 없이 변경 기록으로 반영하는지 확인
+   - 임베딩 모델 대신 고정 벡터를 돌려주는 가짜 모델 사용
+
+사용법:
+    python test_multi_worker.py [워커 수] [워커당 문서 수]
+"""
+import os
+import sys
+import time
+import hashlib
+import shutil
+import socket
+import tempfile
+import subprocess
+import multiprocessing
+
+import numpy as np
+
+EMBEDDING_DIM = 16
+PAGES_PER_DOCUMENT = 4
+
+
+def expected_vector(text):
+    """텍스트별로 고정된 테스트 벡터"""
+    seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(EMBEDDING_DIM).astype(np.float32)
+
+
+class FakeEmbeddingModel:
+    """SentenceTransformer.encode 대신 텍스트별 고정 벡터를 돌려주는 가짜 모델"""
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        return np.stack([expected_vector(text) for text in texts])
+
+
+def set_environment(data_dir, chroma_port=None):
+    """워커 프로세스 환경 변수 설정 (설정 모듈을 불러오기 전에 호출)"""
+    os.environ["CHROMA_DB_PATH"] = data_dir
+    os.environ["UPLOAD_DIR"] = os.path.join(data_dir, "uploads")
+    os.environ["EMBEDDING_STORE_DIR"] = os.path.join(data_dir, "embedding_store")
+    if chroma_port is not None:
+        os.environ["CHROMA_HOST"] = "127.0.0.1"
+        os.environ["CHROMA_PORT"] = str(chroma_port)
+        os.environ["SEARCH_MODE"] = "hybrid"
+        # 문서 하나가 여러 청크 배치로 나뉘도록 작게 설정
+        os.environ["CHUNK_SIZE"] = "200"
+        os.environ["CHUNK_OVERLAP"] = "20"
+        os.environ["EMBEDDING_BATCH_SIZE"] = "4"
+    sys.path.insert(0, "backend")
+
+
+def document_pages(document_id):
+    """문서별 테스트 페이지 (2페이지에 문서 고유 키워드 포함)"""
+    pages = []
+    for page_number in range(1, PAGES_PER_DOCUMENT + 1):
+        text = f"{document_id} 문서 {page_number}페이지 보안 점검 항목 설명입니다. " * 8
+        if page_number == 2:
+            text += f" marker{document_id.replace('_', '')}"
+        pages.append({"page_number": page_number, "text": text})
+    return pages
+
+
+def worker(worker_id, num_documents, data_dir, barrier, errors):
+    """문서 저장 + 목록 조회 + 임베딩 기록을 반복하는 워커 프로세스"""
+    set_environment(data_dir)
+
+    from services.metadata_store import MetadataStore
+    from services.embedding_store import EmbeddingStore
+
+    store = MetadataStore(os.path.join(data_dir, "metadata.db"))
+    embeddings = EmbeddingStore("test-model", os.path.join(data_dir, "embedding_store"))
+    barrier.wait()
+
+    try:
+        for i in range(num_documents):
+            document_id = f"doc_w{worker_id}_{i}"
+            store.upsert_document(document_id, f"{document_id}.pdf", 10, 20)
+            store.bump_version([document_id])
+
+            # 방금 저장한 문서가 목록에 보여야 함 (다른 워커의 문서도 함께 보임)
+            if document_id not in store.all_documents():
+                errors.put(f"worker {worker_id}: {document_id} 누락")
+
+            # 워커 간에 겹치는 텍스트 포함
+            texts = [f"공유 청크 {i}", f"워커 {worker_id} 청크 {i}"]
+            embeddings.put_many(texts, np.stack([expected_vector(t) for t in texts]))
+    except Exception as e:
+        errors.put(f"worker {worker_id}: {type(e).__name__}: {e}")
+
+
+def index_worker(worker_id, num_workers, num_documents, data_dir, chroma_port, barrier, errors):
+    """VectorService로 문서를 인덱싱하고 목록을 조회한 뒤 다른 워커의 문서를 검색하는 워커 프로세스"""
+    set_environment(data_dir, chroma_port)
+
+    from services.vector_service import vector_service
+    from services.pdf_service import pdf_service
+
+    vector_service._embedding_model = FakeEmbeddingModel()
+
+    # 색인 전체 구성 횟수 (최초 로드 한 번만 허용, 이후 변경은 변경 기록으로 반영)
+    builds = []
+    build_page_index = vector_service._build_page_index
+
+    def counting_build():
+        builds.append(1)
+        build_page_index()
+
+    vector_service._build_page_index = counting_build
+    barrier.wait()
+
+    try:
+        for i in range(num_documents):
+            document_id = f"doc_w{worker_id}_{i}"
+            filename = f"{document_id}.pdf"
+            chunks = pdf_service.iter_chunks(document_pages(document_id), document_id, filename)
+            chunk_count = vector_service.add_documents_stream(chunks, document_id, filename, PAGES_PER_DOCUMENT)
+
+            # 방금 인덱싱한 문서가 목록에 보여야 함 (다른 워커의 문서도 함께 보임)
+            documents, _ = vector_service.get_document_page(num_workers * num_documents)
+            listed = {document["id"]: document["chunks"] for document in documents}
+            if listed.get(document_id) != chunk_count:
+                errors.put(f"worker {worker_id}: 목록의 {document_id} 청크 수 {listed.get(document_id)} != {chunk_count}")
+    except Exception as e:
+        errors.put(f"worker {worker_id}: {type(e).__name__}: {e}")
+    finally:
+        barrier.wait()
+
+    # 다른 워커가 인덱싱한 문서를 페이지 인덱스 / BM25 색인에서 찾을 수 있어야 함
+    try:
+        other = (worker_id + 1) % num_workers
+        for i in range(num_documents):
+            document_id = f"doc_w{other}_{i}"
+            chunk_ids = vector_service.get_document_chunk_ids(document_id)  # 변경된 코퍼스 동기화 포함
+            expected = vector_service.get_document_info(document_id)["chunks"]
+            if len(chunk_ids) != expected:
+                errors.put(f"worker {worker_id}: {document_id} 페이지 인덱스 청크 {len(chunk_ids)} != {expected}")
+
+            hits = vector_service.lexical_index.search(f"marker{document_id.replace('_', '')}", 1)
+            if not hits or not hits[0][0].startswith(f"{document_id}_p2_"):
+                errors.put(f"worker {worker_id}: BM25 색인에서 {document_id}를 찾지 못함")
+
+        if len(builds) != 1:
+            errors.put(f"worker {worker_id}: 색인 전체 구성 {len(builds)}회 (최초 1회만 허용)")
+    except Exception as e:
+        errors.put(f"worker {worker_id}: {type(e).__name__}: {e}")
+
+
+def start_chroma_server(path):
+    """테스트용 ChromaDB 서버 실행 (chroma CLI가 없으면 None)"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    try:
+        process = subprocess.Popen(
+            ["chroma", "run", "--path", path, "--host", "127.0.0.1", "--port", str(port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        return None, None
+
+    import chromadb
+    for _ in range(100):
+        try:
+            chromadb.HttpClient(host="127.0.0.1", port=port).heartbeat()
+            return process, port
+        except Exception:
+            time.sleep(0.2)
+    process.terminate()
+    return None, None
+
+
+def run_processes(target, num_workers, args):
+    """워커 프로세스 실행 후 오류 목록 반환"""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(num_workers)
+    errors = context.Queue()
+    processes = [
+        context.Process(target=target, args=(w, *args, barrier, errors))
+        for w in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    failures = []
+    while not errors.empty():
+        failures.append(errors.get())
+    return failures
+
+
+def test_vector_service(num_workers, num_documents):
+    """VectorService 인덱싱/목록 조회 테스트 (실패 목록 반환)"""
+    data_dir = tempfile.mkdtemp(prefix="multi_worker_index_")
+    process, port = start_chroma_server(os.path.join(data_dir, "chroma"))
+    if process is None:
+        print("chroma 서버를 실행할 수 없어 VectorService 테스트를 건너뜁니다.")
+        shutil.rmtree(data_dir, ignore_errors=True)
+        return []
+
+    try:
+        started = time.perf_counter()
+        failures = run_processes(index_worker, num_workers, (num_workers, num_documents, data_dir, port))
+
+        from services.metadata_store import MetadataStore
+        import chromadb
+
+        store = MetadataStore(os.path.join(data_dir, "metadata.db"))
+        documents = store.all_documents()
+        expected_documents = num_workers * num_documents
+        if len(documents) != expected_documents:
+            failures.append(f"문서 수 {len(documents)} != {expected_documents}")
+        # 청크 배치마다가 아니라 문서당 한 번만 증가해야 함
+        if store.get_version() != expected_documents:
+            failures.append(f"코퍼스 버전 {store.get_version()} != 문서 수 {expected_documents}")
+
+        collection = chromadb.HttpClient(host="127.0.0.1", port=port).get_collection(os.environ.get("COLLECTION_NAME", "pdf_documents"))
+        total_chunks = sum(document["chunks"] for document in documents.values())
+        if collection.count() != total_chunks:
+            failures.append(f"ChromaDB 청크 수 {collection.count()} != 메타데이터 청크 합계 {total_chunks}")
+
+        print(f"문서: {len(documents)}개, 청크: {collection.count()}개, 코퍼스 버전: {store.get_version()}, "
+              f"{time.perf_counter() - started:.1f}초")
+        return failures
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    num_documents = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    index_documents = max(1, num_documents // 10)
+
+    data_dir = tempfile.mkdtemp(prefix="multi_worker_")
+    try:
+        print("=" * 80)
+        print(f"1. 공유 저장소 동시 기록 (워커 {num_workers}개 x 문서 {num_documents}개)")
+        print("=" * 80)
+
+        failures = run_processes(worker, num_workers, (num_documents, data_dir))
+
+        set_environment(data_dir)
+        from services.metadata_store import MetadataStore
+        from services.embedding_store import EmbeddingStore
+
+        store = MetadataStore(os.path.join(data_dir, "metadata.db"))
+        documents = store.all_documents()
+        expected_documents = num_workers * num_documents
+        if len(documents) != expected_documents:
+            failures.append(f"문서 수 {len(documents)} != {expected_documents}")
+        if store.get_version() != expected_documents:
+            failures.append(f"코퍼스 버전 {store.get_version()} != {expected_documents}")
+        # 변경 기록에 모든 문서가 남아 있어야 함
+        _, changed = store.get_changes(0)
+        if changed != sorted(documents):
+            failures.append(f"변경 기록 문서 {0 if changed is None else len(changed)}개 != {expected_documents}")
+
+        embeddings = EmbeddingStore("test-model", os.path.join(data_dir, "embedding_store"))
+        texts = [f"공유 청크 {i}" for i in range(num_documents)]
+        texts += [f"워커 {w} 청크 {i}" for w in range(num_workers) for i in range(num_documents)]
+        if len(embeddings) != len(texts):
+            failures.append(f"임베딩 행 수 {len(embeddings)} != {len(texts)}")
+        found = embeddings.get_many(texts)
+        wrong = [t for idx, t in enumerate(texts) if idx not in found or not np.allclose(found[idx], expected_vector(t))]
+        if wrong:
+            failures.append(f"임베딩 불일치 {len(wrong)}개 (예: {wrong[0]})")
+
+        print(f"문서: {len(documents)}개, 코퍼스 버전: {store.get_version()}, 임베딩: {len(embeddings)}개")
+
+        print("\n" + "=" * 80)
+        print(f"2. VectorService 인덱싱 / 목록 조회 (워커 {num_workers}개 x 문서 {index_documents}개)")
+        print("=" * 80)
+        failures += test_vector_service(num_workers, index_documents)
+
+        if failures:
+            print("\n실패:")
+            for failure in failures:
+                print(f"  - {failure}")
+            return 1
+
+        print("\n성공: 유실되거나 손상된 쓰기가 없습니다.")
+        return 0
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 """PDF 3페이지 텍스트 추출 테스트"""
 import PyPDF2
 
-pdf_path = "backend/uploads/doc_73d98794a215_표준프레임워크_보안개발_가이드(2024.02).pdf"
+pdf_path = "backend/uploads/73/doc_73d98794a215_표준프레임워크_보안개발_가이드(2024.02).pdf"
 
 print("=" * 80)
 print("PDF 3페이지 텍스트 추출")